@@ -0,0 +1,258 @@
+"""
+Vectorized Candlestick Pattern Scanner
+Computes candlestick pattern flags and reliability scores for a whole dataset in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Tuple, Optional
+import logging
+
+from .feature_cache import FeatureCache
+
+logger = logging.getLogger(__name__)
+
+# Pattern columns in detection order (matches the order patterns are reported per bar)
+PATTERN_TYPES: Tuple[str, ...] = (
+    'hammer',
+    'bullish_engulfing',
+    'bearish_engulfing',
+    'doji',
+    'bullish_pin_bar',
+    'bearish_pin_bar'
+)
+
+PATTERN_DIRECTIONS = {
+    'hammer': 'bullish',
+    'bullish_engulfing': 'bullish',
+    'bearish_engulfing': 'bearish',
+    'doji': 'neutral',
+    'bullish_pin_bar': 'bullish',
+    'bearish_pin_bar': 'bearish'
+}
+
+_PATTERN_COLUMNS = {name: column for column, name in enumerate(PATTERN_TYPES)}
+
+
+class CandlestickPatternScanner:
+    """
+    Vectorized candlestick pattern scanner.
+
+    Scans an OHLC dataset once and keeps a (bars x patterns) reliability matrix,
+    NaN where a pattern is absent. Bar data comes from a FeatureCache; appended
+    bars are scanned incrementally, so per-bar pattern detection becomes an
+    array lookup.
+
+    Pattern rules:
+    - Hammer: lower shadow >= 2x body, upper shadow <= 0.5x body
+    - Engulfing: current body engulfs opposite-coloured previous body
+    - Doji: body < 5% of total range
+    - Pin bar: one shadow >= 66% of total range
+    """
+
+    def __init__(self, initial_capacity: int = 1024, feature_cache: Optional[FeatureCache] = None):
+        """
+        Initialize pattern scanner.
+
+        Args:
+            initial_capacity: Initial number of bars to allocate storage for
+            feature_cache: Shared feature cache (a private one is created if omitted)
+        """
+        self._capacity = max(1, initial_capacity)
+        self._reliability = np.full((self._capacity, len(PATTERN_TYPES)), np.nan)
+        self._size = 0
+        self.features = feature_cache if feature_cache is not None else FeatureCache(initial_capacity)
+
+        # Feature cache state the pattern arrays were computed from
+        self._generation: Optional[int] = None
+        self._revision: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Bring pattern arrays in sync with the DataFrame.
+
+        Appended bars (same leading index, more rows) are scanned incrementally;
+        the last scanned bar is re-scanned so a still-forming candle stays current.
+        Any other change triggers a full rescan. Repeated calls with the same,
+        unmodified DataFrame object are O(1).
+
+        Args:
+            df: OHLC DataFrame with columns ['open', 'high', 'low', 'close']
+        """
+        self.features.update(df)
+        self.sync()
+
+    def sync(self) -> None:
+        """Bring pattern arrays in sync with the feature cache."""
+        features = self.features
+        if features.generation == self._generation and features.revision == self._revision:
+            return
+
+        if features.size == 0:
+            self._clear()
+        elif features.generation == self._generation and self._size > 0:
+            self._scan(self._size - 1)
+        else:
+            self._scan(0)
+
+        self._generation = features.generation
+        self._revision = features.revision
+
+    def reliability(self, pattern_type: str) -> np.ndarray:
+        """Get reliability array for a pattern (NaN where not detected)."""
+        return self._reliability[:self._size, _PATTERN_COLUMNS[pattern_type]]
+
+    def flags(self, pattern_type: str) -> np.ndarray:
+        """Get boolean detection array for a pattern."""
+        return ~np.isnan(self.reliability(pattern_type))
+
+    def patterns_at(self, index: int) -> List[Tuple[str, float]]:
+        """
+        Get patterns detected at a bar.
+
+        Args:
+            index: Bar index (must be within the scanned range)
+
+        Returns:
+            List of (pattern_type, reliability) in detection order
+        """
+        if index < 0 or index >= self._size:
+            return []
+
+        row = self._reliability[index]
+        return [
+            (pattern_type, float(row[column]))
+            for column, pattern_type in enumerate(PATTERN_TYPES)
+            if row[column] == row[column]  # NaN check
+        ]
+
+    def reset(self) -> None:
+        """Clear scanned state."""
+        self._clear()
+        self._generation = None
+        self._revision = None
+
+    def _clear(self) -> None:
+        """Clear pattern arrays."""
+        self._reliability[:self._size] = np.nan
+        self._size = 0
+
+    def _scan(self, start: int) -> None:
+        """Scan bars from start to the end of the cached features."""
+        features = self.features
+        n_bars = features.size
+        self._ensure_capacity(n_bars)
+
+        # Include the previous bar for two-bar patterns
+        context_start = max(0, start - 1)
+        open_ = features.column('open')[context_start:]
+        high = features.column('high')[context_start:]
+        low = features.column('low')[context_start:]
+        close = features.column('close')[context_start:]
+
+        block = self._scan_block(open_, high, low, close)
+        offset = start - context_start
+        self._reliability[start:n_bars] = block[offset:]
+
+        if start == 0:
+            # First bar has no previous bar for engulfing patterns
+            self._reliability[0, _PATTERN_COLUMNS['bullish_engulfing']] = np.nan
+            self._reliability[0, _PATTERN_COLUMNS['bearish_engulfing']] = np.nan
+
+        # Clear stale rows from a previous, longer dataset
+        if n_bars < self._size:
+            self._reliability[n_bars:self._size] = np.nan
+
+        self._size = n_bars
+
+        logger.debug(f"Scanned candlestick patterns for bars {start}-{n_bars - 1}")
+
+    def _ensure_capacity(self, n_bars: int) -> None:
+        """Grow storage geometrically so appends stay amortized O(1)."""
+        if n_bars <= self._capacity:
+            return
+
+        new_capacity = max(n_bars, self._capacity * 2)
+        grown = np.full((new_capacity, len(PATTERN_TYPES)), np.nan)
+        grown[:self._size] = self._reliability[:self._size]
+        self._reliability = grown
+        self._capacity = new_capacity
+
+    @staticmethod
+    def _scan_block(
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compute reliability matrix for a contiguous block of bars.
+
+        Row 0 of the block has no previous bar, so its engulfing columns are
+        only meaningful when the caller discards them.
+        """
+        result = np.full((len(close), len(PATTERN_TYPES)), np.nan)
+
+        body_size = np.abs(close - open_)
+        total_range = high - low
+        body_top = np.maximum(open_, close)
+        body_bottom = np.minimum(open_, close)
+        upper_shadow = high - body_top
+        lower_shadow = body_bottom - low
+
+        prev_open = np.roll(open_, 1)
+        prev_close = np.roll(close, 1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Hammer: lower shadow >= 2x body, small upper shadow
+            hammer = (
+                (body_size > 0) &
+                (lower_shadow >= 2 * body_size) &
+                (upper_shadow <= 0.5 * body_size)
+            )
+            result[:, 0] = np.where(
+                hammer, np.minimum(lower_shadow / body_size / 2, 1.0), np.nan
+            )
+
+            # Bullish engulfing: previous bearish, current bullish body engulfs it
+            bullish_engulfing = (
+                (prev_close < prev_open) &
+                (close > open_) &
+                (open_ < prev_close) &
+                (close > prev_open)
+            )
+            result[:, 1] = np.where(
+                bullish_engulfing,
+                np.minimum(np.abs(close - open_) / np.abs(prev_close - prev_open), 1.0),
+                np.nan
+            )
+
+            # Bearish engulfing: previous bullish, current bearish body engulfs it
+            bearish_engulfing = (
+                (prev_close > prev_open) &
+                (close < open_) &
+                (open_ > prev_close) &
+                (close < prev_open)
+            )
+            result[:, 2] = np.where(
+                bearish_engulfing,
+                np.minimum(np.abs(open_ - close) / np.abs(prev_open - prev_close), 1.0),
+                np.nan
+            )
+
+            # Doji: body < 5% of total range
+            body_ratio = body_size / total_range
+            doji = (total_range > 0) & (body_ratio < 0.05)
+            result[:, 3] = np.where(doji, 1.0 - (body_ratio / 0.05), np.nan)
+
+            # Pin bars: one shadow >= 66% of total range (bullish takes precedence)
+            has_range = total_range != 0
+            bullish_pin = has_range & (lower_shadow >= 0.66 * total_range)
+            bearish_pin = has_range & ~bullish_pin & (upper_shadow >= 0.66 * total_range)
+            result[:, 4] = np.where(bullish_pin, lower_shadow / total_range, np.nan)
+            result[:, 5] = np.where(bearish_pin, upper_shadow / total_range, np.nan)
+
+        return result
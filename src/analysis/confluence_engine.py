@@ -10,6 +10,11 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from .candlestick_scanner import CandlestickPatternScanner, PATTERN_DIRECTIONS
+from .feature_cache import FeatureCache
+from .confluence_history import BoundedHistory, HistorySpillStore
+from .confluence_writer import ConfluenceWriter
+
 logger = logging.getLogger(__name__)
 
 class ConfluenceFactorType(Enum):
@@ -81,7 +86,10 @@ class ConfluenceEngine:
     def __init__(self, 
                  confluence_distance: float = 0.1,  # % price distance to group factors
                  min_factors: int = 2,
-                 factor_weights: Dict[ConfluenceFactorType, float] = None):
+                 factor_weights: Dict[ConfluenceFactorType, float] = None,
+                 history_window: int = 10000,
+                 spill_store: Optional[HistorySpillStore] = None,
+                 writer: Optional[ConfluenceWriter] = None):
         """
         Initialize confluence engine.
         
@@ -89,6 +97,9 @@ class ConfluenceEngine:
             confluence_distance: Price distance % to group factors into zones
             min_factors: Minimum factors required for confluence
             factor_weights: Custom weights for different factor types
+            history_window: Entries kept in memory per history list
+            spill_store: Where entries older than the window are written (dropped if None)
+            writer: Write-behind batcher persisting factors and zones to the database
         """
         self.confluence_distance = confluence_distance
         self.min_factors = min_factors
@@ -119,10 +130,22 @@ class ConfluenceEngine:
             ]
         }
         
-        # Storage for analysis
-        self.confluence_zones: List[ConfluenceZone] = []
-        self.individual_factors: List[ConfluenceFactor] = []
-        self.candlestick_patterns: List[CandlestickPattern] = []
+        self.writer = writer
+        
+        # Storage for analysis (bounded; older entries spill to the store)
+        self.confluence_zones = BoundedHistory(
+            'confluence_zones', history_window, self._serialize_confluence_zone, spill_store
+        )
+        self.individual_factors = BoundedHistory(
+            'confluence_factors', history_window, self._serialize_confluence_factor, spill_store
+        )
+        self.candlestick_patterns = BoundedHistory(
+            'candlestick_patterns', history_window, self._serialize_candlestick_pattern, spill_store
+        )
+        
+        # Per-dataset bar features and candlestick pattern arrays (shared with signal generation)
+        self.features = FeatureCache()
+        self.pattern_scanner = CandlestickPatternScanner(feature_cache=self.features)
         
     def detect_fibonacci_confluence(self, 
                                    fibonacci_levels: List[Dict],
@@ -160,9 +183,13 @@ class ConfluenceEngine:
         if current_index < lookback_periods:
             return factors
         
-        # Calculate volume metrics
-        current_volume = df.iloc[current_index]['volume']
-        avg_volume = df.iloc[current_index-lookback_periods:current_index]['volume'].mean()
+        self.features.update(df)
+        if not self.features.has_column('volume'):
+            return factors
+        
+        # Calculate volume metrics (window mean is an O(1) prefix-sum lookup)
+        current_volume = self.features.column('volume')[current_index]
+        avg_volume = self.features.window_mean('volume', current_index - lookback_periods, current_index)
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
         
         # Volume spike detection
@@ -182,215 +209,69 @@ class ConfluenceEngine:
     def detect_candlestick_patterns(self, 
                                    df: pd.DataFrame,
                                    current_index: int) -> List[CandlestickPattern]:
-        """Detect candlestick patterns at current position."""
+        """
+        Detect candlestick patterns at current position.
+        
+        Patterns for the whole dataset are computed once by the vectorized
+        scanner (and extended as bars are appended), so this is a lookup.
+        """
         patterns = []
         
         if current_index < 2:
             return patterns
         
-        current_bar = df.iloc[current_index]
-        prev_bar = df.iloc[current_index - 1]
-        
-        # Hammer pattern detection
-        hammer_pattern = self._detect_hammer_pattern(current_bar)
-        if hammer_pattern:
-            patterns.append(hammer_pattern)
+        self.pattern_scanner.update(df)
+        hits = self.pattern_scanner.patterns_at(current_index)
         
-        # Engulfing pattern detection
-        engulfing_pattern = self._detect_engulfing_pattern(current_bar, prev_bar)
-        if engulfing_pattern:
-            patterns.append(engulfing_pattern)
-        
-        # Doji pattern detection
-        doji_pattern = self._detect_doji_pattern(current_bar)
-        if doji_pattern:
-            patterns.append(doji_pattern)
+        if not hits:
+            return patterns
         
-        # Pin bar pattern detection
-        pin_bar_pattern = self._detect_pin_bar_pattern(current_bar)
-        if pin_bar_pattern:
-            patterns.append(pin_bar_pattern)
+        timestamp = df.index[current_index]
+        close_price = df['close'].iat[current_index]
         
-        return patterns
-    
-    def _detect_hammer_pattern(self, bar: pd.Series) -> Optional[CandlestickPattern]:
-        """Detect hammer candlestick pattern."""
-        open_price = bar['open']
-        high_price = bar['high']
-        low_price = bar['low']
-        close_price = bar['close']
-        
-        body_size = abs(close_price - open_price)
-        lower_shadow = min(open_price, close_price) - low_price
-        upper_shadow = high_price - max(open_price, close_price)
-        
-        # Hammer criteria: lower shadow >= 2x body, small upper shadow
-        if (body_size > 0 and 
-            lower_shadow >= 2 * body_size and 
-            upper_shadow <= 0.5 * body_size):
-            
-            reliability = min(lower_shadow / body_size / 2, 1.0)
-            strength = "strong" if reliability > 0.8 else "moderate" if reliability > 0.5 else "weak"
-            
-            return CandlestickPattern(
-                pattern_type="hammer",
-                timestamp=bar.name,
+        for pattern_type, reliability in hits:
+            patterns.append(CandlestickPattern(
+                pattern_type=pattern_type,
+                timestamp=timestamp,
                 price=close_price,
                 reliability=reliability,
-                direction="bullish",
-                strength=strength
-            )
-        
-        return None
-    
-    def _detect_engulfing_pattern(self, current_bar: pd.Series, prev_bar: pd.Series) -> Optional[CandlestickPattern]:
-        """Detect engulfing candlestick pattern."""
-        curr_open = current_bar['open']
-        curr_close = current_bar['close']
-        prev_open = prev_bar['open']
-        prev_close = prev_bar['close']
-        
-        # Bullish engulfing: previous red, current green, current body engulfs previous
-        if (prev_close < prev_open and  # Previous bar bearish
-            curr_close > curr_open and  # Current bar bullish
-            curr_open < prev_close and  # Current opens below previous close
-            curr_close > prev_open):    # Current closes above previous open
-            
-            engulfing_ratio = abs(curr_close - curr_open) / abs(prev_close - prev_open)
-            reliability = min(engulfing_ratio, 1.0)
-            strength = "strong" if reliability > 0.8 else "moderate" if reliability > 0.5 else "weak"
-            
-            return CandlestickPattern(
-                pattern_type="bullish_engulfing",
-                timestamp=current_bar.name,
-                price=curr_close,
-                reliability=reliability,
-                direction="bullish",
-                strength=strength
-            )
-        
-        # Bearish engulfing: previous green, current red, current body engulfs previous
-        elif (prev_close > prev_open and  # Previous bar bullish
-              curr_close < curr_open and  # Current bar bearish
-              curr_open > prev_close and  # Current opens above previous close
-              curr_close < prev_open):    # Current closes below previous open
-            
-            engulfing_ratio = abs(curr_open - curr_close) / abs(prev_open - prev_close)
-            reliability = min(engulfing_ratio, 1.0)
-            strength = "strong" if reliability > 0.8 else "moderate" if reliability > 0.5 else "weak"
-            
-            return CandlestickPattern(
-                pattern_type="bearish_engulfing",
-                timestamp=current_bar.name,
-                price=curr_close,
-                reliability=reliability,
-                direction="bearish",
-                strength=strength
-            )
+                direction=PATTERN_DIRECTIONS[pattern_type],
+                strength=self._pattern_strength(pattern_type, reliability)
+            ))
         
-        return None
+        return patterns
     
-    def _detect_doji_pattern(self, bar: pd.Series) -> Optional[CandlestickPattern]:
-        """Detect doji candlestick pattern."""
-        open_price = bar['open']
-        close_price = bar['close']
-        high_price = bar['high']
-        low_price = bar['low']
-        
-        body_size = abs(close_price - open_price)
-        total_range = high_price - low_price
-        
-        # Doji criteria: body size < 5% of total range
-        if total_range > 0 and body_size / total_range < 0.05:
-            reliability = 1.0 - (body_size / total_range / 0.05)
-            strength = "strong" if reliability > 0.8 else "moderate"
-            
-            return CandlestickPattern(
-                pattern_type="doji",
-                timestamp=bar.name,
-                price=close_price,
-                reliability=reliability,
-                direction="neutral",
-                strength=strength
-            )
+    def _pattern_strength(self, pattern_type: str, reliability: float) -> str:
+        """Classify pattern strength from reliability."""
+        if reliability > 0.8:
+            return "strong"
         
-        return None
-    
-    def _detect_pin_bar_pattern(self, bar: pd.Series) -> Optional[CandlestickPattern]:
-        """Detect pin bar candlestick pattern."""
-        open_price = bar['open']
-        high_price = bar['high']
-        low_price = bar['low']
-        close_price = bar['close']
-        
-        body_size = abs(close_price - open_price)
-        total_range = high_price - low_price
-        upper_shadow = high_price - max(open_price, close_price)
-        lower_shadow = min(open_price, close_price) - low_price
-        
-        if total_range == 0:
-            return None
-        
-        # Pin bar criteria: one shadow >= 66% of total range
-        if lower_shadow >= 0.66 * total_range:
-            # Bullish pin bar (long lower shadow)
-            reliability = lower_shadow / total_range
-            strength = "strong" if reliability > 0.8 else "moderate"
-            
-            return CandlestickPattern(
-                pattern_type="bullish_pin_bar",
-                timestamp=bar.name,
-                price=close_price,
-                reliability=reliability,
-                direction="bullish",
-                strength=strength
-            )
-        
-        elif upper_shadow >= 0.66 * total_range:
-            # Bearish pin bar (long upper shadow)
-            reliability = upper_shadow / total_range
-            strength = "strong" if reliability > 0.8 else "moderate"
-            
-            return CandlestickPattern(
-                pattern_type="bearish_pin_bar",
-                timestamp=bar.name,
-                price=close_price,
-                reliability=reliability,
-                direction="bearish",
-                strength=strength
-            )
+        # Doji and pin bars are never classified as weak
+        if pattern_type in ('doji', 'bullish_pin_bar', 'bearish_pin_bar'):
+            return "moderate"
         
-        return None
+        return "moderate" if reliability > 0.5 else "weak"
     
     def calculate_confluence_zones(self, 
                                   factors: List[ConfluenceFactor],
                                   symbol: str,
                                   timeframe: str) -> List[ConfluenceZone]:
-        """Group factors into confluence zones based on price proximity."""
+        """
+        Group factors into confluence zones based on price proximity.
+        
+        Priced factors are sorted by price and swept once: a cluster starts at
+        its lowest price and takes every following factor within
+        confluence_distance of it. O(n log n), and the result does not depend
+        on the order factors were collected in.
+        """
         if not factors:
             return []
         
         zones = []
-        used_factors = set()
         
-        for i, factor in enumerate(factors):
-            if i in used_factors or not factor.price_level:
-                continue
-            
-            # Find nearby factors
-            zone_factors = [factor]
-            zone_price = factor.price_level
-            
-            for j, other_factor in enumerate(factors[i+1:], i+1):
-                if j in used_factors or not other_factor.price_level:
-                    continue
-                
-                price_diff = abs(other_factor.price_level - zone_price) / zone_price
-                if price_diff <= self.confluence_distance:
-                    zone_factors.append(other_factor)
-                    used_factors.add(j)
-            
-            used_factors.add(i)
+        for zone_factors in self._cluster_by_price(factors):
+            zone_price = sum(f.price_level for f in zone_factors) / len(zone_factors)
+            timestamps = [f.timestamp for f in zone_factors if f.timestamp is not None]
             
             # Only create zone if minimum factors met
             if len(zone_factors) >= self.min_factors:
@@ -414,7 +295,7 @@ class ConfluenceEngine:
                 
                 zones.append(ConfluenceZone(
                     price_level=zone_price,
-                    timestamp=factor.timestamp,
+                    timestamp=max(timestamps) if timestamps else None,
                     factors=zone_factors,
                     total_score=total_score,
                     weighted_score=weighted_score,
@@ -426,6 +307,35 @@ class ConfluenceEngine:
         
         return zones
     
+    def _cluster_by_price(self, factors: List[ConfluenceFactor]) -> List[List[ConfluenceFactor]]:
+        """
+        Cluster priced factors with a sort-and-sweep over price.
+        
+        Ties are broken by input position so output is deterministic.
+        """
+        priced = sorted(
+            (f.price_level, position, f)
+            for position, f in enumerate(factors) if f.price_level
+        )
+        
+        clusters = []
+        current: List[ConfluenceFactor] = []
+        anchor_price = 0.0
+        
+        for price, _, factor in priced:
+            if current and (price - anchor_price) / anchor_price <= self.confluence_distance:
+                current.append(factor)
+            else:
+                if current:
+                    clusters.append(current)
+                current = [factor]
+                anchor_price = price
+        
+        if current:
+            clusters.append(current)
+        
+        return clusters
+    
     def generate_visual_markers(self, 
                                confluence_zones: List[ConfluenceZone],
                                candlestick_patterns: List[CandlestickPattern]) -> Dict[str, List[Dict]]:
@@ -570,6 +480,14 @@ class ConfluenceEngine:
         self.individual_factors.extend(all_factors)
         self.candlestick_patterns.extend(candlestick_patterns)
         
+        # Queue for database persistence (written off this thread)
+        if self.writer is not None:
+            try:
+                self.writer.submit(all_factors, confluence_zones, symbol, timeframe, timestamp)
+            except Exception as e:
+                # Persistence problems must not abort the strategy bar
+                logger.error(f"Failed to queue confluence results for persistence: {e}")
+        
         results.update({
             'confluence_zones': [self._serialize_confluence_zone(zone) for zone in confluence_zones],
             'candlestick_patterns': [self._serialize_candlestick_pattern(pattern) for pattern in candlestick_patterns],
@@ -584,7 +502,7 @@ class ConfluenceEngine:
         """Serialize confluence zone for JSON response."""
         return {
             'price_level': zone.price_level,
-            'timestamp': zone.timestamp.isoformat(),
+            'timestamp': zone.timestamp.isoformat() if zone.timestamp is not None else None,
             'total_score': zone.total_score,
             'weighted_score': zone.weighted_score,
             'strength': zone.strength.value,
@@ -600,6 +518,18 @@ class ConfluenceEngine:
             ]
         }
     
+    def _serialize_confluence_factor(self, factor: ConfluenceFactor) -> Dict:
+        """Serialize confluence factor for history storage."""
+        return {
+            'factor_type': factor.factor_type.value,
+            'timestamp': factor.timestamp.isoformat() if factor.timestamp is not None else None,
+            'value': factor.value,
+            'weight': factor.weight,
+            'confidence': factor.confidence,
+            'description': factor.description,
+            'price_level': factor.price_level
+        }
+    
     def _serialize_candlestick_pattern(self, pattern: CandlestickPattern) -> Dict:
         """Serialize candlestick pattern for JSON response."""
         return {
@@ -612,8 +542,43 @@ class ConfluenceEngine:
             'confirmation': pattern.confirmation
         }
     
+    def query_history(self,
+                      kind: str,
+                      start: Optional[pd.Timestamp] = None,
+                      end: Optional[pd.Timestamp] = None,
+                      limit: Optional[int] = None) -> List[Dict]:
+        """
+        Query stored analysis history across memory and spilled entries.
+        
+        Args:
+            kind: 'confluence_zones', 'confluence_factors' or 'candlestick_patterns'
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+            limit: Return only the most recent N records
+            
+        Returns:
+            Serialized records in chronological order
+        """
+        histories = {
+            'confluence_zones': self.confluence_zones,
+            'confluence_factors': self.individual_factors,
+            'candlestick_patterns': self.candlestick_patterns
+        }
+        if kind not in histories:
+            raise ValueError(f"Unknown history kind: {kind}")
+        
+        return histories[kind].query(start, end, limit)
+    
+    def flush_history(self):
+        """Write buffered evicted history entries to the spill store."""
+        self.confluence_zones.flush()
+        self.individual_factors.flush()
+        self.candlestick_patterns.flush()
+    
     def reset(self):
         """Reset engine state for new analysis."""
         self.confluence_zones.clear()
         self.individual_factors.clear()
-        self.candlestick_patterns.clear()
\ No newline at end of file
+        self.candlestick_patterns.clear()
+        self.features.reset()
+        self.pattern_scanner.reset()
\ No newline at end of file
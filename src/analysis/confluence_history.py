@@ -0,0 +1,287 @@
+"""
+Confluence History Retention
+Bounded in-memory history for confluence analysis results with spill-to-disk.
+
+Recent entries are kept in a ring buffer of configurable size. Entries pushed
+out of the window are serialized and written in batches to a spill store, and
+query() reads back across disk and memory.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class HistorySpillStore(ABC):
+    """Abstract base class for history spill backends."""
+
+    @abstractmethod
+    def write(self, kind: str, records: List[Dict]) -> bool:
+        """Persist a batch of serialized records."""
+
+    @abstractmethod
+    def read(self, kind: str,
+             start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None) -> List[Dict]:
+        """Read records in chronological order, optionally filtered by timestamp."""
+
+
+class ParquetSpillStore(HistorySpillStore):
+    """
+    Parquet-based spill store.
+
+    Each batch is written to its own file ({kind}_{sequence}.parquet) with a
+    timestamp column for range filtering and the record as a JSON string, so
+    nested records (zone factors) round-trip unchanged.
+
+    Range reads skip files whose first/last timestamps fall outside the range
+    and push the filter down into the Parquet reader for the rest, so query
+    cost follows the matching history rather than all of it.
+    """
+
+    def __init__(self, base_path: Union[str, Path]):
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self._sequence: Dict[str, int] = {}
+
+        # First/last timestamp of each spill file (files from earlier runs
+        # are indexed on first read)
+        self._ranges: Dict[Path, Tuple[pd.Timestamp, pd.Timestamp]] = {}
+
+    def _files(self, kind: str) -> List[Path]:
+        """Spill files for a history kind in write order."""
+        return sorted(self.base_path.glob(f"{kind}_*.parquet"))
+
+    def _next_sequence(self, kind: str) -> int:
+        """Sequence number after the highest one already on disk for a kind."""
+        sequences = [
+            int(suffix) for suffix in
+            (file_path.stem.rsplit('_', 1)[-1] for file_path in self._files(kind))
+            if suffix.isdigit()
+        ]
+        return max(sequences) + 1 if sequences else 0
+
+    def write(self, kind: str, records: List[Dict]) -> bool:
+        """Write a batch of records to a new Parquet file."""
+        if not records:
+            return True
+
+        try:
+            if kind not in self._sequence:
+                self._sequence[kind] = self._next_sequence(kind)
+            file_path = self.base_path / f"{kind}_{self._sequence[kind]:08d}.parquet"
+
+            data = pd.DataFrame({
+                'timestamp': pd.to_datetime([record.get('timestamp') for record in records]),
+                'record': [json.dumps(record, default=str) for record in records]
+            })
+            data.to_parquet(file_path, compression='snappy', index=False)
+            self._ranges[file_path] = (data['timestamp'].min(), data['timestamp'].max())
+            self._sequence[kind] += 1
+
+            logger.debug(f"Spilled {len(records)} {kind} records to {file_path.name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error spilling {kind} history: {e}")
+            return False
+
+    def read(self, kind: str,
+             start: Optional[pd.Timestamp] = None,
+             end: Optional[pd.Timestamp] = None) -> List[Dict]:
+        """Read spilled records in the timestamp range from the Parquet files of a kind."""
+        records = []
+
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', start))
+        if end is not None:
+            filters.append(('timestamp', '<=', end))
+
+        for file_path in self._files(kind):
+            try:
+                first, last = self._range(file_path) if filters else (None, None)
+            except Exception as e:
+                logger.error(f"Error reading {file_path.name}: {e}")
+                continue
+
+            if filters and (pd.isna(first) or (start is not None and last < start) or
+                            (end is not None and first > end)):
+                continue
+
+            try:
+                data = pd.read_parquet(file_path, columns=['record'], filters=filters or None)
+            except Exception as e:
+                logger.error(f"Error reading {file_path.name}: {e}")
+                continue
+
+            records.extend(json.loads(record) for record in data['record'])
+
+        return records
+
+    def _range(self, file_path: Path) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """First and last timestamp of a spill file (NaT if it has none)."""
+        if file_path not in self._ranges:
+            timestamps = pd.read_parquet(file_path, columns=['timestamp'])['timestamp']
+            self._ranges[file_path] = (timestamps.min(), timestamps.max())
+        return self._ranges[file_path]
+
+
+class BoundedHistory:
+    """
+    Ring buffer of recent history entries with optional spill-to-disk.
+
+    Behaves like a read-only list for the retained window (len, iteration,
+    indexing, slicing) and supports extend/append/clear so it can replace the
+    unbounded lists analysis components used to keep.
+    """
+
+    def __init__(self,
+                 kind: str,
+                 max_items: int = 10000,
+                 serializer: Optional[Callable[[Any], Dict]] = None,
+                 spill_store: Optional[HistorySpillStore] = None,
+                 spill_batch_size: int = 1000):
+        """
+        Initialize bounded history.
+
+        Args:
+            kind: History name, used as the spill file/table key
+            max_items: Number of entries kept in memory
+            serializer: Converts an entry to a JSON-compatible dict (entries
+                are assumed to already be dicts if omitted)
+            spill_store: Where evicted entries are written (dropped if None)
+            spill_batch_size: Evicted entries buffered before a spill write
+        """
+        if max_items <= 0:
+            raise ValueError(f"max_items must be positive, got {max_items}")
+        if spill_batch_size <= 0:
+            raise ValueError(f"spill_batch_size must be positive, got {spill_batch_size}")
+
+        self.kind = kind
+        self.max_items = max_items
+        self.serializer = serializer or (lambda entry: entry)
+        self.spill_store = spill_store
+        self.spill_batch_size = spill_batch_size
+
+        self._items: Deque[Any] = deque()
+        self._pending: List[Dict] = []
+        self.total_spilled = 0
+        self.total_dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        return self._items[index]
+
+    def append(self, entry: Any) -> None:
+        """Add an entry, evicting the oldest if the window is full."""
+        self._items.append(entry)
+        if len(self._items) > self.max_items:
+            self._evict(len(self._items) - self.max_items)
+
+    def extend(self, entries) -> None:
+        """Add entries, evicting the oldest beyond the window."""
+        self._items.extend(entries)
+        if len(self._items) > self.max_items:
+            self._evict(len(self._items) - self.max_items)
+
+    def clear(self) -> None:
+        """Clear the in-memory window (evicted entries are flushed first)."""
+        self.flush()
+        self._items.clear()
+        self._pending.clear()
+
+    def flush(self) -> None:
+        """Write any buffered evicted entries to the spill store."""
+        if not self._pending or self.spill_store is None:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._write(batch)
+
+    def query(self,
+              start: Optional[pd.Timestamp] = None,
+              end: Optional[pd.Timestamp] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Read history across spilled and in-memory entries.
+
+        Args:
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+            limit: Return only the most recent N matching records
+
+        Returns:
+            Serialized records in chronological order
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        records = []
+        if self.spill_store is not None:
+            records.extend(self.spill_store.read(self.kind, start, end))
+
+        recent = self._pending + [self.serializer(entry) for entry in self._items]
+        records.extend(record for record in recent if self._in_range(record, start, end))
+
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return records
+
+    def _evict(self, count: int) -> None:
+        """Move the oldest entries out of the window."""
+        evicted = [self._items.popleft() for _ in range(count)]
+
+        if self.spill_store is None:
+            self.total_dropped += count
+            return
+
+        self._pending.extend(self.serializer(entry) for entry in evicted)
+        while len(self._pending) >= self.spill_batch_size:
+            batch = self._pending[:self.spill_batch_size]
+            self._pending = self._pending[self.spill_batch_size:]
+            self._write(batch)
+
+    def _write(self, batch: List[Dict]) -> None:
+        """Write one batch to the spill store, counting failures as dropped."""
+        if self.spill_store.write(self.kind, batch):
+            self.total_spilled += len(batch)
+        else:
+            self.total_dropped += len(batch)
+
+    @staticmethod
+    def _in_range(record: Dict,
+                  start: Optional[pd.Timestamp],
+                  end: Optional[pd.Timestamp]) -> bool:
+        """Check whether a record's timestamp falls in [start, end]."""
+        if start is None and end is None:
+            return True
+
+        timestamp = record.get('timestamp')
+        if timestamp is None:
+            return False
+
+        timestamp = pd.Timestamp(timestamp)
+        if start is not None and timestamp < start:
+            return False
+        if end is not None and timestamp > end:
+            return False
+        return True
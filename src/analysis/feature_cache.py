@@ -0,0 +1,403 @@
+"""
+Rolling Feature Cache
+Per-dataset cache of bar features shared by the analysis components.
+
+Features are computed once per dataset and extended incrementally as bars are
+appended: raw OHLCV columns, true range, ATR, candle body/range ratios and
+prefix sums that turn any rolling window mean into an O(1) lookup.
+
+Besides the raw columns, window sums/counts are available for true_range,
+body_range_ratio, close_gain and close_loss (close-to-close changes above and
+below zero; the count of a window is the number of up or down closes).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Minimum ATR value to avoid division by zero downstream
+MIN_ATR = 0.00001
+
+
+class FeatureCache:
+    """
+    Incrementally maintained bar features for one dataset.
+
+    Call update(df) before reading; it detects whether df is the dataset
+    already cached, an extension of it (bars appended, last bar possibly
+    revised) or a different dataset, and recomputes only what changed.
+
+    Consumers that derive their own arrays from the cache can track
+    `generation` (bumped on full recompute) and `revision` (bumped on any
+    change) to refresh incrementally as well.
+
+    By default a dataset is recognised by object identity plus a fingerprint
+    of its first/last labels and edge rows. With verify_content=True every
+    cached row is compared as well, so a frame edited in place or a different
+    frame that happens to share the fingerprint is never served stale values.
+    """
+
+    def __init__(self, initial_capacity: int = 1024, verify_content: bool = False):
+        """
+        Initialize feature cache.
+
+        Args:
+            initial_capacity: Initial number of bars to allocate storage for
+            verify_content: Compare all cached raw values on update (O(n)
+                vectorized) instead of trusting identity and fingerprint
+        """
+        self._capacity = max(1, initial_capacity)
+        self.verify_content = verify_content
+        self._size = 0
+        self._columns: List[str] = []
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._prefix: Dict[str, np.ndarray] = {}
+        self._prefix_count: Dict[str, np.ndarray] = {}
+        self._atr: Dict[int, np.ndarray] = {}
+        self._ewm: Dict[int, np.ndarray] = {}
+
+        self.generation = 0
+        self.revision = 0
+
+        # Fingerprint of the cached dataset for append detection
+        self._source: Optional[weakref.ref] = None
+        self._first_label = None
+        self._last_label = None
+        self._last_row: Optional[np.ndarray] = None
+        self._anchor_row: Optional[np.ndarray] = None  # Values of the last settled bar
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def size(self) -> int:
+        """Number of cached bars."""
+        return self._size
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Bring cached features in sync with the DataFrame.
+
+        Repeated calls with the same, unmodified DataFrame object are O(1);
+        the last bar is still compared, so one revised in place is picked
+        up. Appended bars are computed incrementally; the last cached bar is
+        recomputed so a still-forming candle stays current.
+
+        Args:
+            df: OHLC DataFrame with columns ['open', 'high', 'low', 'close'],
+                optionally 'volume'
+        """
+        n_bars = len(df)
+
+        # Fast path: same DataFrame object already cached and its last bar
+        # (which may be revised in place while forming) and anchor unchanged
+        if (not self.verify_content and self._source is not None and
+                self._source() is df and n_bars == self._size and
+                self._row_matches(df, n_bars - 1, self._last_row) and
+                (n_bars < 2 or self._row_matches(df, n_bars - 2, self._anchor_row))):
+            return
+
+        if n_bars == 0:
+            self.reset()
+            return
+
+        columns = [column for column in OHLCV_COLUMNS if column in df.columns]
+
+        if columns == self._columns and self._is_unchanged(df, n_bars):
+            self._source = weakref.ref(df)
+            return
+
+        if columns == self._columns and self._is_extension(df, n_bars):
+            self._compute(df, self._size - 1)
+        else:
+            self._columns = columns
+            self._arrays.clear()
+            self._prefix.clear()
+            self._prefix_count.clear()
+            self._atr.clear()
+            self._ewm.clear()
+            self.generation += 1
+            self._compute(df, 0)
+
+    def reset(self) -> None:
+        """Clear all cached features."""
+        self._size = 0
+        self._columns = []
+        self._arrays.clear()
+        self._prefix.clear()
+        self._prefix_count.clear()
+        self._atr.clear()
+        self._ewm.clear()
+        self._source = None
+        self._first_label = None
+        self._last_label = None
+        self._last_row = None
+        self._anchor_row = None
+        self.generation += 1
+        self.revision += 1
+
+    def has_column(self, name: str) -> bool:
+        """Check whether a raw column is cached."""
+        return name in self._columns
+
+    def column(self, name: str) -> np.ndarray:
+        """Get raw column values as float64 array."""
+        return self._arrays[name][:self._size]
+
+    @property
+    def true_range(self) -> np.ndarray:
+        """True range (first bar uses high - low)."""
+        return self._arrays['true_range'][:self._size]
+
+    @property
+    def body(self) -> np.ndarray:
+        """Absolute candle body size."""
+        return self._arrays['body'][:self._size]
+
+    @property
+    def candle_range(self) -> np.ndarray:
+        """Candle high - low."""
+        return self._arrays['candle_range'][:self._size]
+
+    @property
+    def body_range_ratio(self) -> np.ndarray:
+        """Body / range ratio (NaN where range is zero)."""
+        return self._arrays['body_range_ratio'][:self._size]
+
+    def window_sum(self, name: str, start: int, end: int) -> float:
+        """Sum of a column over rows [start, end), skipping NaN."""
+        start = max(0, start)
+        end = min(end, self._size)
+        if end <= start:
+            return 0.0
+        prefix = self._prefix[name]
+        return float(prefix[end] - prefix[start])
+
+    def window_count(self, name: str, start: int, end: int) -> int:
+        """Number of non-NaN values of a column over rows [start, end)."""
+        start = max(0, start)
+        end = min(end, self._size)
+        if end <= start:
+            return 0
+        counts = self._prefix_count[name]
+        return int(counts[end] - counts[start])
+
+    def window_sums(self, name: str, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Vectorized window_sum over arrays of [start, end) bounds."""
+        starts = np.clip(starts, 0, self._size)
+        ends = np.maximum(np.clip(ends, 0, self._size), starts)
+        prefix = self._prefix[name]
+        return prefix[ends] - prefix[starts]
+
+    def window_counts(self, name: str, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Vectorized window_count over arrays of [start, end) bounds."""
+        starts = np.clip(starts, 0, self._size)
+        ends = np.maximum(np.clip(ends, 0, self._size), starts)
+        counts = self._prefix_count[name]
+        return counts[ends] - counts[starts]
+
+    def window_mean(self, name: str, start: int, end: int) -> float:
+        """
+        Mean of a column over rows [start, end), skipping NaN.
+
+        Returns NaN for an empty window (matching pandas mean()).
+        """
+        count = self.window_count(name, start, end)
+        if count == 0:
+            return np.nan
+        return self.window_sum(name, start, end) / count
+
+    def rolling_mean(self, name: str, window: int) -> np.ndarray:
+        """
+        Trailing rolling mean including the current bar.
+
+        Bars with fewer than `window` preceding rows use all available rows.
+        """
+        ends = np.arange(1, self._size + 1)
+        starts = np.maximum(0, ends - window)
+        sums = self._prefix[name][ends] - self._prefix[name][starts]
+        counts = self._prefix_count[name][ends] - self._prefix_count[name][starts]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def atr(self, period: int) -> np.ndarray:
+        """
+        Average True Range for the given period.
+
+        Exponential moving average of true range (span=period), with a simple
+        cumulative average over the first `period` bars to avoid extreme warmup
+        values, floored at MIN_ATR.
+        """
+        if period not in self._atr:
+            self._atr[period] = np.empty(self._capacity)
+            self._ewm[period] = np.empty(self._capacity)
+            if self._size > 0:
+                self._compute_atr(period, 0)
+        return self._atr[period][:self._size]
+
+    def _is_unchanged(self, df: pd.DataFrame, n_bars: int) -> bool:
+        """Check whether the DataFrame matches what is cached."""
+        return (
+            self._size == n_bars and
+            df.index[0] == self._first_label and
+            df.index[-1] == self._last_label and
+            self._row_matches(df, n_bars - 1, self._last_row) and
+            (n_bars < 2 or self._row_matches(df, n_bars - 2, self._anchor_row)) and
+            (not self.verify_content or self._rows_match(df, n_bars))
+        )
+
+    def _is_extension(self, df: pd.DataFrame, n_bars: int) -> bool:
+        """Check whether the DataFrame extends the cached bars."""
+        return (
+            self._size > 0 and
+            n_bars >= self._size and
+            df.index[0] == self._first_label and
+            df.index[self._size - 1] == self._last_label and
+            (self._size < 2 or self._row_matches(df, self._size - 2, self._anchor_row)) and
+            (not self.verify_content or self._rows_match(df, self._size - 1))
+        )
+
+    def _row_values(self, index: int) -> np.ndarray:
+        """Cached raw column values at a row."""
+        return np.array([self._arrays[name][index] for name in self._columns])
+
+    def _row_matches(self, df: pd.DataFrame, index: int, row: Optional[np.ndarray]) -> bool:
+        """Check whether a DataFrame row matches cached raw values."""
+        if row is None:
+            return False
+        values = np.array([df[name].iat[index] for name in self._columns], dtype=np.float64)
+        return np.array_equal(values, row, equal_nan=True)
+
+    def _rows_match(self, df: pd.DataFrame, n_rows: int) -> bool:
+        """Check whether the first n_rows of every cached raw column match."""
+        for name in self._columns:
+            values = df[name].to_numpy(dtype=np.float64)[:n_rows]
+            if not np.array_equal(values, self._arrays[name][:n_rows], equal_nan=True):
+                return False
+        return True
+
+    def _compute(self, df: pd.DataFrame, start: int) -> None:
+        """Compute features for rows start..len(df)-1."""
+        n_bars = len(df)
+        self._ensure_capacity(n_bars)
+
+        for name in self._columns:
+            if name not in self._arrays:
+                self._arrays[name] = np.empty(self._capacity)
+            values = df[name].to_numpy(dtype=np.float64)[start:]
+            self._arrays[name][start:n_bars] = values
+            self._update_prefix(name, values, start)
+
+        for name in ('true_range', 'body', 'candle_range', 'body_range_ratio'):
+            if name not in self._arrays:
+                self._arrays[name] = np.empty(self._capacity)
+
+        open_ = self._arrays['open'][start:n_bars]
+        high = self._arrays['high'][start:n_bars]
+        low = self._arrays['low'][start:n_bars]
+        close = self._arrays['close'][start:n_bars]
+
+        candle_range = high - low
+        body = np.abs(close - open_)
+        self._arrays['candle_range'][start:n_bars] = candle_range
+        self._arrays['body'][start:n_bars] = body
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_range_ratio = np.where(candle_range != 0, body / candle_range, np.nan)
+        self._arrays['body_range_ratio'][start:n_bars] = body_range_ratio
+        self._update_prefix('body_range_ratio', body_range_ratio, start)
+
+        # True range needs the previous close; first bar uses high - low
+        prev_close = np.empty(n_bars - start)
+        prev_close[1:] = close[:-1]
+        prev_close[0] = self._arrays['close'][start - 1] if start > 0 else np.nan
+        true_range = np.maximum(
+            candle_range,
+            np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+        )
+        if start == 0:
+            true_range[0] = candle_range[0]
+        self._arrays['true_range'][start:n_bars] = true_range
+        self._update_prefix('true_range', true_range, start)
+
+        # Close-to-close gains and losses; NaN on the other side keeps them out
+        # of the window count (first bar has no change)
+        close_change = close - prev_close
+        self._update_prefix('close_gain', np.where(close_change > 0, close_change, np.nan), start)
+        self._update_prefix('close_loss', np.where(close_change < 0, -close_change, np.nan), start)
+
+        self._size = n_bars
+
+        for period in self._atr:
+            self._compute_atr(period, start)
+
+        self._source = weakref.ref(df)
+        self._first_label = df.index[0]
+        self._last_label = df.index[-1]
+        self._last_row = self._row_values(n_bars - 1)
+        self._anchor_row = self._row_values(n_bars - 2) if n_bars >= 2 else None
+        self.revision += 1
+
+        logger.debug(f"Computed features for bars {start}-{n_bars - 1}")
+
+    def _update_prefix(self, name: str, values: np.ndarray, start: int) -> None:
+        """Extend prefix sum and non-NaN count of a feature from row start."""
+        if name not in self._prefix:
+            self._prefix[name] = np.zeros(self._capacity + 1)
+            self._prefix_count[name] = np.zeros(self._capacity + 1, dtype=np.int64)
+
+        end = start + len(values)
+        valid = ~np.isnan(values)
+        self._prefix[name][start + 1:end + 1] = (
+            self._prefix[name][start] + np.cumsum(np.where(valid, values, 0.0))
+        )
+        self._prefix_count[name][start + 1:end + 1] = (
+            self._prefix_count[name][start] + np.cumsum(valid)
+        )
+
+    def _compute_atr(self, period: int, start: int) -> None:
+        """Compute ATR for rows start..size-1, continuing the EWM recursion."""
+        n_bars = self._size
+        true_range = self._arrays['true_range'][start:n_bars]
+        ewm = self._ewm[period]
+
+        if start == 0:
+            ewm[:n_bars] = pd.Series(true_range).ewm(span=period, adjust=False).mean().to_numpy()
+        else:
+            # Seed the recursion with the previous EWM value
+            seeded = np.concatenate(([ewm[start - 1]], true_range))
+            ewm[start:n_bars] = pd.Series(seeded).ewm(span=period, adjust=False).mean().to_numpy()[1:]
+
+        atr = ewm[start:n_bars].copy()
+
+        # For very early bars, use simple cumulative average of true range
+        warmup_end = min(period, n_bars)
+        if start < warmup_end:
+            rows = np.arange(max(start, 1), warmup_end)
+            atr[rows - start] = self._prefix['true_range'][rows + 1] / (rows + 1)
+
+        self._atr[period][start:n_bars] = np.maximum(atr, MIN_ATR)
+
+    def _ensure_capacity(self, n_bars: int) -> None:
+        """Grow storage geometrically so appends stay amortized O(1)."""
+        if n_bars <= self._capacity:
+            return
+
+        new_capacity = max(n_bars, self._capacity * 2)
+
+        def grow(array: np.ndarray, extra: int = 0) -> np.ndarray:
+            grown = np.zeros(new_capacity + extra, dtype=array.dtype)
+            grown[:self._size + extra] = array[:self._size + extra]
+            return grown
+
+        self._arrays = {name: grow(array) for name, array in self._arrays.items()}
+        self._prefix = {name: grow(array, 1) for name, array in self._prefix.items()}
+        self._prefix_count = {name: grow(array, 1) for name, array in self._prefix_count.items()}
+        self._atr = {period: grow(array) for period, array in self._atr.items()}
+        self._ewm = {period: grow(array) for period, array in self._ewm.items()}
+        self._capacity = new_capacity
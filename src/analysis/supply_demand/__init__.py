@@ -8,8 +8,12 @@ Identifies areas where large institutional orders create supply/demand imbalance
 from .base_candle_detector import BaseCandleDetector, BaseCandleRange
 from .big_move_detector import BigMoveDetector, BigMove
 from .zone_detector import SupplyDemandZoneDetector, SupplyDemandZone
-from .zone_state_manager import ZoneStateManager, ZoneStateUpdate, ZoneTestEvent
+from .zone_pipeline import IncrementalZonePipeline, ZoneEvent
+from .batch_detector import BatchZoneDetector
+from .zone_cache import ZoneSetCache
+from .zone_state_manager import ZoneStateManager, ZoneStateUpdate, ZoneTestEvent, HistoryRetentionPolicy
 from .repository import SupplyDemandRepository, ZoneQueryFilter, ZoneHistoryQuery
+from .zone_history_writer import ZoneHistoryWriter
 from .confluence_integration import SupplyDemandConfluence, SDZoneConfluenceScore, SDZoneProximity
 # from .rectangle_manager import SupplyDemandRectangleManager  # Module not yet implemented
 
@@ -23,12 +27,18 @@ __all__ = [
     "BigMove",
     "SupplyDemandZoneDetector",
     "SupplyDemandZone",
+    "IncrementalZonePipeline",
+    "ZoneEvent",
+    "BatchZoneDetector",
+    "ZoneSetCache",
     "ZoneStateManager",
     "ZoneStateUpdate",
     "ZoneTestEvent",
+    "HistoryRetentionPolicy",
     "SupplyDemandRepository",
     "ZoneQueryFilter",
     "ZoneHistoryQuery",
+    "ZoneHistoryWriter",
     "SupplyDemandConfluence",
     "SDZoneConfluenceScore",
     "SDZoneProximity",
@@ -14,6 +14,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from ..feature_cache import FeatureCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,7 +76,7 @@ class BaseCandleDetector:
         self.max_base_candles = max_base_candles
         self.body_size_threshold = body_size_threshold
         self.atr_period = atr_period
-        self._atr_cache: Optional[pd.Series] = None
+        self.feature_cache = FeatureCache(verify_content=True)
         
         logger.debug(f"BaseCandleDetector initialized with consolidation_threshold={consolidation_threshold}")
     
@@ -138,41 +140,67 @@ class BaseCandleDetector:
             logger.warning(f"Insufficient data for ATR calculation: {len(df)} < {self.atr_period}")
             return []
         
-        # Calculate ATR for volatility baseline
-        atr_series = self._calculate_atr(df)
-        
-        # Find consolidation ranges
-        ranges = []
-        i = start_index
-        
-        while i <= end_index - self.min_base_candles:
-            # Look for start of consolidation
-            if self._is_consolidation_candle(df.iloc[i], atr_series.iloc[i]):
-                # Found potential start, look for consecutive consolidation candles
-                consolidation_end = self._find_consolidation_end(df, atr_series, i, end_index)
-                
-                if consolidation_end is not None:
-                    candle_count = consolidation_end - i + 1
-                    
-                    # Validate minimum length
-                    if candle_count >= self.min_base_candles:
-                        # Create and validate range
-                        base_range = self._create_base_range(df, atr_series, i, consolidation_end)
-                        
-                        if base_range.consolidation_score >= 0.3:  # Minimum quality threshold
-                            ranges.append(base_range)
-                            logger.debug(f"Detected base candle range: {i}-{consolidation_end} ({candle_count} candles)")
-                    
-                    # Move past this range
-                    i = consolidation_end + 1
-                else:
-                    i += 1
-            else:
-                i += 1
+        # Consolidation mask for the detection window, judged against ATR
+        self.feature_cache.update(df)
+        atr = self.feature_cache.atr(self.atr_period)
+        mask = self._consolidation_mask(atr, start_index, end_index + 1)
+        
+        # Candidate ranges from runs of consolidation candles
+        starts, ends = self._find_consolidation_runs(mask, start_index, end_index)
+        
+        # Score candidates and keep those above the minimum quality threshold
+        ranges = self._create_base_ranges(df, starts, ends, atr)
         
         logger.info(f"Detected {len(ranges)} base candle ranges in {len(df)} bars")
         return ranges
     
+    def _create_base_ranges(
+        self, 
+        df: pd.DataFrame, 
+        starts: np.ndarray, 
+        ends: np.ndarray, 
+        atr: np.ndarray
+    ) -> List[BaseCandleRange]:
+        """
+        Score candidate ranges and create those above the minimum quality threshold.
+        
+        Args:
+            df: OHLC DataFrame
+            starts: Start index of each candidate range
+            ends: End index of each candidate range
+            atr: ATR values aligned with the feature cache
+            
+        Returns:
+            List of BaseCandleRange objects
+        """
+        if len(starts) == 0:
+            return []
+        
+        highs, lows, atr_means, scores = self._score_base_ranges(starts, ends, atr)
+        keep = scores >= 0.3
+        starts, ends = starts[keep], ends[keep]
+        
+        start_times = df['time'].iloc[starts].tolist()
+        end_times = df['time'].iloc[ends].tolist()
+        
+        return [
+            BaseCandleRange(
+                start_index=int(start),
+                end_index=int(end),
+                start_time=start_time,
+                end_time=end_time,
+                high=high,
+                low=low,
+                atr_at_creation=atr_at_creation,
+                candle_count=int(end - start + 1),
+                consolidation_score=float(score)
+            )
+            for start, end, start_time, end_time, high, low, atr_at_creation, score in zip(
+                starts, ends, start_times, end_times,
+                highs[keep], lows[keep], atr_means[keep], scores[keep]
+            )
+        ]
+    
     def _validate_input_data(self, df: pd.DataFrame) -> None:
         """Validate input OHLC data"""
         if df is None or len(df) == 0:
@@ -206,32 +234,11 @@ class BaseCandleDetector:
         Returns:
             Series with ATR values
         """
-        if self._atr_cache is not None and len(self._atr_cache) == len(df):
-            return self._atr_cache
-        
-        # Calculate True Range
-        high_low = df['high'] - df['low']
-        high_close_prev = np.abs(df['high'] - df['close'].shift(1))
-        low_close_prev = np.abs(df['low'] - df['close'].shift(1))
-        
-        true_range = np.maximum(high_low, np.maximum(high_close_prev, low_close_prev))
-        
-        # Handle first bar (no previous close)
-        true_range.iloc[0] = high_low.iloc[0]
-        
-        # Calculate ATR using exponential moving average
-        atr_series = true_range.ewm(span=self.atr_period, adjust=False).mean()
-        
-        # For very early bars, use simple average to avoid extreme values
-        for i in range(min(self.atr_period, len(atr_series))):
-            if i > 0:
-                atr_series.iloc[i] = true_range.iloc[:i+1].mean()
-        
-        # Ensure no zero ATR values (minimum threshold)
-        atr_series = np.maximum(atr_series, 0.00001)
+        # True range and ATR are computed once per dataset and extended on append
+        self.feature_cache.update(df)
+        atr_values = self.feature_cache.atr(self.atr_period)
         
-        self._atr_cache = atr_series
-        return atr_series
+        return pd.Series(atr_values, index=df.index, copy=True)
     
     def _is_consolidation_candle(
         self, 
@@ -267,93 +274,153 @@ class BaseCandleDetector:
         
         return True
     
-    def _find_consolidation_end(
+    def _consolidation_mask(
         self, 
-        df: pd.DataFrame, 
-        atr_series: pd.Series, 
-        start_index: int, 
-        max_end_index: int
-    ) -> Optional[int]:
+        atr: np.ndarray, 
+        start: int = 0, 
+        end: Optional[int] = None
+    ) -> np.ndarray:
         """
-        Find the end index of a consolidation range starting at start_index.
+        Vectorized _is_consolidation_candle over cached bars [start, end).
         
         Args:
-            df: OHLC DataFrame
-            atr_series: ATR values
-            start_index: Start of potential consolidation
-            max_end_index: Maximum end index to consider
+            atr: ATR values aligned with the feature cache
+            start: First bar of the window
+            end: Bar after the window (None = all cached bars)
             
         Returns:
-            End index of consolidation or None if not found
+            Boolean array for the window, True where the candle qualifies as consolidation
         """
-        end_index = start_index
-        max_search_end = min(start_index + self.max_base_candles - 1, max_end_index)
-        
-        # Extend as long as candles qualify as consolidation
-        for i in range(start_index + 1, max_search_end + 1):
-            if i >= len(df) or i >= len(atr_series):
-                break
-                
-            if self._is_consolidation_candle(df.iloc[i], atr_series.iloc[i]):
-                end_index = i
-            else:
-                break
-        
-        # Return end index only if we have minimum candles
-        if end_index - start_index + 1 >= self.min_base_candles:
-            return end_index
-        
-        return None
+        window = slice(start, end)
+        atr = atr[window]
+        candle_range = self.feature_cache.candle_range[window]
+        candle_body = self.feature_cache.body[window]
+        
+        # Written as negated rejections so NaN handling matches the scalar check
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rejected = (
+                (atr <= 0) |
+                (candle_range / atr > self.consolidation_threshold) |
+                (candle_body / atr > self.body_size_threshold)
+            )
+        return ~rejected
     
-    def _create_base_range(
+    def _find_consolidation_runs(
         self, 
-        df: pd.DataFrame, 
-        atr_series: pd.Series, 
+        mask: np.ndarray, 
         start_index: int, 
         end_index: int
-    ) -> BaseCandleRange:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Create BaseCandleRange object from detected consolidation.
+        Find consolidation ranges from runs of consecutive consolidation candles.
+        
+        Runs are split into ranges of at most max_base_candles (see
+        _split_consolidation_runs); a range is kept if it has at least
+        min_base_candles and starts no later than end_index - min_base_candles.
         
         Args:
-            df: OHLC DataFrame
-            atr_series: ATR values
-            start_index: Start of consolidation
-            end_index: End of consolidation
+            mask: Consolidation mask for bars start_index..end_index
+            start_index: First bar to consider
+            end_index: Last bar to consider
             
         Returns:
-            BaseCandleRange object
+            Tuple of (start indices, end indices) of candidate ranges
         """
-        range_data = df.iloc[start_index:end_index+1]
-        
-        # Calculate range boundaries
-        high = range_data['high'].max()
-        low = range_data['low'].min()
-        
-        # Get time boundaries
-        start_time = df.iloc[start_index]['time']
-        end_time = df.iloc[end_index]['time']
-        
-        # Calculate average ATR for the range
-        atr_at_creation = atr_series.iloc[start_index:end_index+1].mean()
-        
-        # Calculate candle count
-        candle_count = end_index - start_index + 1
-        
-        # Calculate consolidation score
-        consolidation_score = self._validate_base_range(range_data)
-        
-        return BaseCandleRange(
-            start_index=start_index,
-            end_index=end_index,
-            start_time=start_time,
-            end_time=end_time,
-            high=high,
-            low=low,
-            atr_at_creation=atr_at_creation,
-            candle_count=candle_count,
-            consolidation_score=consolidation_score
+        starts, ends = self._split_consolidation_runs(mask, start_index)
+        
+        valid = (
+            (ends - starts + 1 >= self.min_base_candles) &
+            (starts <= end_index - self.min_base_candles)
         )
+        return starts[valid], ends[valid]
+    
+    def _split_consolidation_runs(
+        self, 
+        mask: np.ndarray, 
+        start_index: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split runs of consolidation candles into chunks of max_base_candles.
+        
+        Scanning left to right, a chunk starts at the first candle of a run
+        or right after the previous chunk of the same run.
+        
+        Args:
+            mask: Consolidation mask for a window of bars
+            start_index: Bar index of the first mask entry
+            
+        Returns:
+            Tuple of (start indices, end indices) of all chunks
+        """
+        # Run-length encoding: +1 marks a run start, -1 the bar after a run end
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1) + start_index
+        run_ends = np.flatnonzero(edges == -1) - 1 + start_index
+        
+        run_lengths = run_ends - run_starts + 1
+        chunk_counts = -(-run_lengths // self.max_base_candles)
+        chunk_offsets = np.arange(chunk_counts.sum()) - np.repeat(
+            np.cumsum(chunk_counts) - chunk_counts, chunk_counts
+        )
+        starts = np.repeat(run_starts, chunk_counts) + chunk_offsets * self.max_base_candles
+        ends = np.minimum(
+            starts + self.max_base_candles - 1,
+            np.repeat(run_ends, chunk_counts)
+        )
+        return starts, ends
+    
+    def _score_base_ranges(
+        self, 
+        starts: np.ndarray, 
+        ends: np.ndarray, 
+        atr: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized _validate_base_range over disjoint candidate ranges.
+        
+        Args:
+            starts: Start index of each range
+            ends: End index of each range (ranges must not overlap)
+            atr: ATR values aligned with the feature cache
+            
+        Returns:
+            Tuple of (high, low, mean ATR, consolidation score) per range
+        """
+        lengths = ends - starts + 1
+        offsets = np.cumsum(lengths) - lengths
+        rows = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        
+        high = np.maximum.reduceat(self.feature_cache.column('high')[rows], offsets)
+        low = np.minimum.reduceat(self.feature_cache.column('low')[rows], offsets)
+        atr_means = np.add.reduceat(atr[rows], offsets) / lengths
+        
+        # Range tightness (tighter = higher score), normalized to 1% range
+        avg_price = (high + low) / 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            range_percentage = (high - low) / avg_price
+        tightness_score = np.maximum(0.0, 1.0 - (range_percentage / 0.01))
+        
+        # Body size consistency (sample std; single-candle ranges count as consistent)
+        body_sizes = self.feature_cache.body[rows]
+        body_means = np.add.reduceat(body_sizes, offsets) / lengths
+        deviations = body_sizes - np.repeat(body_means, lengths)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_std = np.sqrt(np.add.reduceat(deviations * deviations, offsets) / (lengths - 1))
+            body_consistency = 1.0 - (body_std / (body_means + 0.00001))
+        body_consistency = np.where(
+            np.isnan(body_consistency), 1.0, np.clip(body_consistency, 0.0, 1.0)
+        )
+        
+        time_consistency = 0.8  # Assume good consistency for now
+        
+        scores = (
+            tightness_score * 0.5 +
+            body_consistency * 0.3 +
+            time_consistency * 0.2
+        )
+        scores = np.where(avg_price > 0, np.clip(scores, 0.0, 1.0), 0.0)
+        
+        return high, low, atr_means, scores
     
     def _validate_base_range(self, candles: pd.DataFrame) -> float:
         """
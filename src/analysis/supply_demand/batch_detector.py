@@ -0,0 +1,369 @@
+"""
+BatchZoneDetector - Parallel Multi-Symbol, Multi-Timeframe Zone Detection
+
+Runs SupplyDemandZoneDetector.detect_zones for every (symbol, timeframe) job
+of a batch in a process pool. Each symbol is loaded once at a base timeframe
+and its bars are copied once into shared memory; workers attach to the block,
+resample the higher timeframes from it themselves and return only the
+detected zones. Results can be bulk-saved through SupplyDemandRepository.
+
+Performance Target: wall time scales with worker processes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .zone_detector import SupplyDemandZoneDetector, SupplyDemandZone
+
+logger = logging.getLogger(__name__)
+
+# Bar length in seconds of the timeframes that can be resampled from a base load
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'M30': 1800,
+    'H1': 3600,
+    'H4': 14400,
+    'D1': 86400
+}
+
+# Price columns in shared memory order; volume follows when the base load has it
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+# Detector of the current worker process, set by the pool initializer
+_worker_detector: Optional[SupplyDemandZoneDetector] = None
+
+
+def resample_ohlc(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Resample OHLC(V) bars to a higher timeframe.
+
+    Bars are bucketed on time floored to the timeframe (D1 buckets start at
+    midnight); empty buckets produce no bar.
+
+    Args:
+        df: OHLC DataFrame with columns ['open', 'high', 'low', 'close', 'time'],
+            optionally 'volume', sorted by time
+        timeframe: Target timeframe (e.g., 'H1', 'H4', 'D1')
+
+    Returns:
+        Resampled DataFrame with the same columns
+
+    Raises:
+        ValueError: If the timeframe is not supported
+    """
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+    columns = list(PRICE_COLUMNS) + (['volume'] if 'volume' in df.columns else [])
+    times = pd.to_datetime(df['time']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+    values = np.vstack([df[column].to_numpy(dtype=np.float64) for column in columns])
+
+    times, values = _resample_arrays(times, values, TIMEFRAME_SECONDS[timeframe])
+    return _to_frame(times, values, columns)
+
+
+def _resample_arrays(
+    times: np.ndarray,
+    values: np.ndarray,
+    seconds: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Resample int64 ns times and (open, high, low, close[, volume]) rows."""
+    if len(times) == 0:
+        return times.copy(), values.copy()
+
+    period = seconds * 1_000_000_000
+    buckets = times // period
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(times)) - 1
+
+    resampled = np.empty((len(values), len(starts)))
+    resampled[0] = values[0, starts]
+    resampled[1] = np.maximum.reduceat(values[1], starts)
+    resampled[2] = np.minimum.reduceat(values[2], starts)
+    resampled[3] = values[3, ends]
+    if len(values) > 4:
+        resampled[4] = np.add.reduceat(values[4], starts)
+
+    return buckets[starts] * period, resampled
+
+
+def _to_frame(times: np.ndarray, values: np.ndarray, columns: List[str]) -> pd.DataFrame:
+    """Build a detector input frame; arrays are copied so shared memory can be released."""
+    frame = {column: np.array(values[row]) for row, column in enumerate(columns)}
+    frame['time'] = pd.to_datetime(np.array(times), unit='ns')
+    return pd.DataFrame(frame)
+
+
+def _init_worker(zone_detector: SupplyDemandZoneDetector) -> None:
+    """Pool initializer: keep one detector (and feature cache) per worker."""
+    global _worker_detector
+    _worker_detector = zone_detector
+
+
+def _detect_job(
+    block_name: str,
+    n_bars: int,
+    columns: Tuple[str, ...],
+    symbol: str,
+    timeframe: str,
+    base_timeframe: str
+) -> List[SupplyDemandZone]:
+    """Worker entry point: detect zones for one (symbol, timeframe) job."""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        times = np.ndarray((n_bars,), dtype=np.int64, buffer=block.buf)
+        values = np.ndarray((len(columns), n_bars), dtype=np.float64, buffer=block.buf, offset=n_bars * 8)
+
+        if timeframe != base_timeframe:
+            times, values = _resample_arrays(times, values, TIMEFRAME_SECONDS[timeframe])
+        df = _to_frame(times, values, list(columns))
+        del times, values
+    finally:
+        block.close()
+
+    return _worker_detector.detect_zones(df, symbol, timeframe)
+
+
+class BatchZoneDetector:
+    """
+    Parallel zone detection for many symbols and timeframes.
+
+    Each detect() call takes one base-timeframe frame per symbol. The frames
+    are written to shared memory (one block per symbol, int64 times followed
+    by the float64 price and volume rows) and a job is submitted per
+    (symbol, timeframe); a job resamples from the block inside the worker,
+    so frames are never pickled. The worker pool is started on first use and
+    reused until close().
+
+    With max_workers=1 jobs run in the calling process, which is cheaper
+    for small batches and easier to debug.
+    """
+
+    def __init__(
+        self,
+        zone_detector: SupplyDemandZoneDetector,
+        repository=None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize batch detector.
+
+        Args:
+            zone_detector: Configured SupplyDemandZoneDetector; each worker
+                gets its own copy
+            repository: Optional SupplyDemandRepository for detect_and_save
+            max_workers: Worker processes (default: CPU count)
+
+        Raises:
+            TypeError: If zone_detector is None
+            ValueError: If max_workers is not positive
+        """
+        if zone_detector is None:
+            raise TypeError("zone_detector cannot be None")
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 0:
+            raise ValueError(f"max_workers must be positive, got {max_workers}")
+
+        self.zone_detector = zone_detector
+        self.repository = repository
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.stats = {
+            'batches': 0,
+            'jobs': 0,
+            'failed_jobs': 0,
+            'zones_detected': 0,
+            'zones_saved': 0,
+            'last_batch_ms': 0.0
+        }
+
+        logger.debug(f"BatchZoneDetector initialized with max_workers={max_workers}")
+
+    def __enter__(self) -> 'BatchZoneDetector':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def detect(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframes: List[str],
+        base_timeframe: str
+    ) -> Dict[Tuple[str, str], List[SupplyDemandZone]]:
+        """
+        Detect zones for every symbol and timeframe.
+
+        Args:
+            data: Base-timeframe OHLC DataFrame per symbol, columns
+                ['open', 'high', 'low', 'close', 'time'] and optionally
+                'volume', sorted by time
+            timeframes: Timeframes to detect on, each the base timeframe or
+                a multiple of it (e.g., ['M15', 'H1', 'H4', 'D1'])
+            base_timeframe: Timeframe of the frames in data
+
+        Returns:
+            Zones per (symbol, timeframe); failed jobs are logged and map to
+            an empty list
+
+        Raises:
+            ValueError: If a timeframe cannot be resampled from base_timeframe
+        """
+        self._validate_timeframes(timeframes, base_timeframe)
+        start_time = time.perf_counter()
+
+        if self.max_workers == 1:
+            results = {
+                (symbol, timeframe): self._run_inline(df, symbol, timeframe, base_timeframe)
+                for symbol, df in data.items()
+                for timeframe in timeframes
+            }
+        else:
+            results = self._run_pool(data, timeframes, base_timeframe)
+
+        self.stats['batches'] += 1
+        self.stats['jobs'] += len(results)
+        self.stats['zones_detected'] += sum(len(zones) for zones in results.values())
+        self.stats['last_batch_ms'] = (time.perf_counter() - start_time) * 1000
+
+        logger.info(
+            f"Detected {sum(len(zones) for zones in results.values())} zones in "
+            f"{len(results)} jobs ({self.stats['last_batch_ms']:.0f}ms)"
+        )
+        return results
+
+    def detect_and_save(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframes: List[str],
+        base_timeframe: str
+    ) -> Dict[Tuple[str, str], List[SupplyDemandZone]]:
+        """
+        Detect zones and bulk-save all of them in one repository call.
+
+        Saved zones get their database IDs assigned.
+
+        Returns:
+            Zones per (symbol, timeframe), as from detect()
+
+        Raises:
+            ValueError: If no repository is configured
+        """
+        if self.repository is None:
+            raise ValueError("detect_and_save requires a repository")
+
+        results = self.detect(data, timeframes, base_timeframe)
+        zones = [zone for job_zones in results.values() for zone in job_zones]
+        if not zones:
+            return results
+
+        zone_ids = self.repository.bulk_save_zones(zones)
+        for zone, zone_id in zip(zones, zone_ids):
+            zone.id = zone_id
+
+        saved = sum(zone_id is not None for zone_id in zone_ids)
+        self.stats['zones_saved'] += saved
+        if saved < len(zones):
+            logger.warning(f"Saved {saved} of {len(zones)} detected zones")
+        return results
+
+    def _validate_timeframes(self, timeframes: List[str], base_timeframe: str) -> None:
+        """Check every timeframe can be built from whole base bars."""
+        if base_timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported base timeframe: {base_timeframe}")
+        for timeframe in timeframes:
+            if timeframe not in TIMEFRAME_SECONDS:
+                raise ValueError(f"Unsupported timeframe: {timeframe}")
+            if TIMEFRAME_SECONDS[timeframe] % TIMEFRAME_SECONDS[base_timeframe]:
+                raise ValueError(f"{timeframe} cannot be resampled from {base_timeframe}")
+
+    def _run_inline(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        timeframe: str,
+        base_timeframe: str
+    ) -> List[SupplyDemandZone]:
+        """Run one job in the calling process."""
+        try:
+            if timeframe != base_timeframe:
+                df = resample_ohlc(df, timeframe)
+            return self.zone_detector.detect_zones(df, symbol, timeframe)
+        except Exception as e:
+            logger.error(f"Zone detection failed for {symbol} {timeframe}: {e}")
+            self.stats['failed_jobs'] += 1
+            return []
+
+    def _run_pool(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframes: List[str],
+        base_timeframe: str
+    ) -> Dict[Tuple[str, str], List[SupplyDemandZone]]:
+        """Run all jobs in the worker pool from shared memory blocks."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.zone_detector,)
+            )
+
+        blocks = []
+        futures = {}
+        try:
+            for symbol, df in data.items():
+                columns = PRICE_COLUMNS + (('volume',) if 'volume' in df.columns else ())
+                n_bars = len(df)
+
+                block = shared_memory.SharedMemory(create=True, size=max(n_bars * 8 * (len(columns) + 1), 1))
+                blocks.append(block)
+                times = np.ndarray((n_bars,), dtype=np.int64, buffer=block.buf)
+                values = np.ndarray((len(columns), n_bars), dtype=np.float64, buffer=block.buf, offset=n_bars * 8)
+                times[:] = pd.to_datetime(df['time']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+                for row, column in enumerate(columns):
+                    values[row] = df[column].to_numpy(dtype=np.float64)
+                del times, values
+
+                for timeframe in timeframes:
+                    futures[(symbol, timeframe)] = self._pool.submit(
+                        _detect_job, block.name, n_bars, columns, symbol, timeframe, base_timeframe
+                    )
+
+            results = {}
+            for (symbol, timeframe), future in futures.items():
+                try:
+                    results[(symbol, timeframe)] = future.result()
+                except Exception as e:
+                    logger.error(f"Zone detection failed for {symbol} {timeframe}: {e}")
+                    self.stats['failed_jobs'] += 1
+                    results[(symbol, timeframe)] = []
+                    # A worker died: start a fresh pool on the next batch
+                    if isinstance(e, BrokenProcessPool) and self._pool is not None:
+                        self._pool.shutdown(wait=False)
+                        self._pool = None
+            return results
+
+        finally:
+            for future in futures.values():
+                future.cancel()
+            for block in blocks:
+                block.close()
+                block.unlink()
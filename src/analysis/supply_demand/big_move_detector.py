@@ -15,9 +15,13 @@ from datetime import datetime
 import logging
 
 from .base_candle_detector import BaseCandleRange
+from ..feature_cache import FeatureCache
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of bars scanned for a move end after each base range
+MAX_SCAN_DISTANCE = 20
+
 
 @dataclass
 class BigMove:
@@ -76,6 +80,7 @@ class BigMoveDetector:
         self.momentum_threshold = momentum_threshold
         self.volume_multiplier = volume_multiplier
         self.breakout_confirmation = breakout_confirmation
+        self.feature_cache = FeatureCache()
         
         logger.debug(f"BigMoveDetector initialized with move_threshold={move_threshold}")
     
@@ -127,20 +132,7 @@ class BigMoveDetector:
         
         self._validate_input_data(df)
         
-        big_moves = []
-        
-        for base_range in base_ranges:
-            try:
-                # Look for moves starting after each base range
-                move = self._detect_move_after_base(df, base_range, fractal_levels)
-                
-                if move is not None:
-                    big_moves.append(move)
-                    logger.debug(f"Detected big move: {move.direction} from {move.start_index} to {move.end_index}")
-            
-            except Exception as e:
-                logger.warning(f"Error detecting move after base range {base_range.start_index}: {e}")
-                continue
+        big_moves = self._detect_moves_after_bases(df, base_ranges, fractal_levels)
         
         logger.info(f"Detected {len(big_moves)} big moves from {len(base_ranges)} base ranges")
         return big_moves
@@ -153,82 +145,103 @@ class BigMoveDetector:
         if missing_columns:
             raise KeyError(f"Missing required columns: {missing_columns}")
     
-    def _detect_move_after_base(
+    def _detect_moves_after_bases(
         self, 
         df: pd.DataFrame, 
-        base_range: BaseCandleRange,
+        base_ranges: List[BaseCandleRange],
         fractal_levels: Optional[List[float]] = None
-    ) -> Optional[BigMove]:
+    ) -> List[BigMove]:
         """
-        Detect big move starting after a base range.
+        Detect big moves starting after each base range.
+        
+        Every base range is scanned for up to MAX_SCAN_DISTANCE candidate move
+        ends. All candidates of all base ranges are scored together as a
+        (bases x candidates) matrix using prefix sums, and the qualifying
+        candidate with the highest magnitude is kept per base range.
         
         Args:
             df: OHLC DataFrame
-            base_range: Base candle range to analyze
+            base_ranges: Base candle ranges to analyze
             fractal_levels: Optional fractal levels for breakout validation
             
         Returns:
-            BigMove object if significant move detected, None otherwise
+            List of BigMove objects (at most one per base range)
         """
-        # Start looking for move after base range ends
-        move_start_index = base_range.end_index + 1
-        
-        if move_start_index >= len(df):
-            return None
-        
-        # Look for potential move end (scan forward)
-        max_scan_distance = min(20, len(df) - move_start_index)  # Limit scan range
+        n_bars = len(df)
+        self.feature_cache.update(df)
+        closes = self.feature_cache.column('close')
+        
+        # Moves start on the bar after each base range ends
+        base_highs = np.array([base_range.high for base_range in base_ranges], dtype=np.float64)
+        base_lows = np.array([base_range.low for base_range in base_ranges], dtype=np.float64)
+        base_atr = np.array([base_range.atr_at_creation for base_range in base_ranges], dtype=np.float64)
+        starts = np.array([base_range.end_index + 1 for base_range in base_ranges], dtype=np.int64)
+        
+        # Candidate move ends, limited by scan distance and data length
+        offsets = np.arange(MAX_SCAN_DISTANCE)
+        scan_distance = np.minimum(MAX_SCAN_DISTANCE, n_bars - starts)
+        valid = (
+            (starts[:, None] >= 0) &
+            (offsets[None, :] >= self.min_move_candles - 1) &
+            (offsets[None, :] < scan_distance[:, None])
+        )
+        ends = np.where(valid, starts[:, None] + offsets[None, :], 0)
+        move_starts = np.where(valid, starts[:, None], 0)
+        
+        # Move magnitude in ATR multiples of the base range
+        price_moves = closes[ends] - closes[move_starts]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            magnitudes = np.where(
+                (base_atr[:, None] > 0) & (ends > move_starts),
+                np.abs(price_moves) / base_atr[:, None],
+                0.0
+            )
+        
+        momentum_scores = self._momentum_scores(move_starts, ends)
+        
+        bullish = price_moves > 0
+        qualifies = (
+            valid &
+            (magnitudes >= self.move_threshold) &
+            (momentum_scores >= self.momentum_threshold)
+        )
         
-        best_move = None
-        best_magnitude = 0
+        # Vectorized _validate_breakout_level: any level at/below a bullish breakout,
+        # at/above a bearish one
+        if self.breakout_confirmation and fractal_levels:
+            tolerance = 0.00001
+            bullish_ok = min(fractal_levels) <= base_highs + tolerance
+            bearish_ok = max(fractal_levels) >= base_lows - tolerance
+            qualifies &= np.where(bullish, bullish_ok[:, None], bearish_ok[:, None])
+        
+        # Highest magnitude per base range (earliest candidate on ties)
+        best = np.argmax(np.where(qualifies, magnitudes, -np.inf), axis=1)
+        rows = np.flatnonzero(qualifies.any(axis=1))
+        columns = best[rows]
+        start_times = df['time'].iloc[move_starts[rows, columns]].tolist()
+        end_times = df['time'].iloc[ends[rows, columns]].tolist()
         
-        for potential_end in range(move_start_index + self.min_move_candles - 1, 
-                                  move_start_index + max_scan_distance):
-            if potential_end >= len(df):
-                break
-            
-            # Calculate move metrics
-            magnitude = self._calculate_move_magnitude(df, move_start_index, potential_end, base_range)
+        big_moves = []
+        for row, column, start_time, end_time in zip(rows, columns, start_times, end_times):
+            start_index = int(move_starts[row, column])
+            end_index = int(ends[row, column])
+            direction = "bullish" if bullish[row, column] else "bearish"
             
-            if magnitude >= self.move_threshold:
-                momentum_score = self._calculate_momentum_score(df, move_start_index, potential_end)
-                
-                if momentum_score >= self.momentum_threshold:
-                    # Determine direction
-                    start_price = df.iloc[move_start_index]['close']
-                    end_price = df.iloc[potential_end]['close']
-                    direction = "bullish" if end_price > start_price else "bearish"
-                    
-                    # Check volume confirmation
-                    volume_confirmation = self._check_volume_confirmation(df, move_start_index, potential_end)
-                    
-                    # Determine breakout level
-                    breakout_level = base_range.high if direction == "bullish" else base_range.low
-                    
-                    # Validate breakout if required
-                    if self.breakout_confirmation and fractal_levels:
-                        if not self._validate_breakout_level(breakout_level, direction, fractal_levels):
-                            continue
-                    
-                    # Create move object
-                    move = BigMove(
-                        start_index=move_start_index,
-                        end_index=potential_end,
-                        start_time=df.iloc[move_start_index]['time'],
-                        end_time=df.iloc[potential_end]['time'],
-                        direction=direction,
-                        magnitude=magnitude,
-                        momentum_score=momentum_score,
-                        breakout_level=breakout_level,
-                        volume_confirmation=volume_confirmation
-                    )
-                    
-                    # Keep the best move (highest magnitude)
-                    if magnitude > best_magnitude:
-                        best_move = move
-                        best_magnitude = magnitude
-        
-        return best_move
+            move = BigMove(
+                start_index=start_index,
+                end_index=end_index,
+                start_time=start_time,
+                end_time=end_time,
+                direction=direction,
+                magnitude=magnitudes[row, column],
+                momentum_score=momentum_scores[row, column],
+                breakout_level=base_ranges[row].high if direction == "bullish" else base_ranges[row].low,
+                volume_confirmation=self._check_volume_confirmation(df, start_index, end_index)
+            )
+            big_moves.append(move)
+            logger.debug(f"Detected big move: {move.direction} from {move.start_index} to {move.end_index}")
+        
+        return big_moves
     
     def _calculate_move_magnitude(
         self, 
@@ -273,7 +286,9 @@ class BigMoveDetector:
         """
         Calculate momentum quality score (0.0 to 1.0).
         
-        Measures consistency and strength of directional movement.
+        Measures consistency and strength of directional movement:
+        share of closes moving in the move direction (40%), average
+        body/range ratio (30%) and momentum persistence (30%).
         
         Args:
             df: OHLC DataFrame
@@ -286,61 +301,67 @@ class BigMoveDetector:
         if start_index >= end_index or end_index >= len(df):
             return 0.0
         
-        move_data = df.iloc[start_index:end_index+1]
-        
-        if len(move_data) < 2:
-            return 0.0
-        
-        # Calculate directional consistency
-        closes = move_data['close'].values
-        price_changes = np.diff(closes)
-        
-        if len(price_changes) == 0:
-            return 0.0
-        
-        # Determine primary direction
-        total_move = closes[-1] - closes[0]
-        if total_move == 0:
-            return 0.0
-        
-        expected_direction = 1 if total_move > 0 else -1
-        
-        # Count moves in expected direction
-        consistent_moves = np.sum((price_changes * expected_direction) > 0)
-        total_moves = len(price_changes)
+        self.feature_cache.update(df)
+        return float(self._momentum_scores(np.array([start_index]), np.array([end_index]))[0])
+    
+    def _momentum_scores(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Momentum scores for arrays of moves in O(1) per move.
         
-        directional_consistency = consistent_moves / total_moves if total_moves > 0 else 0
+        Uses feature cache prefix sums of close gains/losses and body/range
+        ratios; see _calculate_momentum_score for the scoring rules.
         
-        # Calculate body strength (close vs open)
-        body_strengths = []
-        for _, candle in move_data.iterrows():
-            body_size = abs(candle['close'] - candle['open'])
-            candle_range = candle['high'] - candle['low']
+        Args:
+            starts: Move start indices
+            ends: Move end indices (same shape as starts)
+            
+        Returns:
+            Momentum scores, 0.0 where end <= start
+        """
+        features = self.feature_cache
+        closes = self.feature_cache.column('close')
+        
+        n_changes = ends - starts
+        total_moves = closes[ends] - closes[starts]
+        bullish = total_moves > 0
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Directional consistency: share of changes in the move direction
+            consistent_moves = np.where(
+                bullish,
+                features.window_counts('close_gain', starts + 1, ends + 1),
+                features.window_counts('close_loss', starts + 1, ends + 1)
+            )
+            directional_consistency = consistent_moves / n_changes
             
-            if candle_range > 0:
-                body_ratio = body_size / candle_range
-                body_strengths.append(body_ratio)
-        
-        avg_body_strength = np.mean(body_strengths) if body_strengths else 0.5
-        
-        # Calculate momentum persistence
-        momentum_values = []
-        for i in range(1, len(closes)):
-            if i > 0:
-                momentum = (closes[i] - closes[i-1]) * expected_direction
-                momentum_values.append(max(0, momentum))
-        
-        momentum_persistence = np.mean(momentum_values) / abs(total_move) if momentum_values and total_move != 0 else 0
-        momentum_persistence = min(1.0, momentum_persistence * len(closes))
-        
-        # Combined momentum score
-        momentum_score = (
-            directional_consistency * 0.4 +
-            avg_body_strength * 0.3 +
-            momentum_persistence * 0.3
+            # Body strength: mean body/range of candles with a range (0.5 if none)
+            body_count = features.window_counts('body_range_ratio', starts, ends + 1)
+            avg_body_strength = np.where(
+                body_count > 0,
+                features.window_sums('body_range_ratio', starts, ends + 1) / body_count,
+                0.5
+            )
+            
+            # Momentum persistence: mean favourable change relative to the move
+            favourable = np.where(
+                bullish,
+                features.window_sums('close_gain', starts + 1, ends + 1),
+                features.window_sums('close_loss', starts + 1, ends + 1)
+            )
+            momentum_persistence = favourable / n_changes / np.abs(total_moves)
+            momentum_persistence = np.minimum(1.0, momentum_persistence * (n_changes + 1))
+            
+            momentum_scores = (
+                directional_consistency * 0.4 +
+                avg_body_strength * 0.3 +
+                momentum_persistence * 0.3
+            )
+        
+        return np.where(
+            (n_changes > 0) & (total_moves != 0),
+            np.clip(momentum_scores, 0.0, 1.0),
+            0.0
         )
-        
-        return max(0.0, min(1.0, momentum_score))
     
     def _check_volume_confirmation(
         self, 
@@ -365,15 +386,18 @@ class BigMoveDetector:
         if start_index >= end_index or end_index >= len(df):
             return False
         
+        # Window means are O(1) prefix-sum lookups on the shared feature cache
+        self.feature_cache.update(df)
+        
         # Calculate average volume before the move (lookback period)
         lookback_start = max(0, start_index - 20)
-        baseline_volume = df.iloc[lookback_start:start_index]['volume'].mean()
+        baseline_volume = self.feature_cache.window_mean('volume', lookback_start, start_index)
         
         if baseline_volume <= 0:
             return False
         
         # Check volume during the move
-        move_volume = df.iloc[start_index:end_index+1]['volume'].mean()
+        move_volume = self.feature_cache.window_mean('volume', start_index, end_index + 1)
         
         volume_ratio = move_volume / baseline_volume
         
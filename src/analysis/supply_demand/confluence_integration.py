@@ -7,10 +7,13 @@ trading signal generation using institutional order flow analysis.
 Performance Target: <100ms for 100 zones, <200ms for multi-timeframe analysis
 """
 
+import bisect
+import heapq
+import itertools
 import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union
 import pandas as pd
 import numpy as np
 
@@ -20,6 +23,14 @@ from .repository import SupplyDemandRepository, ZoneQueryFilter
 
 logger = logging.getLogger(__name__)
 
+# Relative slack added to price windows so that boundary zones lost to float
+# rounding are still offered to the exact pip-distance check
+PRICE_WINDOW_TOLERANCE = 1e-9
+
+# Maximum price x zone pairs scored at once by the batch confluence API,
+# bounding the temporary arrays of one chunk to a few MB
+MAX_SCORING_CELLS = 2_000_000
+
 
 @dataclass
 class SDZoneConfluenceScore:
@@ -79,6 +90,97 @@ class SDZoneProximity:
         }
 
 
+@dataclass
+class _CachedZone:
+    """
+    Cache entry for one zone.
+    
+    Geometry and scores are captured when the zone is upserted and only
+    refresh when it is upserted again.
+    """
+    zone: SupplyDemandZone
+    key: Any
+    index_key: Tuple[str, str]  # (symbol, timeframe)
+    sequence: int  # Cache order, kept when the zone is upserted again
+    version: int   # Changes on every upsert, retiring older expiry entries
+    bottom_price: float
+    top_price: float
+    height: float
+    expires_at: datetime
+    test_history_score: float
+
+
+class _ZonePriceIndex:
+    """
+    Cached zones of one symbol and timeframe ordered by bottom boundary price.
+    
+    A zone lies within a price distance of a price only if its bottom is at
+    or below price + distance and at or above price - distance - height, so
+    a window query bisects the sorted bottoms using the tallest zone's height.
+    """
+    
+    def __init__(self, entries: List[_CachedZone] = ()):
+        ordered = sorted(entries, key=self._sort_key)
+        self._keys: List[Tuple[float, int]] = [self._sort_key(entry) for entry in ordered]
+        self._entries: List[_CachedZone] = ordered
+        self._heights: List[float] = sorted(entry.height for entry in ordered)
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _sort_key(entry: _CachedZone) -> Tuple[float, int]:
+        return (entry.bottom_price, entry.sequence)
+    
+    def add(self, entry: _CachedZone) -> None:
+        """Insert an entry at its price position"""
+        key = self._sort_key(entry)
+        position = bisect.bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._entries.insert(position, entry)
+        bisect.insort(self._heights, entry.height)
+        self._arrays = None
+    
+    def remove(self, entry: _CachedZone) -> None:
+        """Remove an entry previously added"""
+        position = bisect.bisect_left(self._keys, self._sort_key(entry))
+        del self._keys[position]
+        del self._entries[position]
+        del self._heights[bisect.bisect_left(self._heights, entry.height)]
+        self._arrays = None
+    
+    def entries(self) -> List[_CachedZone]:
+        """Entries in cache order"""
+        return sorted(self._entries, key=lambda entry: entry.sequence)
+    
+    @property
+    def max_height(self) -> float:
+        """Height of the tallest entry, used to widen window queries"""
+        return max(self._heights[-1], 0.0) if self._heights else 0.0
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Column arrays of the entries in price order, rebuilt after changes"""
+        if self._arrays is None:
+            entries = self._entries
+            self._arrays = {
+                'bottom': np.array([entry.bottom_price for entry in entries], dtype=float),
+                'top': np.array([entry.top_price for entry in entries], dtype=float),
+                'strength': np.array([entry.zone.strength_score for entry in entries], dtype=float),
+                'test_history': np.array([entry.test_history_score for entry in entries], dtype=float),
+                'expires_at': np.array([entry.expires_at for entry in entries], dtype='datetime64[us]')
+            }
+        return self._arrays
+    
+    def window(self, price: float, distance: float) -> List[_CachedZone]:
+        """Entries that may lie within distance of price, in cache order"""
+        reach = max(distance, 0.0) + PRICE_WINDOW_TOLERANCE * (abs(price) + 1.0)
+        low = bisect.bisect_left(self._keys, (price - reach - self.max_height,))
+        high = bisect.bisect_right(self._keys, (price + reach, float('inf')))
+        
+        return sorted(self._entries[low:high], key=lambda entry: entry.sequence)
+
+
 class SupplyDemandConfluence:
     """
     Professional confluence integration for supply/demand zones.
@@ -133,10 +235,12 @@ class SupplyDemandConfluence:
         self.pip_value_4_digit = pip_value_4_digit
         self.pip_value_5_digit = pip_value_5_digit
         
-        # Internal zone cache for performance
-        self._zone_cache: Dict[str, List[SupplyDemandZone]] = {}
+        # Internal zone cache for performance, keyed by (symbol, timeframe)
+        self._zone_cache: Dict[Tuple[str, str], _ZonePriceIndex] = {}
+        self._cached_zones: Dict[Any, _CachedZone] = {}
+        self._expiry_heap: List[Tuple[datetime, int, Any]] = []  # (expires_at, version, key)
+        self._cache_counter = itertools.count()
         self._cache_timestamp: Optional[datetime] = None
-        self._cache_timeout_minutes = 5  # Cache zones for 5 minutes
         
         # Timeframe weights for multi-timeframe analysis
         self._timeframe_weights = {
@@ -202,12 +306,9 @@ class SupplyDemandConfluence:
             
         Performance: <100ms for 100 zones
         """
-        if timeframes is None:
-            timeframes = list(self._zone_cache.keys())
-        
         try:
             # Get nearby zones
-            nearby_zones = self.get_nearby_zones(
+            nearby_zones = self._find_nearby_zones(
                 price, symbol, timeframes, self.proximity_threshold_pips
             )
             
@@ -218,14 +319,11 @@ class SupplyDemandConfluence:
             best_zone = None
             best_score = 0.0
             
-            for zone_proximity in nearby_zones:
-                zone = self._find_zone_by_id(zone_proximity.zone_id)
-                if not zone:
-                    continue
-                
+            current_time = datetime.now()
+            for cached, zone_proximity in nearby_zones:
                 # Calculate comprehensive confluence score
                 confluence_score = self._calculate_comprehensive_score(
-                    zone, zone_proximity, price
+                    cached, zone_proximity, current_time
                 )
                 
                 if confluence_score.total_confluence_score > best_score:
@@ -257,31 +355,9 @@ class SupplyDemandConfluence:
         Returns:
             List of SDZoneProximity objects sorted by proximity
         """
-        if max_distance_pips is None:
-            max_distance_pips = self.proximity_threshold_pips
-        
-        if timeframes is None:
-            timeframes = list(self._zone_cache.keys())
-        
-        nearby_zones = []
-        
         try:
-            for timeframe in timeframes:
-                zones = self._get_zones_for_timeframe(symbol, timeframe)
-                
-                for zone in zones:
-                    # Calculate proximity
-                    proximity = self.calculate_zone_proximity(zone, price)
-                    
-                    # Check if within distance threshold
-                    if (proximity.is_inside_zone or 
-                        proximity.distance_pips <= max_distance_pips):
-                        nearby_zones.append(proximity)
-            
-            # Sort by proximity score (highest first)
-            nearby_zones.sort(key=lambda x: x.proximity_score, reverse=True)
-            
-            return nearby_zones
+            nearby_zones = self._find_nearby_zones(price, symbol, timeframes, max_distance_pips)
+            return [proximity for _, proximity in nearby_zones]
             
         except Exception as e:
             logger.error(f"Error getting nearby zones: {e}")
@@ -365,24 +441,23 @@ class SupplyDemandConfluence:
         """
         try:
             # Get nearby zones
-            nearby_zones = self.get_nearby_zones(price, symbol, timeframes)
+            nearby_zones = self._find_nearby_zones(
+                price, symbol, timeframes, self.proximity_threshold_pips
+            )
             
             # Separate by zone type
             supply_zones = []
             demand_zones = []
             
-            for zone_proximity in nearby_zones:
-                zone = self._find_zone_by_id(zone_proximity.zone_id)
-                if not zone:
-                    continue
-                
+            current_time = datetime.now()
+            for cached, zone_proximity in nearby_zones:
                 confluence_score = self._calculate_comprehensive_score(
-                    zone, zone_proximity, price
+                    cached, zone_proximity, current_time
                 )
                 
-                if zone.zone_type == 'supply':
+                if cached.zone.zone_type == 'supply':
                     supply_zones.append(confluence_score)
-                elif zone.zone_type == 'demand':
+                elif cached.zone.zone_type == 'demand':
                     demand_zones.append(confluence_score)
             
             # Calculate total confluence and determine dominance
@@ -460,57 +535,203 @@ class SupplyDemandConfluence:
             logger.error(f"Error calculating multi-timeframe confluence: {e}")
             return {tf: 0.0 for tf in timeframes}
     
+    def get_multi_timeframe_confluence_matrix(
+        self,
+        prices: Union[List[float], np.ndarray],
+        symbol: str,
+        timeframes: List[str]
+    ) -> np.ndarray:
+        """
+        Calculate weighted confluence scores for many prices at once.
+        
+        Each cell equals get_multi_timeframe_confluence for that price and
+        timeframe: the best total confluence score of the zones within
+        proximity_threshold_pips, times the timeframe weight, capped at 1.0.
+        Every price's candidate zones are located by binary search on the
+        cached price index and all candidates are scored in vectorized chunks
+        of at most MAX_SCORING_CELLS price/zone pairs.
+        
+        Args:
+            prices: Candidate prices (fib levels, ABC targets, etc.)
+            symbol: Trading symbol
+            timeframes: Timeframes to analyze
+            
+        Returns:
+            Array of shape (len(prices), len(timeframes))
+        """
+        prices = np.asarray(prices, dtype=float).reshape(-1)
+        scores = np.zeros((len(prices), len(timeframes)))
+        
+        if len(prices) == 0:
+            return scores
+        
+        try:
+            current_time = datetime.now()
+            self._expire_zones(current_time)
+            
+            pip_value = self._pip_value(symbol)
+            distance = max(self.proximity_threshold_pips * pip_value, 0.0)
+            reach = distance + PRICE_WINDOW_TOLERANCE * (np.abs(prices) + 1.0)
+            
+            for column, timeframe in enumerate(timeframes):
+                index = self._zone_cache.get((symbol, timeframe))
+                if index is None:
+                    continue
+                
+                best = self._best_confluence_scores(index, prices, reach, pip_value, current_time)
+                
+                # Apply timeframe weight
+                tf_weight = self._timeframe_weights.get(timeframe, 0.3)
+                scores[:, column] = np.minimum(1.0, best * tf_weight)
+            
+            return scores
+            
+        except Exception as e:
+            logger.error(f"Error calculating confluence matrix: {e}")
+            return np.zeros((len(prices), len(timeframes)))
+    
     def update_zone_cache(self, zones: List[SupplyDemandZone]) -> None:
         """
-        Update internal zone cache for performance.
+        Replace the internal zone cache.
+        
+        Use upsert_zone and remove_zone to apply individual zone changes
+        without rebuilding the cache.
         
         Args:
             zones: List of zones to cache
         """
         try:
-            # Clear existing cache
-            self._zone_cache.clear()
+            current_time = datetime.now()
             
-            # Group zones by timeframe
+            # Later copies of a zone replace earlier ones in place
+            cached_zones: Dict[Any, _CachedZone] = {}
             for zone in zones:
-                if zone.timeframe not in self._zone_cache:
-                    self._zone_cache[zone.timeframe] = []
-                
                 # Only cache zones that meet minimum criteria
-                if self._should_cache_zone(zone):
-                    self._zone_cache[zone.timeframe].append(zone)
+                if not self._should_cache_zone(zone):
+                    continue
+                
+                key = self._zone_key(zone)
+                previous = cached_zones.get(key)
+                cached_zones[key] = self._create_cache_entry(zone, key, previous)
+            
+            # Group zones by symbol and timeframe
+            grouped: Dict[Tuple[str, str], List[_CachedZone]] = {}
+            for cached in cached_zones.values():
+                grouped.setdefault(cached.index_key, []).append(cached)
+            
+            self._cached_zones = cached_zones
+            self._zone_cache = {
+                index_key: _ZonePriceIndex(entries) for index_key, entries in grouped.items()
+            }
+            self._expiry_heap = [
+                (cached.expires_at, cached.version, key) for key, cached in cached_zones.items()
+            ]
+            heapq.heapify(self._expiry_heap)
             
             # Update cache timestamp
-            self._cache_timestamp = datetime.now()
+            self._cache_timestamp = current_time
             
-            total_zones = sum(len(zones) for zones in self._zone_cache.values())
-            logger.debug(f"Updated zone cache with {total_zones} zones across {len(self._zone_cache)} timeframes")
+            logger.debug(f"Updated zone cache with {len(cached_zones)} zones across {len(self._zone_cache)} symbol/timeframe pairs")
             
         except Exception as e:
             logger.error(f"Error updating zone cache: {e}")
     
+    def upsert_zone(self, zone: SupplyDemandZone) -> bool:
+        """
+        Add a zone to the cache or refresh its cached entry.
+        
+        Scores derived from a zone's test history are only recomputed here,
+        so upsert a zone again after its prices, status or tests change.
+        Zones that no longer meet the caching criteria are removed.
+        
+        Args:
+            zone: Zone that was detected or changed
+            
+        Returns:
+            True if the zone is cached after the update
+        """
+        try:
+            current_time = datetime.now()
+            self._expire_zones(current_time)
+            
+            key = self._zone_key(zone)
+            previous = self._cached_zones.pop(key, None)
+            if previous is not None:
+                self._unindex_zone(previous)
+            
+            self._cache_timestamp = current_time
+            if not self._should_cache_zone(zone):
+                return False
+            
+            cached = self._create_cache_entry(zone, key, previous)
+            self._cached_zones[key] = cached
+            if cached.index_key not in self._zone_cache:
+                self._zone_cache[cached.index_key] = _ZonePriceIndex()
+            self._zone_cache[cached.index_key].add(cached)
+            self._push_expiry(cached)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error upserting zone {zone.id}: {e}")
+            return False
+    
+    def remove_zone(self, zone: SupplyDemandZone) -> bool:
+        """
+        Remove a zone from the cache.
+        
+        Args:
+            zone: Zone to remove
+            
+        Returns:
+            True if the zone was cached
+        """
+        cached = self._cached_zones.pop(self._zone_key(zone), None)
+        if cached is None:
+            return False
+        
+        self._unindex_zone(cached)
+        self._cache_timestamp = datetime.now()
+        return True
+    
+    def expire_zones(self, current_time: Optional[datetime] = None) -> int:
+        """
+        Remove cached zones older than max_zone_age_hours.
+        
+        Queries expire zones automatically; call this to release them early.
+        
+        Args:
+            current_time: Reference time (None = now)
+            
+        Returns:
+            Number of zones removed
+        """
+        return self._expire_zones(current_time or datetime.now())
+    
     def _calculate_comprehensive_score(
         self,
-        zone: SupplyDemandZone,
+        cached: _CachedZone,
         proximity: SDZoneProximity,
-        current_price: float
+        current_time: datetime
     ) -> SDZoneConfluenceScore:
         """
         Calculate comprehensive confluence score for a zone.
         
         Args:
-            zone: SupplyDemandZone to score
+            cached: Cache entry of the zone to score
             proximity: SDZoneProximity data
-            current_price: Current price for context
+            current_time: Reference time for freshness
             
         Returns:
             Complete SDZoneConfluenceScore
         """
+        zone = cached.zone
+        
         # Component scores
         proximity_score = proximity.proximity_score
         strength_score = zone.strength_score
-        freshness_score = self._calculate_freshness_score(zone)
-        test_history_score = self._calculate_test_history_score(zone)
+        freshness_score = self._calculate_freshness_score(cached, current_time)
+        test_history_score = cached.test_history_score
         
         # Weighted total score
         total_score = (
@@ -536,14 +757,13 @@ class SupplyDemandConfluence:
             zone_boundaries=(zone.top_price, zone.bottom_price)
         )
     
-    def _calculate_freshness_score(self, zone: SupplyDemandZone) -> float:
+    def _calculate_freshness_score(self, cached: _CachedZone, current_time: datetime) -> float:
         """Calculate freshness score based on zone age"""
         try:
-            age_hours = zone.age_hours
-            max_age = self.max_zone_age_hours
+            remaining_hours = (cached.expires_at - current_time).total_seconds() / 3600
             
             # Linear decay from 1.0 to 0.0 over max age
-            freshness = max(0.0, 1.0 - (age_hours / max_age))
+            freshness = max(0.0, remaining_hours / self.max_zone_age_hours)
             
             return freshness
             
@@ -583,44 +803,224 @@ class SupplyDemandConfluence:
         
         return True
     
+    def _find_nearby_zones(
+        self,
+        price: float,
+        symbol: str,
+        timeframes: Optional[Union[str, List[str]]],
+        max_distance_pips: Optional[float]
+    ) -> List[Tuple[_CachedZone, SDZoneProximity]]:
+        """
+        Find cached zones within distance of price, sorted by proximity.
+        
+        Each timeframe's zones are narrowed to a price window by binary search
+        before the exact proximity check, so the cost depends on the number of
+        zones near the price rather than the size of the cache.
+        """
+        if max_distance_pips is None:
+            max_distance_pips = self.proximity_threshold_pips
+        
+        if timeframes is None:
+            timeframes = [tf for zone_symbol, tf in self._zone_cache if zone_symbol == symbol]
+        elif isinstance(timeframes, str):
+            timeframes = [timeframes]
+        
+        self._expire_zones(datetime.now())
+        
+        distance = max_distance_pips * self._pip_value(symbol)
+        nearby_zones = []
+        
+        for timeframe in timeframes:
+            index = self._zone_cache.get((symbol, timeframe))
+            if index is None:
+                continue
+            
+            for cached in index.window(price, distance):
+                proximity = self.calculate_zone_proximity(cached.zone, price)
+                
+                # Check if within distance threshold
+                if (proximity.is_inside_zone or
+                    proximity.distance_pips <= max_distance_pips):
+                    nearby_zones.append((cached, proximity))
+        
+        # Sort by proximity score (highest first)
+        nearby_zones.sort(key=lambda item: item[1].proximity_score, reverse=True)
+        
+        return nearby_zones
+    
+    def _best_confluence_scores(
+        self,
+        index: _ZonePriceIndex,
+        prices: np.ndarray,
+        reach: np.ndarray,
+        pip_value: float,
+        current_time: datetime
+    ) -> np.ndarray:
+        """
+        Highest total confluence score per price among one index's zones.
+        
+        Mirrors calculate_zone_proximity and _calculate_comprehensive_score
+        operation for operation so results match the per-price path.
+        """
+        best = np.zeros(len(prices))
+        columns = index.arrays()
+        
+        # Candidate window of each price in the price-ordered columns
+        low = np.searchsorted(columns['bottom'], prices - reach - index.max_height, side='left')
+        high = np.searchsorted(columns['bottom'], prices + reach, side='right')
+        counts = np.maximum(high - low, 0)
+        ends = np.cumsum(counts)
+        
+        if ends[-1] == 0:
+            return best
+        
+        reference_time = np.datetime64(current_time, 'us')
+        threshold = self.proximity_threshold_pips
+        
+        start = 0
+        while start < len(prices):
+            # Grow the chunk until it holds MAX_SCORING_CELLS pairs
+            offset = ends[start - 1] if start else 0
+            stop = max(start + 1, int(np.searchsorted(ends, offset + MAX_SCORING_CELLS, side='right')))
+            chunk_counts = counts[start:stop]
+            n_pairs = int(ends[stop - 1] - offset)
+            
+            if n_pairs:
+                price_idx = np.repeat(np.arange(start, stop), chunk_counts)
+                pair_starts = np.cumsum(chunk_counts) - chunk_counts
+                zone_idx = (np.repeat(low[start:stop] - pair_starts, chunk_counts)
+                            + np.arange(n_pairs))
+                
+                price = prices[price_idx]
+                bottom = columns['bottom'][zone_idx]
+                top = columns['top'][zone_idx]
+                
+                # Inside zones score by distance from center
+                inside = (bottom <= price) & (price <= top)
+                height = top - bottom
+                half_height = height / 2
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    center_score = 1.0 - (np.abs(price - (top + bottom) / 2.0) / half_height)
+                center_score = np.where(half_height > 0, center_score, 1.0)
+                
+                # Outside zones score by pip distance to the nearest boundary
+                distance_pips = np.abs(np.where(price < bottom, bottom - price, price - top)) / pip_value
+                distance_score = np.maximum(0.0, 1.0 - (distance_pips / threshold))
+                
+                proximity = np.where(inside, np.clip(center_score, 0.0, 1.0), distance_score)
+                
+                remaining = (columns['expires_at'][zone_idx] - reference_time) / np.timedelta64(1, 'us')
+                freshness = np.maximum(0.0, remaining / 1e6 / 3600 / self.max_zone_age_hours)
+                
+                total = (
+                    proximity * 0.0 +
+                    columns['strength'][zone_idx] * self.strength_weight +
+                    freshness * self.freshness_weight +
+                    columns['test_history'][zone_idx] * self.test_history_weight
+                ) * proximity
+                total = np.where(inside | (distance_pips <= threshold), np.clip(total, 0.0, 1.0), 0.0)
+                
+                # Pairs are grouped by price, so reduce each price's run
+                nonempty = chunk_counts > 0
+                best[start:stop][nonempty] = np.maximum(
+                    0.0, np.maximum.reduceat(total, pair_starts[nonempty])
+                )
+            
+            start = stop
+        
+        return best
+    
     def _get_zones_for_timeframe(self, symbol: str, timeframe: str) -> List[SupplyDemandZone]:
         """Get cached zones for specific symbol and timeframe"""
-        if timeframe not in self._zone_cache:
+        index = self._zone_cache.get((symbol, timeframe))
+        if index is None:
             return []
         
-        # Filter by symbol
-        symbol_zones = [
-            zone for zone in self._zone_cache[timeframe]
-            if zone.symbol == symbol
-        ]
-        
-        return symbol_zones
+        return [cached.zone for cached in index.entries()]
     
     def _find_zone_by_id(self, zone_id: int) -> Optional[SupplyDemandZone]:
         """Find zone by ID in cache"""
-        for timeframe_zones in self._zone_cache.values():
-            for zone in timeframe_zones:
-                if zone.id == zone_id:
-                    return zone
-        return None
+        cached = self._cached_zones.get(zone_id)
+        return cached.zone if cached is not None else None
+    
+    @staticmethod
+    def _zone_key(zone: SupplyDemandZone) -> Any:
+        """Cache key: database ID, or zone identity for unsaved zones"""
+        if zone.id is not None:
+            return zone.id
+        return (zone.symbol, zone.timeframe, zone.zone_type, zone.left_time, zone.right_time)
+    
+    def _create_cache_entry(
+        self,
+        zone: SupplyDemandZone,
+        key: Any,
+        previous: Optional[_CachedZone]
+    ) -> _CachedZone:
+        """Capture a zone's geometry, expiry time and test history score"""
+        return _CachedZone(
+            zone=zone,
+            key=key,
+            index_key=(zone.symbol, zone.timeframe),
+            sequence=previous.sequence if previous is not None else next(self._cache_counter),
+            version=next(self._cache_counter),
+            bottom_price=zone.bottom_price,
+            top_price=zone.top_price,
+            height=zone.height,
+            expires_at=zone.created_at + timedelta(hours=self.max_zone_age_hours),
+            test_history_score=self._calculate_test_history_score(zone)
+        )
+    
+    def _unindex_zone(self, cached: _CachedZone) -> None:
+        """Remove a cache entry from its price index"""
+        index = self._zone_cache[cached.index_key]
+        index.remove(cached)
+        if not index:
+            del self._zone_cache[cached.index_key]
+    
+    def _push_expiry(self, cached: _CachedZone) -> None:
+        """Schedule a cache entry's expiry, compacting retired heap entries"""
+        heapq.heappush(self._expiry_heap, (cached.expires_at, cached.version, cached.key))
+        
+        if len(self._expiry_heap) > 2 * len(self._cached_zones) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, entry.version, key) for key, entry in self._cached_zones.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+    
+    def _expire_zones(self, current_time: datetime) -> int:
+        """Remove zones whose age exceeds max_zone_age_hours"""
+        expired = 0
+        
+        while self._expiry_heap and self._expiry_heap[0][0] < current_time:
+            _, version, key = heapq.heappop(self._expiry_heap)
+            cached = self._cached_zones.get(key)
+            
+            # Entries of removed or re-upserted zones are skipped
+            if cached is None or cached.version != version:
+                continue
+            
+            del self._cached_zones[key]
+            self._unindex_zone(cached)
+            expired += 1
+        
+        if expired:
+            logger.debug(f"Expired {expired} cached zones")
+        
+        return expired
+    
+    def _pip_value(self, symbol: str) -> float:
+        """Pip size in price units for a symbol"""
+        if 'JPY' in symbol:
+            return self.pip_value_5_digit  # 5-digit for JPY pairs
+        return self.pip_value_4_digit  # 4-digit for major pairs
     
     def _price_to_pips(self, price_diff: float, symbol: str) -> float:
         """Convert price difference to pips"""
-        # Determine pip value based on symbol
-        if 'JPY' in symbol:
-            pip_value = self.pip_value_5_digit  # 5-digit for JPY pairs
-        else:
-            pip_value = self.pip_value_4_digit  # 4-digit for major pairs
-        
-        return abs(price_diff) / pip_value
+        return abs(price_diff) / self._pip_value(symbol)
     
     def _is_cache_valid(self) -> bool:
-        """Check if zone cache is still valid"""
-        if self._cache_timestamp is None:
-            return False
-        
-        age_minutes = (datetime.now() - self._cache_timestamp).total_seconds() / 60
-        return age_minutes < self._cache_timeout_minutes
+        """Check if zone cache has been loaded; zones expire individually"""
+        return self._cache_timestamp is not None
 
 
 def create_test_confluence_system() -> SupplyDemandConfluence:
@@ -4,18 +4,28 @@ SupplyDemandRepository - Professional Database Layer
 Handles all database operations for supply/demand zones including CRUD operations,
 history tracking, statistics calculation, and performance optimization.
 
+Backends are selected by connection string: PostgreSQL (psycopg2 connection
+pool) or an embedded SQLite file (sqlite:///path/to/file.db) for single-node
+backtests and research that should not need a database server.
+
 Performance Target: <10ms per zone save, <50ms per 1000 zone query
 """
 
+import copy
+import io
 import json
 import logging
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, asdict, fields
+from typing import List, Optional, Dict, Any, Callable, Iterable, Tuple
+import sqlite3
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from psycopg2.pool import ThreadedConnectionPool
+import numpy as np
 import pandas as pd
 
 from .zone_detector import SupplyDemandZone
@@ -25,6 +35,152 @@ from .big_move_detector import BigMove
 
 logger = logging.getLogger(__name__)
 
+# Rows sent per multi-row INSERT/UPDATE statement by the bulk methods
+BULK_PAGE_SIZE = 1000
+
+# Rows deleted per statement (and transaction) by cleanup_old_zones
+CLEANUP_BATCH_SIZE = 5000
+
+# History tables emptied by cleanup_old_zones before their zones, with the
+# time column of their (zone_id, time, id) index
+CLEANUP_HISTORY_TABLES = (
+    ('zone_state_updates', 'update_time', 'updates_deleted'),
+    ('zone_test_events', 'test_time', 'events_deleted')
+)
+
+# Zones removed by cleanup_old_zones (parameter: cutoff time). Every delete
+# re-applies it, so a zone that stops matching mid-cleanup keeps its history
+CLEANUP_ZONE_CONDITION = "created_at < %s AND status IN ('expired', 'broken')"
+
+# Column order shared by the single and bulk zone insert paths
+ZONE_INSERT_COLUMNS = (
+    'symbol', 'timeframe', 'zone_type', 'top_price', 'bottom_price',
+    'left_time', 'right_time', 'strength_score', 'test_count', 'success_count',
+    'status', 'base_range_data', 'big_move_data', 'atr_at_creation',
+    'volume_at_creation', 'created_at', 'updated_at'
+)
+
+# Column types for the VALUES list of the bulk zone update, where PostgreSQL
+# cannot infer them from the target table
+ZONE_UPDATE_TEMPLATE = (
+    "(%s::integer, %s::varchar, %s::varchar, %s::varchar, %s::numeric, %s::numeric, "
+    "%s::timestamp, %s::timestamp, %s::numeric, %s::integer, %s::integer, "
+    "%s::varchar, %s::jsonb, %s::jsonb, %s::numeric, %s::numeric, %s::timestamp)"
+)
+
+# Adds a batch of test event aggregates to the per-zone statistics summary
+# (same statement on both backends)
+STATISTICS_UPSERT = """
+    INSERT INTO zone_statistics (
+        zone_id, test_count, success_count, reaction_strength_sum, last_test_time
+    ) VALUES %s
+    ON CONFLICT (zone_id) DO UPDATE SET
+        test_count = zone_statistics.test_count + excluded.test_count,
+        success_count = zone_statistics.success_count + excluded.success_count,
+        reaction_strength_sum = zone_statistics.reaction_strength_sum + excluded.reaction_strength_sum,
+        last_test_time = CASE
+            WHEN zone_statistics.last_test_time IS NULL
+                OR excluded.last_test_time > zone_statistics.last_test_time
+            THEN excluded.last_test_time
+            ELSE zone_statistics.last_test_time
+        END;
+"""
+
+# Builds the statistics summary from existing test events when it is first
+# created (same statement on both backends)
+STATISTICS_BACKFILL = """
+    INSERT INTO zone_statistics (
+        zone_id, test_count, success_count, reaction_strength_sum, last_test_time
+    )
+    SELECT zone_id, COUNT(*), SUM(CASE WHEN success THEN 1 ELSE 0 END),
+           COALESCE(SUM(reaction_strength), 0), MAX(test_time)
+    FROM zone_test_events
+    WHERE zone_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM zone_statistics)
+    GROUP BY zone_id
+    ON CONFLICT (zone_id) DO NOTHING;
+"""
+
+# SQLite equivalent of the PostgreSQL schema created by _initialize_schema
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS supply_demand_zones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol VARCHAR(20) NOT NULL,
+    timeframe VARCHAR(10) NOT NULL,
+    zone_type VARCHAR(20) NOT NULL,
+    top_price REAL NOT NULL,
+    bottom_price REAL NOT NULL,
+    left_time TIMESTAMP NOT NULL,
+    right_time TIMESTAMP NOT NULL,
+    strength_score REAL NOT NULL,
+    test_count INTEGER DEFAULT 0,
+    success_count INTEGER DEFAULT 0,
+    status VARCHAR(20) DEFAULT 'active',
+    base_range_data TEXT,
+    big_move_data TEXT,
+    atr_at_creation REAL,
+    volume_at_creation REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS zone_state_updates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    zone_id INTEGER REFERENCES supply_demand_zones(id) ON DELETE CASCADE,
+    old_status VARCHAR(20) NOT NULL,
+    new_status VARCHAR(20) NOT NULL,
+    update_time TIMESTAMP NOT NULL,
+    trigger_price REAL NOT NULL,
+    trigger_reason VARCHAR(50) NOT NULL,
+    test_success BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS zone_test_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    zone_id INTEGER REFERENCES supply_demand_zones(id) ON DELETE CASCADE,
+    test_time TIMESTAMP NOT NULL,
+    test_price REAL NOT NULL,
+    test_type VARCHAR(20) NOT NULL,
+    success BOOLEAN NOT NULL,
+    reaction_strength REAL DEFAULT 0.0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS zone_statistics (
+    zone_id INTEGER PRIMARY KEY REFERENCES supply_demand_zones(id) ON DELETE CASCADE,
+    test_count INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    reaction_strength_sum REAL NOT NULL DEFAULT 0.0,
+    last_test_time TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_zones_created_id ON supply_demand_zones (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_zones_symbol_timeframe_created
+    ON supply_demand_zones (symbol, timeframe, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_zones_status_created ON supply_demand_zones (status, created_at);
+
+-- No INCLUDE in SQLite: covering indexes list the selected columns as keys
+CREATE INDEX IF NOT EXISTS idx_updates_zone_time_covering ON zone_state_updates (
+    zone_id, update_time, id, old_status, new_status, trigger_price, trigger_reason, test_success
+);
+CREATE INDEX IF NOT EXISTS idx_events_zone_time_covering ON zone_test_events (
+    zone_id, test_time, id, test_price, test_type, success, reaction_strength
+);
+
+-- Superseded by the indexes above
+DROP INDEX IF EXISTS idx_zones_symbol_timeframe;
+DROP INDEX IF EXISTS idx_updates_zone_time;
+DROP INDEX IF EXISTS idx_events_zone_time;
+"""
+
+# SQLite has no timestamp or boolean types: timestamps are stored as ISO text
+# and booleans as 0/1, converted back for these result columns
+SQLITE_TIMESTAMP_COLUMNS = frozenset({
+    'left_time', 'right_time', 'created_at', 'updated_at',
+    'update_time', 'test_time', 'last_test_time'
+})
+SQLITE_BOOLEAN_COLUMNS = frozenset({'test_success', 'success'})
+
 
 @dataclass
 class ZoneQueryFilter:
@@ -45,6 +201,8 @@ class ZoneQueryFilter:
     created_before: Optional[datetime] = None
     limit: Optional[int] = None
     offset: Optional[int] = None
+    # Keyset cursor: (created_at, id) of the last zone of the previous page
+    after: Optional[Tuple[datetime, int]] = None
 
 
 @dataclass
@@ -62,6 +220,207 @@ class ZoneHistoryQuery:
     success_only: Optional[bool] = None
     limit: Optional[int] = None
     offset: Optional[int] = None
+    # Keyset cursor returned with the previous page by get_*_page
+    after: Optional[Tuple[datetime, int]] = None
+
+
+class _SQLiteCursor:
+    """
+    psycopg2-style cursor over an SQLite connection.
+    
+    Translates %s placeholders, stores datetimes as ISO text and converts
+    timestamp/boolean result columns back. Rows are dicts when created for
+    RealDictCursor, tuples otherwise.
+    """
+    
+    def __init__(self, cursor: sqlite3.Cursor, as_dict: bool):
+        self._cursor = cursor
+        self._as_dict = as_dict
+    
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+    
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+    
+    def execute(self, query: str, params: Iterable[Any] = ()) -> None:
+        self._cursor.execute(query.replace('%s', '?'), [_sqlite_value(value) for value in params])
+    
+    def executemany(self, query: str, rows: Iterable[Iterable[Any]]) -> None:
+        self._cursor.executemany(
+            query.replace('%s', '?'),
+            ([_sqlite_value(value) for value in row] for row in rows)
+        )
+    
+    def fetchone(self) -> Optional[Any]:
+        row = self._cursor.fetchone()
+        return None if row is None else self._convert(row)
+    
+    def fetchall(self) -> List[Any]:
+        return [self._convert(row) for row in self._cursor.fetchall()]
+    
+    def _convert(self, row: Tuple) -> Any:
+        names = [column[0] for column in self._cursor.description]
+        values = []
+        for name, value in zip(names, row):
+            if value is not None:
+                if name in SQLITE_TIMESTAMP_COLUMNS:
+                    value = datetime.fromisoformat(value)
+                elif name in SQLITE_BOOLEAN_COLUMNS:
+                    value = bool(value)
+            values.append(value)
+        return dict(zip(names, values)) if self._as_dict else tuple(values)
+
+
+class _SQLiteConnection:
+    """psycopg2-style connection wrapper handing out _SQLiteCursor objects"""
+    
+    def __init__(self, connection: sqlite3.Connection):
+        self.raw = connection
+    
+    def cursor(self, cursor_factory: Any = None) -> _SQLiteCursor:
+        return _SQLiteCursor(self.raw.cursor(), as_dict=cursor_factory is not None)
+    
+    def commit(self) -> None:
+        self.raw.commit()
+    
+    def rollback(self) -> None:
+        self.raw.rollback()
+    
+    def close(self) -> None:
+        self.raw.close()
+
+
+class _SQLiteConnectionPool:
+    """
+    ThreadedConnectionPool equivalent for an SQLite database file.
+    
+    Connections are opened on demand up to maxconn and used by one thread at
+    a time; getconn() waits when all are in use. WAL mode lets readers run
+    alongside the single writer. An in-memory database is a single connection.
+    """
+    
+    def __init__(self, path: str, maxconn: int):
+        self.path = path
+        self.maxconn = 1 if path == ':memory:' else maxconn
+        self._idle: List[_SQLiteConnection] = []
+        self._opened = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def getconn(self) -> _SQLiteConnection:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.maxconn:
+                    self._opened += 1
+                    break
+                self._condition.wait()
+        
+        try:
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+    
+    def putconn(self, connection: _SQLiteConnection) -> None:
+        with self._condition:
+            if self._closed:
+                connection.close()
+                return
+            # Never hand out a connection with an open transaction
+            connection.rollback()
+            self._idle.append(connection)
+            self._condition.notify()
+    
+    def closeall(self) -> None:
+        with self._condition:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._idle = []
+            self._condition.notify_all()
+    
+    def _connect(self) -> _SQLiteConnection:
+        # Statement cache keeps the repository's fixed statements prepared
+        connection = sqlite3.connect(
+            self.path, timeout=30.0, check_same_thread=False, cached_statements=256
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return _SQLiteConnection(connection)
+
+
+def _sqlite_value(value: Any) -> Any:
+    """Convert a query parameter to a type SQLite stores"""
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class _StoredZone(SupplyDemandZone):
+    """
+    SupplyDemandZone read from the database.
+    
+    base_range and big_move are decoded from their JSON payloads on first
+    access, so listing zones doesn't pay for payloads nobody reads.
+    Compares equal to a SupplyDemandZone with the same field values.
+    """
+    
+    def __init__(self, *args, base_range_data: Any = None, big_move_data: Any = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._base_range_data = base_range_data
+        self._big_move_data = big_move_data
+    
+    @property
+    def base_range(self) -> Optional[BaseCandleRange]:
+        if '_base_range_data' in self.__dict__:
+            payload = self.__dict__.pop('_base_range_data')
+            self.__dict__['_base_range'] = SupplyDemandRepository._deserialize_base_range(payload)
+        return self.__dict__.get('_base_range')
+    
+    @base_range.setter
+    def base_range(self, value: Optional[BaseCandleRange]) -> None:
+        self.__dict__.pop('_base_range_data', None)
+        self.__dict__['_base_range'] = value
+    
+    @property
+    def big_move(self) -> Optional[BigMove]:
+        if '_big_move_data' in self.__dict__:
+            payload = self.__dict__.pop('_big_move_data')
+            self.__dict__['_big_move'] = SupplyDemandRepository._deserialize_big_move(payload)
+        return self.__dict__.get('_big_move')
+    
+    @big_move.setter
+    def big_move(self, value: Optional[BigMove]) -> None:
+        self.__dict__.pop('_big_move_data', None)
+        self.__dict__['_big_move'] = value
+    
+    def __copy__(self) -> '_StoredZone':
+        # Shallow copy without the generic reduce protocol (cache hits copy every zone)
+        clone = object.__new__(_StoredZone)
+        clone.__dict__.update(self.__dict__)
+        return clone
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SupplyDemandZone):
+            return NotImplemented
+        return all(
+            getattr(self, field.name) == getattr(other, field.name)
+            for field in fields(SupplyDemandZone)
+        )
+    
+    __hash__ = None
 
 
 class SupplyDemandRepository:
@@ -71,6 +430,16 @@ class SupplyDemandRepository:
     Provides optimized CRUD operations, history tracking, and statistics calculation
     with connection pooling and transaction management.
     
+    query_zones results are cached per normalized filter (LRU, bounded by
+    query_cache_size). Zone writes drop the cached results for the written
+    zones' symbol/timeframe, which are treated as fixed once a zone is saved.
+    Callers get copies of cached zones, so modifying them is safe.
+    
+    Zone queries and history reads page by keyset cursor rather than OFFSET,
+    and per-zone test statistics are kept in a summary table updated in the
+    same transaction as the test events, so neither slows down as the
+    tables grow.
+    
     Performance Target: <10ms per zone save, <50ms per 1000 zone query
     """
     
@@ -79,38 +448,58 @@ class SupplyDemandRepository:
         connection_string: str,
         pool_size: int = 5,
         max_overflow: int = 10,
-        echo: bool = False
+        echo: bool = False,
+        query_cache_size: int = 128
     ):
         """
         Initialize repository with database connection.
         
         Args:
-            connection_string: PostgreSQL connection string
+            connection_string: PostgreSQL connection string, or
+                sqlite:///path/to/file.db for the embedded SQLite backend
             pool_size: Base connection pool size
             max_overflow: Maximum additional connections
             echo: Enable SQL query logging
+            query_cache_size: Cached query_zones results (0 disables the cache)
             
         Raises:
             ConnectionError: If database connection fails
-            ValueError: If connection string is invalid
+            ValueError: If connection string or cache size is invalid
         """
+        if query_cache_size < 0:
+            raise ValueError(f"query_cache_size must be non-negative, got {query_cache_size}")
+        
         self.connection_string = connection_string
+        self.backend = 'sqlite' if connection_string.startswith('sqlite:') else 'postgresql'
         self.pool_size = pool_size
         self.max_overflow = max_overflow
         self.echo = echo
         
+        # Read-through cache of query_zones results keyed by normalized filter.
+        # The generation counter keeps a query that raced a write from caching
+        # its (possibly stale) result.
+        self.query_cache_size = query_cache_size
+        self._query_cache: 'OrderedDict[Tuple, List[SupplyDemandZone]]' = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_generation = 0
+        self.query_cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        
         # Initialize connection pool
         try:
-            self._connection_pool = ThreadedConnectionPool(
-                minconn=1,
-                maxconn=pool_size + max_overflow,
-                dsn=connection_string
-            )
+            if self.backend == 'sqlite':
+                path = connection_string.split(':///', 1)[1] if ':///' in connection_string else ':memory:'
+                self._connection_pool = _SQLiteConnectionPool(path or ':memory:', pool_size + max_overflow)
+            else:
+                self._connection_pool = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=pool_size + max_overflow,
+                    dsn=connection_string
+                )
             
             # Test connection and create tables if needed
             self._initialize_schema()
             
-            logger.info(f"SupplyDemandRepository initialized with pool_size={pool_size}")
+            logger.info(f"SupplyDemandRepository initialized ({self.backend}, pool_size={pool_size})")
             
         except Exception as e:
             logger.error(f"Failed to initialize repository: {e}")
@@ -118,8 +507,14 @@ class SupplyDemandRepository:
     
     def _initialize_schema(self) -> None:
         """Initialize database schema if tables don't exist"""
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
+            if self.backend == 'sqlite':
+                connection.raw.executescript(SQLITE_SCHEMA)
+                connection.cursor().execute(STATISTICS_BACKFILL)
+                connection.commit()
+                return
+            
             cursor = connection.cursor()
             
             # Create zones table
@@ -175,10 +570,27 @@ class SupplyDemandRepository:
                 );
             """)
             
-            # Create indexes for performance
+            # Create per-zone statistics summary, maintained by the test event writes
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS zone_statistics (
+                    zone_id INTEGER PRIMARY KEY REFERENCES supply_demand_zones(id) ON DELETE CASCADE,
+                    test_count INTEGER NOT NULL DEFAULT 0,
+                    success_count INTEGER NOT NULL DEFAULT 0,
+                    reaction_strength_sum NUMERIC NOT NULL DEFAULT 0,
+                    last_test_time TIMESTAMP
+                );
+            """)
+            
+            # Create indexes for performance; (created_at, id) and
+            # (zone_id, time, id) match the keyset pagination order
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_zones_symbol_timeframe 
-                ON supply_demand_zones(symbol, timeframe);
+                CREATE INDEX IF NOT EXISTS idx_zones_created_id 
+                ON supply_demand_zones(created_at, id);
+            """)
+            
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_zones_symbol_timeframe_created 
+                ON supply_demand_zones(symbol, timeframe, created_at, id);
             """)
             
             cursor.execute("""
@@ -186,16 +598,28 @@ class SupplyDemandRepository:
                 ON supply_demand_zones(status, created_at);
             """)
             
+            # Covering indexes allow index-only scans of history pages
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_updates_zone_time 
-                ON zone_state_updates(zone_id, update_time);
+                CREATE INDEX IF NOT EXISTS idx_updates_zone_time_covering 
+                ON zone_state_updates(zone_id, update_time, id)
+                INCLUDE (old_status, new_status, trigger_price, trigger_reason, test_success);
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_events_zone_time 
-                ON zone_test_events(zone_id, test_time);
+                CREATE INDEX IF NOT EXISTS idx_events_zone_time_covering 
+                ON zone_test_events(zone_id, test_time, id)
+                INCLUDE (test_price, test_type, success, reaction_strength);
             """)
             
+            # Superseded by the indexes above
+            cursor.execute("""
+                DROP INDEX IF EXISTS idx_zones_symbol_timeframe;
+                DROP INDEX IF EXISTS idx_updates_zone_time;
+                DROP INDEX IF EXISTS idx_events_zone_time;
+            """)
+            
+            cursor.execute(STATISTICS_BACKFILL)
+            
             connection.commit()
             
         except Exception as e:
@@ -206,8 +630,16 @@ class SupplyDemandRepository:
             self._return_connection(connection)
     
     def _get_connection(self):
-        """Get connection from pool"""
-        return self._connection_pool.getconn()
+        """
+        Get connection from pool.
+        
+        Raises:
+            ConnectionError: If no connection is available (e.g. after close())
+        """
+        try:
+            return self._connection_pool.getconn()
+        except Exception as e:
+            raise ConnectionError(f"Database connection unavailable: {e}")
     
     def _return_connection(self, connection) -> None:
         """Return connection to pool"""
@@ -232,14 +664,10 @@ class SupplyDemandRepository:
         if not self._validate_zone_data(zone):
             raise ValueError("Invalid zone data provided")
         
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
-            # Serialize complex objects
-            base_range_json = self._serialize_base_range(zone.base_range) if zone.base_range else None
-            big_move_json = self._serialize_big_move(zone.big_move) if zone.big_move else None
-            
             # Insert zone
             cursor.execute("""
                 INSERT INTO supply_demand_zones (
@@ -250,15 +678,11 @@ class SupplyDemandRepository:
                 ) VALUES (
                     %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                 ) RETURNING id;
-            """, (
-                zone.symbol, zone.timeframe, zone.zone_type, zone.top_price, zone.bottom_price,
-                zone.left_time, zone.right_time, zone.strength_score, zone.test_count,
-                zone.success_count, zone.status, base_range_json, big_move_json,
-                zone.atr_at_creation, zone.volume_at_creation, zone.created_at, zone.updated_at
-            ))
+            """, self._zone_row(zone))
             
             zone_id = cursor.fetchone()[0]
             connection.commit()
+            self._invalidate_query_cache([(zone.symbol, zone.timeframe)])
             
             logger.debug(f"Saved zone {zone_id} for {zone.symbol} {zone.timeframe}")
             return zone_id
@@ -283,8 +707,8 @@ class SupplyDemandRepository:
         if zone_id is None or zone_id <= 0:
             return None
         
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
             cursor.execute("""
@@ -317,8 +741,8 @@ class SupplyDemandRepository:
         if zone.id is None or zone.id <= 0:
             return False
         
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
             # Update zone with current timestamp
@@ -347,6 +771,8 @@ class SupplyDemandRepository:
             rows_affected = cursor.rowcount
             connection.commit()
             
+            if rows_affected > 0:
+                self._invalidate_query_cache([(zone.symbol, zone.timeframe)])
             return rows_affected > 0
             
         except Exception as e:
@@ -369,18 +795,21 @@ class SupplyDemandRepository:
         if zone_id is None or zone_id <= 0:
             return False
         
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
             cursor.execute("""
-                DELETE FROM supply_demand_zones WHERE id = %s;
+                DELETE FROM supply_demand_zones WHERE id = %s
+                RETURNING symbol, timeframe;
             """, (zone_id,))
             
-            rows_affected = cursor.rowcount
+            deleted = cursor.fetchall()
             connection.commit()
             
-            return rows_affected > 0
+            if deleted:
+                self._invalidate_query_cache(deleted)
+            return len(deleted) > 0
             
         except Exception as e:
             logger.error(f"Failed to delete zone {zone_id}: {e}")
@@ -393,6 +822,11 @@ class SupplyDemandRepository:
         """
         Query zones with filtering criteria.
         
+        Zones are returned newest first. For deep pages pass the
+        (created_at, id) of the last zone of the previous page as
+        ``filter_criteria.after`` rather than an offset, so each page is an
+        index seek instead of a scan over every skipped row.
+        
         Args:
             filter_criteria: ZoneQueryFilter with filter options
             
@@ -401,8 +835,19 @@ class SupplyDemandRepository:
             
         Performance: <50ms for 1000 zones
         """
+        cache_key = self._query_cache_key(filter_criteria)
+        if cache_key is not None:
+            with self._query_cache_lock:
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    self._query_cache.move_to_end(cache_key)
+                    self.query_cache_stats['hits'] += 1
+                    return [copy.copy(zone) for zone in cached]
+                self.query_cache_stats['misses'] += 1
+                generation = self._query_cache_generation
+        
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
             # Build dynamic query
@@ -446,8 +891,13 @@ class SupplyDemandRepository:
                 query_parts.append("AND created_at >= %s")
                 params.append(cutoff_time)
             
-            # Add ordering
-            query_parts.append("ORDER BY created_at DESC")
+            # Seek past the previous page instead of scanning OFFSET rows
+            if filter_criteria.after:
+                query_parts.append("AND (created_at, id) < (%s, %s)")
+                params.extend(filter_criteria.after)
+            
+            # Add ordering (id breaks ties so keyset pages are stable)
+            query_parts.append("ORDER BY created_at DESC, id DESC")
             
             # Add pagination
             if filter_criteria.limit:
@@ -467,7 +917,16 @@ class SupplyDemandRepository:
             zones = [self._row_to_zone(dict(row)) for row in rows]
             
             logger.debug(f"Queried {len(zones)} zones with filter criteria")
-            return zones
+            
+            if cache_key is None:
+                return zones
+            
+            with self._query_cache_lock:
+                if generation == self._query_cache_generation:
+                    self._query_cache[cache_key] = zones
+                    if len(self._query_cache) > self.query_cache_size:
+                        self._query_cache.popitem(last=False)
+            return [copy.copy(zone) for zone in zones]
             
         except Exception as e:
             logger.error(f"Failed to query zones: {e}")
@@ -485,8 +944,8 @@ class SupplyDemandRepository:
         Returns:
             True if save successful, False otherwise
         """
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
             cursor.execute("""
@@ -520,8 +979,8 @@ class SupplyDemandRepository:
         Returns:
             True if save successful, False otherwise
         """
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
             cursor.execute("""
@@ -534,6 +993,8 @@ class SupplyDemandRepository:
                 event.test_type, event.success, event.reaction_strength
             ))
             
+            self._update_statistics(cursor, [event])
+            
             connection.commit()
             return True
             
@@ -559,13 +1020,35 @@ class SupplyDemandRepository:
         Returns:
             List of ZoneStateUpdate objects in chronological order
         """
+        return self.get_zone_history_page(zone_id, query_params)[0]
+    
+    def get_zone_history_page(
+        self,
+        zone_id: int,
+        query_params: Optional[ZoneHistoryQuery] = None
+    ) -> Tuple[List[ZoneStateUpdate], Optional[Tuple[datetime, int]]]:
+        """
+        Get one keyset page of zone state update history.
+        
+        Pages seek on (zone_id, update_time, id) through the covering index,
+        so page N costs the same as page 1. Pass the returned cursor as
+        ``query_params.after`` to fetch the next page.
+        
+        Args:
+            zone_id: Zone ID to get history for
+            query_params: Optional query parameters for filtering and paging
+            
+        Returns:
+            Tuple of (updates in chronological order, cursor for the next
+            page or None when there are no more rows)
+        """
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
             # Build query
             query_parts = ["""
-                SELECT zone_id, old_status, new_status, update_time,
+                SELECT id, zone_id, old_status, new_status, update_time,
                        trigger_price, trigger_reason, test_success
                 FROM zone_state_updates WHERE zone_id = %s
             """]
@@ -587,12 +1070,17 @@ class SupplyDemandRepository:
                 
                 if query_params.success_only:
                     query_parts.append("AND test_success = TRUE")
+                
+                if query_params.after:
+                    query_parts.append("AND (update_time, id) > (%s, %s)")
+                    params.extend(query_params.after)
             
-            query_parts.append("ORDER BY update_time ASC")
+            query_parts.append("ORDER BY update_time ASC, id ASC")
             
-            if query_params and query_params.limit:
+            limit = query_params.limit if query_params else None
+            if limit:
                 query_parts.append("LIMIT %s")
-                params.append(query_params.limit)
+                params.append(limit)
             
             query = " ".join(query_parts)
             cursor.execute(query, params)
@@ -612,11 +1100,15 @@ class SupplyDemandRepository:
                 )
                 updates.append(update)
             
-            return updates
+            next_cursor = None
+            if limit and len(rows) == limit:
+                next_cursor = (rows[-1]['update_time'], rows[-1]['id'])
+            
+            return updates, next_cursor
             
         except Exception as e:
             logger.error(f"Failed to get zone history for {zone_id}: {e}")
-            return []
+            return [], None
         finally:
             self._return_connection(connection)
     
@@ -635,13 +1127,35 @@ class SupplyDemandRepository:
         Returns:
             List of ZoneTestEvent objects in chronological order
         """
+        return self.get_test_events_page(zone_id, query_params)[0]
+    
+    def get_test_events_page(
+        self,
+        zone_id: int,
+        query_params: Optional[ZoneHistoryQuery] = None
+    ) -> Tuple[List[ZoneTestEvent], Optional[Tuple[datetime, int]]]:
+        """
+        Get one keyset page of zone test events.
+        
+        Pages seek on (zone_id, test_time, id) through the covering index.
+        Pass the returned cursor as ``query_params.after`` to fetch the
+        next page.
+        
+        Args:
+            zone_id: Zone ID to get events for
+            query_params: Optional query parameters for filtering and paging
+            
+        Returns:
+            Tuple of (events in chronological order, cursor for the next
+            page or None when there are no more rows)
+        """
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
             # Build query
             query_parts = ["""
-                SELECT zone_id, test_time, test_price, test_type,
+                SELECT id, zone_id, test_time, test_price, test_type,
                        success, reaction_strength
                 FROM zone_test_events WHERE zone_id = %s
             """]
@@ -663,12 +1177,17 @@ class SupplyDemandRepository:
                 
                 if query_params.success_only:
                     query_parts.append("AND success = TRUE")
+                
+                if query_params.after:
+                    query_parts.append("AND (test_time, id) > (%s, %s)")
+                    params.extend(query_params.after)
             
-            query_parts.append("ORDER BY test_time ASC")
+            query_parts.append("ORDER BY test_time ASC, id ASC")
             
-            if query_params and query_params.limit:
+            limit = query_params.limit if query_params else None
+            if limit:
                 query_parts.append("LIMIT %s")
-                params.append(query_params.limit)
+                params.append(limit)
             
             query = " ".join(query_parts)
             cursor.execute(query, params)
@@ -687,11 +1206,15 @@ class SupplyDemandRepository:
                 )
                 events.append(event)
             
-            return events
+            next_cursor = None
+            if limit and len(rows) == limit:
+                next_cursor = (rows[-1]['test_time'], rows[-1]['id'])
+            
+            return events, next_cursor
             
         except Exception as e:
             logger.error(f"Failed to get test events for {zone_id}: {e}")
-            return []
+            return [], None
         finally:
             self._return_connection(connection)
     
@@ -699,39 +1222,37 @@ class SupplyDemandRepository:
         """
         Get calculated statistics for a zone.
         
+        Reads the zone_statistics summary that save_test_event and
+        save_test_events maintain, so the cost does not grow with the
+        number of test events.
+        
         Args:
             zone_id: Zone ID to get statistics for
             
         Returns:
             Dictionary with zone statistics
         """
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor(cursor_factory=RealDictCursor)
             
-            # Get test statistics
             cursor.execute("""
-                SELECT 
-                    COUNT(*) as test_count,
-                    COUNT(*) FILTER (WHERE success = TRUE) as success_count,
-                    AVG(reaction_strength) as avg_reaction_strength,
-                    MAX(test_time) as last_test_time
-                FROM zone_test_events 
+                SELECT test_count, success_count, reaction_strength_sum, last_test_time
+                FROM zone_statistics
                 WHERE zone_id = %s;
             """, (zone_id,))
             
             stats_row = cursor.fetchone()
             
-            if stats_row:
-                test_count = stats_row['test_count'] or 0
-                success_count = stats_row['success_count'] or 0
-                success_rate = (success_count / test_count) if test_count > 0 else 0.0
+            if stats_row and stats_row['test_count']:
+                test_count = stats_row['test_count']
+                success_count = stats_row['success_count']
                 
                 return {
                     'test_count': test_count,
                     'success_count': success_count,
-                    'success_rate': success_rate,
-                    'average_reaction_strength': float(stats_row['avg_reaction_strength'] or 0.0),
+                    'success_rate': success_count / test_count,
+                    'average_reaction_strength': float(stats_row['reaction_strength_sum']) / test_count,
                     'last_test_time': stats_row['last_test_time'],
                     'total_penetrations': test_count  # All tests are penetrations
                 }
@@ -763,53 +1284,45 @@ class SupplyDemandRepository:
         """
         Bulk save multiple zones for performance.
         
+        Valid zones are inserted with multi-row INSERT statements of up to
+        BULK_PAGE_SIZE rows in a single transaction.
+        
         Args:
             zones: List of SupplyDemandZone objects to save
             
         Returns:
-            List of generated zone IDs
+            List of generated zone IDs (None for zones skipped as invalid)
         """
         if not zones:
             return []
         
-        zone_ids = []
+        zone_ids: List[Optional[int]] = [None] * len(zones)
         
+        rows = []
+        positions = []
+        for position, zone in enumerate(zones):
+            if not self._validate_zone_data(zone):
+                logger.warning(f"Skipping invalid zone data for {zone.symbol}")
+                continue
+            
+            rows.append(self._zone_row(zone))
+            positions.append(position)
+        
+        if not rows:
+            return zone_ids
+        
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
-            # Use batch insert for performance
-            for zone in zones:
-                if not self._validate_zone_data(zone):
-                    logger.warning(f"Skipping invalid zone data for {zone.symbol}")
-                    zone_ids.append(None)
-                    continue
-                
-                # Serialize complex objects
-                base_range_json = self._serialize_base_range(zone.base_range) if zone.base_range else None
-                big_move_json = self._serialize_big_move(zone.big_move) if zone.big_move else None
-                
-                cursor.execute("""
-                    INSERT INTO supply_demand_zones (
-                        symbol, timeframe, zone_type, top_price, bottom_price,
-                        left_time, right_time, strength_score, test_count, success_count,
-                        status, base_range_data, big_move_data, atr_at_creation,
-                        volume_at_creation, created_at, updated_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    ) RETURNING id;
-                """, (
-                    zone.symbol, zone.timeframe, zone.zone_type, zone.top_price, zone.bottom_price,
-                    zone.left_time, zone.right_time, zone.strength_score, zone.test_count,
-                    zone.success_count, zone.status, base_range_json, big_move_json,
-                    zone.atr_at_creation, zone.volume_at_creation, zone.created_at, zone.updated_at
-                ))
-                
-                zone_id = cursor.fetchone()[0]
-                zone_ids.append(zone_id)
+            returned = self._insert_zone_rows(cursor, rows)
+            
+            for position, zone_id in zip(positions, returned):
+                zone_ids[position] = zone_id
             
             connection.commit()
-            logger.info(f"Bulk saved {len(zone_ids)} zones")
+            self._invalidate_query_cache((zone.symbol, zone.timeframe) for zone in zones)
+            logger.info(f"Bulk saved {len(returned)} zones")
             return zone_ids
             
         except Exception as e:
@@ -819,41 +1332,322 @@ class SupplyDemandRepository:
         finally:
             self._return_connection(connection)
     
-    def cleanup_old_zones(self, max_age_hours: int) -> int:
+    def bulk_upsert_zones(self, zones: List[SupplyDemandZone]) -> List[Optional[int]]:
         """
-        Clean up zones older than specified age.
+        Batched equivalent of update_zone and save_zone.
+        
+        Zones with an ID are updated by a single UPDATE ... FROM (VALUES ...)
+        statement per BULK_PAGE_SIZE zones and zones without one are inserted,
+        all in one transaction. updated_at is set on updated zones as
+        update_zone does.
         
         Args:
-            max_age_hours: Maximum age in hours before cleanup
+            zones: Zones to update or insert
             
         Returns:
-            Number of zones cleaned up
+            Zone IDs in input order; None for invalid zones and for IDs that
+            do not exist in the database
         """
+        if not zones:
+            return []
+        
+        zone_ids: List[Optional[int]] = [None] * len(zones)
+        
+        update_rows = []
+        insert_rows = []
+        insert_positions = []
+        update_positions: Dict[int, List[int]] = {}
+        now = datetime.now()
+        
+        for position, zone in enumerate(zones):
+            if not self._validate_zone_data(zone):
+                logger.warning(f"Skipping invalid zone data for {zone.symbol}")
+                continue
+            
+            if zone.id is None:
+                insert_rows.append(self._zone_row(zone))
+                insert_positions.append(position)
+            elif zone.id > 0:
+                zone.updated_at = now
+                update_rows.append((zone.id,) + self._zone_row(zone)[:-2] + (zone.updated_at,))
+                update_positions.setdefault(zone.id, []).append(position)
+        
+        connection = self._get_connection()
         try:
-            connection = self._get_connection()
             cursor = connection.cursor()
             
-            cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+            if update_rows and self.backend == 'sqlite':
+                # Reuses one prepared statement; all rows share the transaction
+                update_query = f"""
+                    UPDATE supply_demand_zones SET
+                        {', '.join(f'{column} = %s' for column in ZONE_INSERT_COLUMNS[:-2])},
+                        updated_at = %s
+                    WHERE id = %s;
+                """
+                for row in update_rows:
+                    cursor.execute(update_query, row[1:] + row[:1])
+                    if cursor.rowcount > 0:
+                        for position in update_positions[row[0]]:
+                            zone_ids[position] = row[0]
+            
+            elif update_rows:
+                updated = execute_values(cursor, """
+                    UPDATE supply_demand_zones AS z SET
+                        symbol = v.symbol, timeframe = v.timeframe, zone_type = v.zone_type,
+                        top_price = v.top_price, bottom_price = v.bottom_price,
+                        left_time = v.left_time, right_time = v.right_time,
+                        strength_score = v.strength_score, test_count = v.test_count,
+                        success_count = v.success_count, status = v.status,
+                        base_range_data = v.base_range_data, big_move_data = v.big_move_data,
+                        atr_at_creation = v.atr_at_creation,
+                        volume_at_creation = v.volume_at_creation, updated_at = v.updated_at
+                    FROM (VALUES %s) AS v (
+                        id, symbol, timeframe, zone_type, top_price, bottom_price,
+                        left_time, right_time, strength_score, test_count, success_count,
+                        status, base_range_data, big_move_data, atr_at_creation,
+                        volume_at_creation, updated_at
+                    )
+                    WHERE z.id = v.id
+                    RETURNING z.id;
+                """, update_rows, template=ZONE_UPDATE_TEMPLATE, page_size=BULK_PAGE_SIZE, fetch=True)
+                
+                for (zone_id,) in updated:
+                    for position in update_positions.get(zone_id, ()):
+                        zone_ids[position] = zone_id
             
-            # Delete old zones (cascade will handle related records)
-            cursor.execute("""
-                DELETE FROM supply_demand_zones 
-                WHERE created_at < %s AND status IN ('expired', 'broken');
-            """, (cutoff_time,))
+            if insert_rows:
+                inserted = self._insert_zone_rows(cursor, insert_rows)
+                
+                for position, zone_id in zip(insert_positions, inserted):
+                    zone_ids[position] = zone_id
             
-            cleanup_count = cursor.rowcount
             connection.commit()
+            self._invalidate_query_cache((zone.symbol, zone.timeframe) for zone in zones)
+            logger.info(f"Bulk upserted {len(update_rows)} updated and {len(insert_rows)} new zones")
+            return zone_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk upsert zones: {e}")
+            connection.rollback()
+            raise RuntimeError(f"Bulk zone upsert failed: {e}")
+        finally:
+            self._return_connection(connection)
+    
+    def save_zone_updates(self, updates: List[ZoneStateUpdate]) -> int:
+        """
+        Bulk save zone state updates with COPY in a single transaction.
+        
+        Args:
+            updates: ZoneStateUpdate objects to save
             
-            logger.info(f"Cleaned up {cleanup_count} old zones")
-            return cleanup_count
+        Returns:
+            Number of updates saved (0 if the batch failed)
+        """
+        if not updates:
+            return 0
+        
+        rows = [
+            (
+                update.zone_id, update.old_status, update.new_status,
+                update.update_time, update.trigger_price, update.trigger_reason,
+                update.test_success
+            )
+            for update in updates
+        ]
+        
+        return self._copy_rows(
+            'zone_state_updates',
+            ('zone_id', 'old_status', 'new_status', 'update_time',
+             'trigger_price', 'trigger_reason', 'test_success'),
+            rows
+        )
+    
+    def save_test_events(self, events: List[ZoneTestEvent]) -> int:
+        """
+        Bulk save zone test events with COPY in a single transaction.
+        
+        Args:
+            events: ZoneTestEvent objects to save
+            
+        Returns:
+            Number of events saved (0 if the batch failed)
+        """
+        if not events:
+            return 0
+        
+        rows = [
+            (
+                event.zone_id, event.test_time, event.test_price,
+                event.test_type, event.success, event.reaction_strength
+            )
+            for event in events
+        ]
+        
+        return self._copy_rows(
+            'zone_test_events',
+            ('zone_id', 'test_time', 'test_price', 'test_type',
+             'success', 'reaction_strength'),
+            rows,
+            finalize=lambda cursor: self._update_statistics(cursor, events)
+        )
+    
+    def cleanup_old_zones(
+        self,
+        max_age_hours: int,
+        batch_size: int = CLEANUP_BATCH_SIZE,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> int:
+        """
+        Clean up zones older than specified age.
+        
+        Expired and broken zones are removed batch_size at a time. Their
+        state updates and test events are deleted first in chunks of at most
+        batch_size rows, each chunk in its own short transaction, so the
+        cascade never holds locks on a large set of rows and writers only
+        wait for one chunk. Each chunk only deletes history of zones that
+        still match, so a zone updated while cleanup runs keeps its history
+        and statistics. If cleanup stops part way, the zones that remain
+        still match and are picked up by the next run.
+        
+        Args:
+            max_age_hours: Maximum age in hours before cleanup
+            batch_size: Maximum rows deleted per statement and transaction
+            progress_callback: Called after each committed chunk with running
+                totals (zones_deleted, updates_deleted, events_deleted, batches)
+            
+        Returns:
+            Number of zones cleaned up
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        
+        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        progress = {'zones_deleted': 0, 'updates_deleted': 0, 'events_deleted': 0, 'batches': 0}
+        
+        def commit_chunk(key: str, count: int) -> None:
+            connection.commit()
+            progress[key] += count
+            progress['batches'] += 1
+            if progress_callback is not None:
+                progress_callback(dict(progress))
+        
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            last_key = None
+            
+            while True:
+                # Seek past earlier batches rather than rescanning deleted rows
+                seek = "AND (created_at, id) > (%s, %s)" if last_key else ""
+                cursor.execute(f"""
+                    SELECT id, created_at FROM supply_demand_zones
+                    WHERE {CLEANUP_ZONE_CONDITION} {seek}
+                    ORDER BY created_at, id
+                    LIMIT %s;
+                """, (cutoff_time, *(last_key or ()), batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                
+                zone_ids = [row[0] for row in rows]
+                last_key = (rows[-1][1], rows[-1][0])
+                placeholders = ", ".join(["%s"] * len(zone_ids))
+                
+                history_rows = dict.fromkeys(zone_ids, 0)
+                
+                # Empty the cascade targets first, in chunks of whole zones where they fit
+                for table, time_column, key in CLEANUP_HISTORY_TABLES:
+                    cursor.execute(f"""
+                        SELECT zone_id, COUNT(*) FROM {table}
+                        WHERE zone_id IN ({placeholders})
+                        GROUP BY zone_id;
+                    """, zone_ids)
+                    counts = cursor.fetchall()
+                    connection.commit()
+                    for zone_id, row_count in counts:
+                        history_rows[zone_id] += row_count
+                    
+                    for group, row_count in self._group_by_row_count(counts, batch_size):
+                        if row_count <= batch_size:
+                            cursor.execute(f"""
+                                DELETE FROM {table} WHERE zone_id IN (
+                                    SELECT id FROM supply_demand_zones
+                                    WHERE id IN ({', '.join(['%s'] * len(group))}) AND {CLEANUP_ZONE_CONDITION}
+                                );
+                            """, (*group, cutoff_time))
+                            commit_chunk(key, cursor.rowcount)
+                            continue
+                        
+                        # Zone larger than a chunk: seek through its keyset index
+                        position = None
+                        while True:
+                            seek = f"AND ({time_column}, id) > (%s, %s)" if position else ""
+                            cursor.execute(f"""
+                                DELETE FROM {table} WHERE id IN (
+                                    SELECT id FROM {table} WHERE zone_id IN (
+                                        SELECT id FROM supply_demand_zones
+                                        WHERE id = %s AND {CLEANUP_ZONE_CONDITION}
+                                    ) {seek}
+                                    ORDER BY {time_column}, id
+                                    LIMIT %s
+                                ) RETURNING {time_column}, id;
+                            """, (group[0], cutoff_time, *(position or ()), batch_size))
+                            deleted = cursor.fetchall()
+                            commit_chunk(key, len(deleted))
+                            if len(deleted) < batch_size:
+                                break
+                            position = tuple(max(deleted))
+                
+                # Cascade checks walk the removed history until it is vacuumed,
+                # so zone chunks are bounded by history rows as well.
+                for group, _ in self._group_by_row_count(
+                    [(zone_id, rows_removed + 1) for zone_id, rows_removed in history_rows.items()],
+                    batch_size
+                ):
+                    cursor.execute(f"""
+                        DELETE FROM supply_demand_zones
+                        WHERE id IN ({', '.join(['%s'] * len(group))})
+                        AND {CLEANUP_ZONE_CONDITION};
+                    """, (*group, cutoff_time))
+                    commit_chunk('zones_deleted', cursor.rowcount)
+                
+                if len(zone_ids) < batch_size:
+                    break
+            
+            logger.info(
+                f"Cleaned up {progress['zones_deleted']} old zones "
+                f"({progress['updates_deleted']} updates, {progress['events_deleted']} test events) "
+                f"in {progress['batches']} batches"
+            )
+            return progress['zones_deleted']
             
         except Exception as e:
             logger.error(f"Failed to cleanup old zones: {e}")
             connection.rollback()
-            return 0
+            return progress['zones_deleted']
         finally:
+            if progress['zones_deleted'] > 0:
+                self._invalidate_query_cache()
             self._return_connection(connection)
     
+    @staticmethod
+    def _group_by_row_count(counts: List[Tuple[int, int]], budget: int) -> List[Tuple[List[int], int]]:
+        """Pack (zone_id, row_count) pairs into zone groups of at most budget rows; larger zones stand alone"""
+        groups = []
+        group, group_rows = [], 0
+        for zone_id, row_count in counts:
+            if row_count > budget:
+                groups.append(([zone_id], row_count))
+                continue
+            if group and group_rows + row_count > budget:
+                groups.append((group, group_rows))
+                group, group_rows = [], 0
+            group.append(zone_id)
+            group_rows += row_count
+        if group:
+            groups.append((group, group_rows))
+        return groups
+    
     def close(self) -> None:
         """Close connection pool and cleanup resources"""
         try:
@@ -863,6 +1657,191 @@ class SupplyDemandRepository:
         except Exception as e:
             logger.error(f"Error closing repository: {e}")
     
+    def clear_query_cache(self) -> None:
+        """Drop all cached query_zones results (e.g. after writes by other processes)"""
+        self._invalidate_query_cache()
+    
+    def _query_cache_key(self, filter_criteria: ZoneQueryFilter) -> Optional[Tuple]:
+        """
+        Normalize a filter into a cache key.
+        
+        Values query_zones ignores (empty strings, offset without limit,
+        min_age_hours) are dropped so equivalent filters share an entry.
+        
+        Returns:
+            Cache key, or None if the result must not be cached
+        """
+        # Age filters are relative to the current time
+        if not self.query_cache_size or filter_criteria.max_age_hours:
+            return None
+        
+        return (
+            filter_criteria.symbol or None,
+            filter_criteria.timeframe or None,
+            filter_criteria.zone_type or None,
+            filter_criteria.status or None,
+            filter_criteria.min_strength,
+            filter_criteria.max_strength,
+            filter_criteria.created_after or None,
+            filter_criteria.created_before or None,
+            filter_criteria.limit or None,
+            (filter_criteria.offset or None) if filter_criteria.limit else None,
+            tuple(filter_criteria.after) if filter_criteria.after else None
+        )
+    
+    def _invalidate_query_cache(self, partitions: Optional[Iterable[Tuple[str, str]]] = None) -> None:
+        """
+        Drop cached query results a write may have changed.
+        
+        Args:
+            partitions: (symbol, timeframe) pairs written (None drops everything)
+        """
+        if not self.query_cache_size:
+            return
+        
+        partitions = None if partitions is None else {tuple(partition) for partition in partitions}
+        
+        with self._query_cache_lock:
+            self._query_cache_generation += 1
+            
+            if partitions is None:
+                stale = list(self._query_cache)
+            else:
+                # Keys start with (symbol, timeframe); None matches any value
+                stale = [
+                    key for key in self._query_cache
+                    if any(
+                        key[0] in (None, symbol) and key[1] in (None, timeframe)
+                        for symbol, timeframe in partitions
+                    )
+                ]
+            
+            for key in stale:
+                del self._query_cache[key]
+            self.query_cache_stats['invalidations'] += len(stale)
+    
+    def _insert_zone_rows(self, cursor: Any, rows: List[Tuple]) -> List[int]:
+        """Insert rows in ZONE_INSERT_COLUMNS order, returning their IDs in row order"""
+        if self.backend == 'sqlite':
+            # Reuses one prepared statement; all rows share the caller's transaction
+            insert_query = f"""
+                INSERT INTO supply_demand_zones ({', '.join(ZONE_INSERT_COLUMNS)})
+                VALUES ({', '.join(['%s'] * len(ZONE_INSERT_COLUMNS))});
+            """
+            zone_ids = []
+            for row in rows:
+                cursor.execute(insert_query, row)
+                zone_ids.append(cursor.lastrowid)
+            return zone_ids
+        
+        # Multi-row VALUES insert rows and return IDs in row order
+        returned = execute_values(cursor, f"""
+            INSERT INTO supply_demand_zones ({', '.join(ZONE_INSERT_COLUMNS)})
+            VALUES %s RETURNING id;
+        """, rows, page_size=BULK_PAGE_SIZE, fetch=True)
+        return [zone_id for (zone_id,) in returned]
+    
+    def _copy_rows(
+        self,
+        table: str,
+        columns: Tuple[str, ...],
+        rows: List[Tuple],
+        finalize: Optional[Callable[[Any], None]] = None
+    ) -> int:
+        """
+        COPY rows into a table (executemany on SQLite) in a single transaction.
+        
+        Args:
+            table: Target table
+            columns: Column names in row order
+            rows: Rows to write
+            finalize: Called with the cursor before commit, for writes that
+                must be atomic with the rows
+            
+        Returns:
+            Number of rows written (0 if the batch failed)
+        """
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            
+            if self.backend == 'sqlite':
+                cursor.executemany(f"""
+                    INSERT INTO {table} ({', '.join(columns)})
+                    VALUES ({', '.join(['%s'] * len(columns))});
+                """, rows)
+            else:
+                buffer = io.StringIO()
+                for row in rows:
+                    buffer.write('\t'.join(self._copy_value(value) for value in row))
+                    buffer.write('\n')
+                buffer.seek(0)
+                
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+            
+            if finalize is not None:
+                finalize(cursor)
+            
+            connection.commit()
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Failed to copy {len(rows)} rows into {table}: {e}")
+            connection.rollback()
+            return 0
+        finally:
+            self._return_connection(connection)
+    
+    def _update_statistics(self, cursor: Any, events: List[ZoneTestEvent]) -> None:
+        """Add test events to the per-zone statistics summary in the caller's transaction"""
+        totals: Dict[int, List[Any]] = {}
+        for event in events:
+            if event.zone_id is None:
+                continue
+            total = totals.setdefault(event.zone_id, [0, 0, 0.0, event.test_time])
+            total[0] += 1
+            total[1] += 1 if event.success else 0
+            # Matches the DECIMAL(4, 3) value stored in zone_test_events
+            total[2] += round(float(event.reaction_strength), 3)
+            total[3] = max(total[3], event.test_time)
+        
+        # Zone order keeps concurrent writers from deadlocking on summary rows
+        rows = [(zone_id,) + tuple(total) for zone_id, total in sorted(totals.items())]
+        if not rows:
+            return
+        
+        if self.backend == 'sqlite':
+            cursor.executemany(STATISTICS_UPSERT.replace('%s', '(%s, %s, %s, %s, %s)'), rows)
+        else:
+            execute_values(cursor, STATISTICS_UPSERT, rows, page_size=BULK_PAGE_SIZE)
+    
+    @staticmethod
+    def _copy_value(value: Any) -> str:
+        """Format a value for COPY text format"""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        
+        text = str(value)
+        return (text.replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+    
+    def _zone_row(self, zone: SupplyDemandZone) -> Tuple:
+        """Zone values in ZONE_INSERT_COLUMNS order"""
+        # Serialize complex objects
+        base_range_json = self._serialize_base_range(zone.base_range) if zone.base_range else None
+        big_move_json = self._serialize_big_move(zone.big_move) if zone.big_move else None
+        
+        return (
+            zone.symbol, zone.timeframe, zone.zone_type, zone.top_price, zone.bottom_price,
+            zone.left_time, zone.right_time, zone.strength_score, zone.test_count,
+            zone.success_count, zone.status, base_range_json, big_move_json,
+            zone.atr_at_creation, zone.volume_at_creation, zone.created_at, zone.updated_at
+        )
+    
     def _validate_zone_data(self, zone: SupplyDemandZone) -> bool:
         """Validate zone data before saving"""
         if not zone.symbol or not zone.timeframe:
@@ -913,13 +1892,14 @@ class SupplyDemandRepository:
             'volume_confirmation': big_move.volume_confirmation
         })
     
-    def _deserialize_base_range(self, json_data: str) -> Optional[BaseCandleRange]:
-        """Deserialize BaseCandleRange from JSON"""
+    @staticmethod
+    def _deserialize_base_range(json_data: Any) -> Optional[BaseCandleRange]:
+        """Deserialize BaseCandleRange from JSON (text or already decoded JSONB)"""
         if not json_data:
             return None
         
         try:
-            data = json.loads(json_data)
+            data = json_data if isinstance(json_data, dict) else json.loads(json_data)
             return BaseCandleRange(
                 start_index=data['start_index'],
                 end_index=data['end_index'],
@@ -935,13 +1915,14 @@ class SupplyDemandRepository:
             logger.warning(f"Failed to deserialize base range: {e}")
             return None
     
-    def _deserialize_big_move(self, json_data: str) -> Optional[BigMove]:
-        """Deserialize BigMove from JSON"""
+    @staticmethod
+    def _deserialize_big_move(json_data: Any) -> Optional[BigMove]:
+        """Deserialize BigMove from JSON (text or already decoded JSONB)"""
         if not json_data:
             return None
         
         try:
-            data = json.loads(json_data)
+            data = json_data if isinstance(json_data, dict) else json.loads(json_data)
             return BigMove(
                 start_index=data['start_index'],
                 end_index=data['end_index'],
@@ -958,12 +1939,8 @@ class SupplyDemandRepository:
             return None
     
     def _row_to_zone(self, row: Dict[str, Any]) -> SupplyDemandZone:
-        """Convert database row to SupplyDemandZone object"""
-        # Deserialize complex objects
-        base_range = self._deserialize_base_range(row.get('base_range_data'))
-        big_move = self._deserialize_big_move(row.get('big_move_data'))
-        
-        return SupplyDemandZone(
+        """Convert database row to SupplyDemandZone object (payloads decoded lazily)"""
+        return _StoredZone(
             id=row['id'],
             symbol=row['symbol'],
             timeframe=row['timeframe'],
@@ -976,12 +1953,14 @@ class SupplyDemandRepository:
             test_count=row['test_count'],
             success_count=row['success_count'],
             status=row['status'],
-            base_range=base_range,
-            big_move=big_move,
+            base_range=None,
+            big_move=None,
             atr_at_creation=float(row['atr_at_creation']) if row['atr_at_creation'] else 0.0,
             volume_at_creation=float(row['volume_at_creation']) if row['volume_at_creation'] else 0.0,
             created_at=row['created_at'],
-            updated_at=row['updated_at']
+            updated_at=row['updated_at'],
+            base_range_data=row.get('base_range_data'),
+            big_move_data=row.get('big_move_data')
         )
 
 
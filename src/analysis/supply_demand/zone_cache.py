@@ -0,0 +1,207 @@
+"""
+ZoneSetCache - Cached Zone Sets for Repeated Polling
+
+Keeps one IncrementalZonePipeline and its loaded bars per (symbol, timeframe).
+A request only asks the bar loader for bars at or after the last cached bar:
+when nothing changed the cached zone set is returned as is, and new or revised
+bars are appended to the pipeline instead of re-running detection over the
+whole window.
+
+Performance Target: repeated polls without new bars cost one small bar query
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+import pandas as pd
+
+from .zone_detector import SupplyDemandZoneDetector, SupplyDemandZone
+from .zone_pipeline import IncrementalZonePipeline
+
+logger = logging.getLogger(__name__)
+
+# Bars loaded when a zone set is first built or rebuilt
+DEFAULT_LOOKBACK_BARS = 1000
+
+# Cached bars before the window is cut back to the lookback and rebuilt
+DEFAULT_MAX_BARS = 5000
+
+# Bar values compared to tell a revised last bar from an unchanged one
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# load_bars(since, limit): the latest `limit` bars with time >= since (all
+# bars when since is None) as a time-ordered OHLCV DataFrame with a 'time' column
+BarLoader = Callable[[Optional[datetime], int], pd.DataFrame]
+
+
+@dataclass
+class _ZoneSetEntry:
+    """Cached state of one (symbol, timeframe)."""
+    pipeline: IncrementalZonePipeline
+    bars: pd.DataFrame
+    zones: List[SupplyDemandZone] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ZoneSetCache:
+    """
+    Per-(symbol, timeframe) zone sets refreshed incrementally from new bars.
+
+    Zones are returned strongest first. The window starts with the last
+    lookback_bars bars and grows as bars arrive; once it exceeds max_bars it
+    is cut back to the last lookback_bars bars and detected again, so memory
+    stays bounded on long-running servers. A refresh that returns max_bars
+    bars may have skipped bars since the last poll and is treated as a new
+    window as well.
+    """
+
+    def __init__(
+        self,
+        detector_factory: Callable[[], SupplyDemandZoneDetector],
+        lookback_bars: int = DEFAULT_LOOKBACK_BARS,
+        max_bars: int = DEFAULT_MAX_BARS
+    ):
+        """
+        Initialize zone set cache.
+
+        Args:
+            detector_factory: Returns a new SupplyDemandZoneDetector; each
+                (symbol, timeframe) pipeline takes over its own detector
+            lookback_bars: Bars loaded for a new zone set
+            max_bars: Bars kept before the window is rebuilt
+
+        Raises:
+            ValueError: If lookback_bars is not positive or max_bars < lookback_bars
+        """
+        if lookback_bars <= 0:
+            raise ValueError(f"lookback_bars must be positive, got {lookback_bars}")
+        if max_bars < lookback_bars:
+            raise ValueError(f"max_bars must be at least lookback_bars, got {max_bars}")
+
+        self.detector_factory = detector_factory
+        self.lookback_bars = lookback_bars
+        self.max_bars = max_bars
+        self._entries: Dict[Tuple[str, str], _ZoneSetEntry] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'refreshes': 0,
+            'rebuilds': 0,
+            'bars_processed': 0
+        }
+
+    def get_zones(self, symbol: str, timeframe: str, load_bars: BarLoader) -> List[SupplyDemandZone]:
+        """
+        Current zones for a symbol and timeframe, strongest first.
+
+        Args:
+            symbol: Trading symbol (e.g., 'EURUSD')
+            timeframe: Timeframe (e.g., 'M1', 'H1')
+            load_bars: Bar loader for this symbol and timeframe
+
+        Returns:
+            Detected zones (empty when there are no bars)
+
+        Raises:
+            ValueError: If zone detection fails; the cached zone set is dropped
+        """
+        key = (symbol, timeframe)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ZoneSetEntry(
+                    pipeline=IncrementalZonePipeline(self.detector_factory(), symbol, timeframe),
+                    bars=pd.DataFrame()
+                )
+                self._entries[key] = entry
+
+        with entry.lock:
+            try:
+                return self._refresh(entry, load_bars)
+            except Exception:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                raise
+
+    def bar_count(self, symbol: str, timeframe: str) -> int:
+        """Number of bars cached for a symbol and timeframe."""
+        entry = self._entries.get((symbol, timeframe))
+        return len(entry.bars) if entry is not None else 0
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """
+        Drop cached zone sets, e.g. after historical bars were re-imported.
+
+        Args:
+            symbol: Only drop this symbol (default: all)
+            timeframe: Only drop this timeframe (default: all)
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._entries[key]
+
+    def _refresh(self, entry: _ZoneSetEntry, load_bars: BarLoader) -> List[SupplyDemandZone]:
+        """Bring one entry up to date with the loader and return its zones."""
+        if len(entry.bars) == 0:
+            return self._rebuild(entry, load_bars(None, self.lookback_bars))
+
+        last_bar = entry.bars.iloc[-1]
+        new_bars = load_bars(last_bar['time'].to_pydatetime(), self.max_bars)
+
+        if len(new_bars) >= self.max_bars:
+            return self._rebuild(entry, new_bars)
+
+        # The first loaded bar is the cached last bar, possibly revised
+        if len(new_bars) > 0 and new_bars['time'].iloc[0] == last_bar['time']:
+            if new_bars[BAR_COLUMNS].iloc[0].equals(last_bar[BAR_COLUMNS].astype(float)):
+                new_bars = new_bars.iloc[1:]
+            else:
+                entry.bars = entry.bars.iloc[:-1]
+
+        if len(new_bars) == 0:
+            self.stats['hits'] += 1
+            return entry.zones
+
+        bars = pd.concat([entry.bars, new_bars], ignore_index=True)
+        if len(bars) > self.max_bars:
+            return self._rebuild(entry, bars)
+
+        entry.bars = bars
+        entry.pipeline.update(bars)
+        entry.zones = self._ranked(entry.pipeline.zones)
+
+        self.stats['refreshes'] += 1
+        self.stats['bars_processed'] += len(new_bars)
+        return entry.zones
+
+    def _rebuild(self, entry: _ZoneSetEntry, bars: pd.DataFrame) -> List[SupplyDemandZone]:
+        """Detect an entry again from the last lookback_bars of bars."""
+        bars = bars.iloc[-self.lookback_bars:].reset_index(drop=True)
+
+        entry.pipeline.reset()
+        entry.bars = bars
+        entry.zones = []
+        if len(bars) > 0:
+            entry.pipeline.update(bars)
+            entry.zones = self._ranked(entry.pipeline.zones)
+
+        logger.debug(
+            f"Rebuilt zone set for {entry.pipeline.symbol} {entry.pipeline.timeframe} "
+            f"from {len(bars)} bars: {len(entry.zones)} zones"
+        )
+
+        self.stats['rebuilds'] += 1
+        self.stats['bars_processed'] += len(bars)
+        return entry.zones
+
+    @staticmethod
+    def _ranked(zones: List[SupplyDemandZone]) -> List[SupplyDemandZone]:
+        """Zones strongest first."""
+        return sorted(zones, key=lambda zone: zone.strength_score, reverse=True)
@@ -8,6 +8,8 @@ to identify institutional order flow areas.
 Performance Target: <50ms per complete detection cycle
 """
 
+import bisect
+import heapq
 import pandas as pd
 import numpy as np
 from typing import List, Optional, Tuple, Dict, Any
@@ -128,6 +130,10 @@ class SupplyDemandZoneDetector:
         self.overlap_tolerance = overlap_tolerance
         self._zone_cache: List[SupplyDemandZone] = []
         
+        # Both detectors read bar features from one cache per dataset
+        self.feature_cache = base_detector.feature_cache
+        move_detector.feature_cache = self.feature_cache
+        
         logger.debug(f"SupplyDemandZoneDetector initialized with max_zones={max_zones_per_timeframe}")
     
     def _validate_parameters(
@@ -256,18 +262,15 @@ class SupplyDemandZoneDetector:
         """
         zones = []
         
+        # Base ranges ordered by end index for binary search
+        sorted_bases = sorted(base_ranges, key=lambda base_range: base_range.end_index)
+        base_ends = [base_range.end_index for base_range in sorted_bases]
+        
         # Match big moves with their corresponding base ranges
         for big_move in big_moves:
-            # Find the base range that precedes this big move
-            corresponding_base = None
-            
-            for base_range in base_ranges:
-                # Big move should start after base range ends
-                if base_range.end_index < big_move.start_index:
-                    # Check if this is the closest preceding base range
-                    if (corresponding_base is None or 
-                        base_range.end_index > corresponding_base.end_index):
-                        corresponding_base = base_range
+            # The closest base range ending before the big move starts
+            position = bisect.bisect_left(base_ends, big_move.start_index)
+            corresponding_base = sorted_bases[position - 1] if position > 0 else None
             
             if corresponding_base is not None:
                 try:
@@ -474,8 +477,13 @@ class SupplyDemandZoneDetector:
         if 'volume' in df.columns:
             try:
                 # Calculate volume ratio during move vs baseline
-                baseline_volume = df.iloc[max(0, base_range.start_index - 20):base_range.start_index]['volume'].mean()
-                move_volume = df.iloc[big_move.start_index:big_move.end_index + 1]['volume'].mean()
+                self.feature_cache.update(df)
+                baseline_volume = self.feature_cache.window_mean(
+                    'volume', base_range.start_index - 20, base_range.start_index
+                )
+                move_volume = self.feature_cache.window_mean(
+                    'volume', big_move.start_index, big_move.end_index + 1
+                )
                 
                 if baseline_volume > 0:
                     volume_ratio = move_volume / baseline_volume
@@ -515,7 +523,10 @@ class SupplyDemandZoneDetector:
         
         try:
             # Volume during the big move (breakout)
-            move_volume = df.iloc[big_move.start_index:big_move.end_index + 1]['volume'].mean()
+            self.feature_cache.update(df)
+            move_volume = self.feature_cache.window_mean(
+                'volume', big_move.start_index, big_move.end_index + 1
+            )
             return move_volume
             
         except Exception:
@@ -526,44 +537,57 @@ class SupplyDemandZoneDetector:
         zones: List[SupplyDemandZone]
     ) -> List[SupplyDemandZone]:
         """
-        Resolve overlapping zones by merging or prioritizing.
+        Resolve overlapping zones, preferring stronger zones.
+        
+        Zones are taken strongest first (earliest zone on equal strength) and
+        a zone is kept only if it does not overlap any kept zone by more than
+        overlap_tolerance. Kept zones never contain one another, so they are
+        held in price-sorted lists where each check is a bisect plus at most a
+        few neighbours: O(n log n) overall.
         
         Args:
             zones: List of potentially overlapping zones
             
         Returns:
-            List of resolved zones without conflicts
+            List of resolved zones without conflicts, in input order
         """
-        if len(zones) <= 1:
+        if len(zones) <= 1 or self.overlap_tolerance >= 1.0:
             return zones
         
-        resolved_zones = []
+        order = sorted(range(len(zones)), key=lambda i: -zones[i].strength_score)
+        
+        # Kept zones sorted by price; bottoms and tops share the same order
+        bottoms: List[float] = []
+        tops: List[float] = []
+        index_zones: List[SupplyDemandZone] = []
+        kept: List[int] = []
         
-        for zone in zones:
-            # Check for overlaps with already resolved zones
-            overlapping_zones = []
+        for index in order:
+            zone = zones[index]
+            if zone.height <= 0:
+                kept.append(index)  # Zero-height zones never overlap
+                continue
             
-            for resolved_zone in resolved_zones:
-                overlap = self._calculate_zone_overlap(zone, resolved_zone)
-                if overlap > self.overlap_tolerance:
-                    overlapping_zones.append(resolved_zone)
+            # Kept zones from the first one topping out above this bottom
+            position = bisect.bisect_right(tops, zone.bottom_price)
+            conflict = False
+            for other in range(position, len(bottoms)):
+                if bottoms[other] >= zone.top_price:
+                    break
+                if self._calculate_zone_overlap(zone, index_zones[other]) > self.overlap_tolerance:
+                    conflict = True
+                    break
             
-            if overlapping_zones:
-                # Remove overlapping zones and create merged zone
-                for overlapping_zone in overlapping_zones:
-                    resolved_zones.remove(overlapping_zone)
-                
-                # Merge zones (keep strongest)
-                strongest_zone = zone
-                for overlapping_zone in overlapping_zones:
-                    if overlapping_zone.strength_score > strongest_zone.strength_score:
-                        strongest_zone = overlapping_zone
-                
-                resolved_zones.append(strongest_zone)
-            else:
-                # No overlap, add zone
-                resolved_zones.append(zone)
+            if not conflict:
+                position = bisect.bisect_left(bottoms, zone.bottom_price)
+                bottoms.insert(position, zone.bottom_price)
+                tops.insert(position, zone.top_price)
+                index_zones.insert(position, zone)
+                kept.append(index)
         
+        resolved_zones = [zones[index] for index in sorted(kept)]
+        
+        logger.debug(f"Resolved {len(zones)} zones into {len(resolved_zones)} non-overlapping zones")
         return resolved_zones
     
     def _calculate_zone_overlap(
@@ -618,9 +642,10 @@ class SupplyDemandZoneDetector:
         if len(zones) <= self.max_zones_per_timeframe:
             return zones
         
-        # Sort by strength score (descending) and keep best zones
-        sorted_zones = sorted(zones, key=lambda z: z.strength_score, reverse=True)
-        limited_zones = sorted_zones[:self.max_zones_per_timeframe]
+        # Keep best zones by strength score (descending) without a full sort
+        limited_zones = heapq.nlargest(
+            self.max_zones_per_timeframe, zones, key=lambda z: z.strength_score
+        )
         
         logger.debug(f"Limited zones from {len(zones)} to {len(limited_zones)}")
         return limited_zones
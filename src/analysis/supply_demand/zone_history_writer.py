@@ -0,0 +1,539 @@
+"""
+ZoneHistoryWriter - Write-Behind Persistence of Zone Lifecycle Records
+
+ZoneStateManager produces state updates and test events while it analyzes
+price data. Writing them through SupplyDemandRepository one round trip at a
+time stalls analysis, so the writer queues them and a background thread writes
+them in batches (by size or time) with the repository's bulk methods.
+
+The writer exposes the repository methods ZoneStateManager uses, so it can be
+passed as the manager's repository:
+
+    with ZoneHistoryWriter(repository) as writer:
+        manager = ZoneStateManager(repository=writer)
+        ...
+
+Zone snapshots queued with update_zone() are coalesced: only the latest
+snapshot of each zone is written. State updates and test events are history
+rows and are all written, in submission order.
+
+History lookups never wait for the database write in progress: they combine
+what the repository returns with the batch being written and the queue.
+
+A thread rather than a process is used because the repository holds its own
+connection pool and the flusher spends its time waiting on the database.
+"""
+
+import copy
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from .zone_detector import SupplyDemandZone
+from .zone_state_manager import ZoneStateUpdate, ZoneTestEvent
+
+logger = logging.getLogger(__name__)
+
+
+class ZoneHistoryWriter:
+    """
+    Write-behind queue in front of SupplyDemandRepository.
+
+    Submissions go into a bounded queue; the flusher thread writes a batch
+    once batch_size records are queued or flush_interval seconds have passed
+    since the last write. When max_queue_size records are queued, submissions
+    block until the flusher catches up (backpressure). Batches the repository
+    fails to write are retried up to max_retries times before being dropped.
+    """
+
+    def __init__(
+        self,
+        repository: Any,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10_000,
+        max_retries: int = 3
+    ):
+        """
+        Initialize zone history writer.
+
+        Args:
+            repository: SupplyDemandRepository the records are written to
+            batch_size: Queued records that trigger a write
+            flush_interval: Seconds between time-based writes
+            max_queue_size: Queued records before submissions block (backpressure)
+            max_retries: Attempts to rewrite a failed batch before dropping it
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if flush_interval <= 0:
+            raise ValueError(f"flush_interval must be positive, got {flush_interval}")
+        if max_queue_size < batch_size:
+            raise ValueError(
+                f"max_queue_size must be at least batch_size ({batch_size}), got {max_queue_size}"
+            )
+        if max_retries < 0:
+            raise ValueError(f"max_retries must be non-negative, got {max_retries}")
+
+        self.repository = repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+
+        # Queued records; zone snapshots are keyed by zone ID for coalescing
+        self._zones: 'OrderedDict[int, SupplyDemandZone]' = OrderedDict()
+        self._updates: List[ZoneStateUpdate] = []
+        self._events: List[ZoneTestEvent] = []
+
+        # Records taken by the flusher and not yet written or dropped, the
+        # batch being written and the last failed batch awaiting retry
+        # (both part of _in_flight)
+        self._in_flight = 0
+        self._writing: Optional[Dict[str, list]] = None
+        self._retry: Optional[Dict[str, list]] = None
+
+        # Serializes batch writes between the flusher and synchronous writes
+        self._write_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._flush_requested = False
+
+        self.stats = {
+            'zones_submitted': 0,
+            'updates_submitted': 0,
+            'events_submitted': 0,
+            'zones_coalesced': 0,
+            'zones_written': 0,
+            'updates_written': 0,
+            'events_written': 0,
+            'flushes': 0,
+            'retries': 0,
+            'errors': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'blocked_submits': 0,
+            'max_queue_depth': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    def __enter__(self) -> 'ZoneHistoryWriter':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        """Whether the flusher thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        """Records queued or being written"""
+        with self._condition:
+            return self._queued() + self._in_flight
+
+    def start(self) -> None:
+        """Start the flusher thread."""
+        with self._condition:
+            if self.running:
+                return
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._run, name='zone-history-writer', daemon=True
+            )
+            self._thread.start()
+
+        logger.info(f"ZoneHistoryWriter started (batch_size={self.batch_size})")
+
+    def update_zone(self, zone: SupplyDemandZone, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a zone snapshot, replacing any queued snapshot of the same zone.
+
+        Args:
+            zone: Saved zone (with an ID) to write
+            timeout: Seconds to wait for queue space (None waits indefinitely)
+
+        Returns:
+            True if queued, False if the zone has no ID or the queue stayed full
+        """
+        if zone.id is None:
+            logger.error("Cannot queue zone without ID")
+            return False
+
+        # Snapshot now so later in-place changes don't race the flusher
+        snapshot = copy.copy(zone)
+
+        with self._condition:
+            if zone.id in self._zones:
+                self._zones[zone.id] = snapshot
+                self._zones.move_to_end(zone.id)
+                self.stats['zones_submitted'] += 1
+                self.stats['zones_coalesced'] += 1
+                return True
+
+            if not self._reserve(timeout):
+                return False
+            self._zones[zone.id] = snapshot
+            self.stats['zones_submitted'] += 1
+            self._submitted()
+
+        return True
+
+    def save_zone_update(self, update: ZoneStateUpdate, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a zone state update.
+
+        Args:
+            update: State update to write
+            timeout: Seconds to wait for queue space (None waits indefinitely)
+
+        Returns:
+            True if queued, False if the queue stayed full
+        """
+        with self._condition:
+            if not self._reserve(timeout):
+                return False
+            self._updates.append(update)
+            self.stats['updates_submitted'] += 1
+            self._submitted()
+
+        return True
+
+    def save_test_event(self, event: ZoneTestEvent, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a zone test event.
+
+        Args:
+            event: Test event to write
+            timeout: Seconds to wait for queue space (None waits indefinitely)
+
+        Returns:
+            True if queued, False if the queue stayed full
+        """
+        with self._condition:
+            if not self._reserve(timeout):
+                return False
+            self._events.append(event)
+            self.stats['events_submitted'] += 1
+            self._submitted()
+
+        return True
+
+    def get_zone_history(self, zone_id: int) -> List[ZoneStateUpdate]:
+        """
+        Get zone state updates from the repository, the batch being written and the queue.
+
+        Args:
+            zone_id: Zone ID to get history for
+
+        Returns:
+            List of zone state updates in chronological order
+        """
+        history = self._lookup('updates', zone_id, self.repository.get_zone_history)
+        history.sort(key=lambda x: x.update_time)
+        return history
+
+    def get_test_events(self, zone_id: int) -> List[ZoneTestEvent]:
+        """
+        Get zone test events from the repository, the batch being written and the queue.
+
+        Args:
+            zone_id: Zone ID to get test events for
+
+        Returns:
+            List of zone test events in chronological order
+        """
+        events = self._lookup('events', zone_id, self.repository.get_test_events)
+        events.sort(key=lambda x: x.test_time)
+        return events
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Write everything queued so far.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if not self.running:
+            self._write_remaining()
+            return self.queue_depth == 0
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._queued() or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Timed out waiting for zone history writer to flush")
+                    return False
+                self._condition.wait(remaining)
+
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Write remaining records, stop the flusher thread and wait for it to finish."""
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify_all()
+
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Zone history writer did not finish within the timeout")
+                return
+            self._thread = None
+
+        # Nothing left to flush in the background; write anything submitted since
+        self._write_remaining()
+        logger.info(f"ZoneHistoryWriter closed: {self.metrics()}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and flush latency metrics.
+
+        Returns:
+            Stats counters plus current queue depth and average flush latency
+        """
+        with self._condition:
+            metrics = dict(self.stats)
+            metrics['queue_depth'] = self._queued() + self._in_flight
+
+        flushes = metrics['flushes']
+        metrics['avg_flush_ms'] = metrics['total_flush_ms'] / flushes if flushes else 0.0
+        return metrics
+
+    def _lookup(self, kind: str, zone_id: int, read: Callable[[int], list]) -> list:
+        """
+        Stored records of a zone plus those not yet written.
+
+        The batch being written may be committed before or during the
+        repository read, so each of its records is only added when the read
+        did not return the same record, compared by record key. Unwritten
+        records are snapshotted before the read; a record leaves the batch
+        being written only after it is stored, so none can be missed.
+        """
+        with self._condition:
+            queued = self._updates if kind == 'updates' else self._events
+            pending = (self._retry[kind] if self._retry else []) + queued
+            writing = self._writing[kind] if self._writing else []
+            writing = [record for record in writing if record.zone_id == zone_id]
+
+        records = read(zone_id)
+
+        unmatched = Counter(self._record_key(kind, record) for record in records)
+        for record in writing:
+            key = self._record_key(kind, record)
+            if unmatched[key] > 0:
+                unmatched[key] -= 1
+            else:
+                records.append(record)
+
+        records += [record for record in pending if record.zone_id == zone_id]
+        return records
+
+    @staticmethod
+    def _record_key(kind: str, record: Any) -> tuple:
+        """
+        Natural key of a history record as the repository stores it.
+
+        Prices and reaction strength are rounded to their column scale
+        (DECIMAL(12, 6) and DECIMAL(4, 3)), so a read-back matches the
+        record that was submitted.
+        """
+        if kind == 'updates':
+            return (
+                record.zone_id, record.update_time, record.old_status, record.new_status,
+                record.trigger_reason, round(record.trigger_price, 6), bool(record.test_success)
+            )
+        return (
+            record.zone_id, record.test_time, record.test_type, bool(record.success),
+            round(record.test_price, 6), round(record.reaction_strength, 3)
+        )
+
+    def _queued(self) -> int:
+        """Records waiting in the queue (caller holds the lock)"""
+        return len(self._zones) + len(self._updates) + len(self._events)
+
+    def _reserve(self, timeout: Optional[float]) -> bool:
+        """Wait for room for one record (caller holds the lock)"""
+        if self._queued() + self._in_flight < self.max_queue_size:
+            return True
+
+        self.stats['blocked_submits'] += 1
+        if not self.running:
+            # Nobody else will drain the queue
+            self.start()
+
+        self._condition.notify_all()
+        if self._condition.wait_for(
+            lambda: self._queued() + self._in_flight < self.max_queue_size, timeout
+        ):
+            return True
+
+        self.stats['rejected'] += 1
+        logger.warning("Zone history queue full, record rejected")
+        return False
+
+    def _submitted(self) -> None:
+        """Track depth and wake the flusher for a full batch (caller holds the lock)"""
+        depth = self._queued() + self._in_flight
+        if depth > self.stats['max_queue_depth']:
+            self.stats['max_queue_depth'] = depth
+        if self._queued() >= self.batch_size:
+            self._condition.notify_all()
+
+    def _take_batch(self) -> Dict[str, list]:
+        """Move a failed batch and the queued records into a new batch (caller holds the lock)"""
+        retry = self._retry or {'zones': [], 'updates': [], 'events': []}
+
+        # Failed snapshots superseded by a newer queued one are not rewritten
+        stale = sum(1 for zone in retry['zones'] if zone.id in self._zones)
+        batch = {
+            'zones': [zone for zone in retry['zones'] if zone.id not in self._zones] + list(self._zones.values()),
+            'updates': retry['updates'] + self._updates,
+            'events': retry['events'] + self._events
+        }
+        self._in_flight += self._queued() - stale
+        self.stats['zones_coalesced'] += stale
+
+        self._zones = OrderedDict()
+        self._updates = []
+        self._events = []
+        self._retry = None
+        return batch
+
+    def _run(self) -> None:
+        """Flusher thread: write batches by size or interval until closed."""
+        attempts = 0
+        last_write = time.monotonic()
+
+        while True:
+            with self._condition:
+                while not (self._closing or self._flush_requested or self._queued() >= self.batch_size):
+                    remaining = self.flush_interval - (time.monotonic() - last_write)
+                    if remaining <= 0 and (self._queued() or self._retry):
+                        break
+                    self._condition.wait(remaining if remaining > 0 else self.flush_interval)
+
+                closing = self._closing
+                self._flush_requested = False
+
+            last_write = time.monotonic()
+            with self._write_lock:
+                with self._condition:
+                    batch = self._take_batch()
+                    self._writing = batch
+
+                failed = self._write_batch(batch)
+                if failed is None:
+                    attempts = 0
+                elif attempts < self.max_retries and not closing:
+                    attempts += 1
+                    self.stats['retries'] += 1
+                else:
+                    self._drop(failed)
+                    failed, attempts = None, 0
+
+                with self._condition:
+                    # Records kept for retry still count against the queue bound
+                    self._in_flight -= _count(batch) - _count(failed)
+                    self._writing = None
+                    self._retry = failed
+                    self._condition.notify_all()
+                    finished = closing and not self._queued() and self._retry is None
+
+            if finished:
+                return
+
+    def _write_batch(self, batch: Dict[str, list]) -> Optional[Dict[str, list]]:
+        """
+        Write one batch: zone snapshots first, then history rows.
+
+        Returns:
+            The records that failed to write, or None if everything was written
+        """
+        if not any(batch.values()):
+            return None
+
+        start_time = time.perf_counter()
+        failed = {'zones': [], 'updates': [], 'events': []}
+
+        try:
+            if batch['zones']:
+                zone_ids = self.repository.bulk_upsert_zones(batch['zones'])
+                failed['zones'] = [
+                    zone for zone, zone_id in zip(batch['zones'], zone_ids) if zone_id is None
+                ]
+                self.stats['zones_written'] += len(batch['zones']) - len(failed['zones'])
+        except Exception as e:
+            logger.error(f"Error writing zone snapshots: {e}")
+            failed['zones'] = batch['zones']
+
+        for kind, save in (
+            ('updates', self.repository.save_zone_updates),
+            ('events', self.repository.save_test_events)
+        ):
+            records = batch[kind]
+            if not records:
+                continue
+            try:
+                saved = save(records)
+            except Exception as e:
+                logger.error(f"Error writing zone {kind}: {e}")
+                saved = 0
+            # Bulk writes are all-or-nothing
+            if saved == len(records):
+                self.stats[f'{kind}_written'] += saved
+            else:
+                failed[kind] = records
+
+        flush_ms = (time.perf_counter() - start_time) * 1000
+        self.stats['flushes'] += 1
+        self.stats['last_flush_ms'] = flush_ms
+        self.stats['total_flush_ms'] += flush_ms
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], flush_ms)
+
+        if any(failed.values()):
+            self.stats['errors'] += 1
+            return failed
+        return None
+
+    def _drop(self, failed: Dict[str, list]) -> None:
+        """Give up on records that could not be written."""
+        count = sum(len(records) for records in failed.values())
+        self.stats['dropped'] += count
+        logger.error(f"Dropping {count} zone history records after {self.max_retries} retries")
+
+    def _write_remaining(self) -> None:
+        """Write the queue synchronously when no flusher thread is running."""
+        with self._write_lock:
+            with self._condition:
+                batch = self._take_batch()
+                self._writing = batch
+
+            failed = self._write_batch(batch)
+            if failed is not None:
+                self._drop(failed)
+
+            with self._condition:
+                self._in_flight -= _count(batch)
+                self._writing = None
+                self._condition.notify_all()
+
+
+def _count(batch: Optional[Dict[str, list]]) -> int:
+    """Number of records in a batch"""
+    return sum(len(records) for records in batch.values()) if batch else 0
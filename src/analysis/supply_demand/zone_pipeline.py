@@ -0,0 +1,444 @@
+"""
+IncrementalZonePipeline - Streaming Supply/Demand Zone Detection
+
+Keeps base candle, big move and overlap-resolution state between calls so that
+appending bars only processes the new bars instead of re-running the complete
+detection. After every update the zone set equals what
+SupplyDemandZoneDetector.detect_zones returns for the same data, and changes
+are reported as zone add/update/remove events.
+
+Performance Target: per-bar cost independent of history length
+"""
+
+import bisect
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .base_candle_detector import BaseCandleRange
+from .big_move_detector import BigMove, MAX_SCAN_DISTANCE
+from .zone_detector import SupplyDemandZoneDetector, SupplyDemandZone
+from ..feature_cache import FeatureCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ZoneEvent:
+    """
+    Change to the detected zone set.
+
+    Zones are identified by the start index of their base range.
+    """
+    event_type: str  # 'added', 'updated', 'removed'
+    zone: SupplyDemandZone
+    bar_index: int  # Last bar of the update that produced the event
+
+
+class IncrementalZonePipeline:
+    """
+    Incremental supply/demand zone detection for a growing bar series.
+
+    Bars before the last one are treated as settled; the last bar may still be
+    revised (forming candle). A base range is finalized once a non-consolidation
+    bar (or max_base_candles) closes it, and its zone once every candidate move
+    end has settled. Finalized zones live in a price-sorted index together with
+    their strongest-first overlap decisions; only zones that can still change
+    are recomputed on each update and overlaid on the finalized decisions.
+
+    The pipeline takes over the detector: its base and move detectors are
+    switched to one feature cache owned by the pipeline.
+    """
+
+    def __init__(
+        self,
+        zone_detector: SupplyDemandZoneDetector,
+        symbol: str,
+        timeframe: str,
+        fractal_levels: Optional[List[float]] = None
+    ):
+        """
+        Initialize incremental pipeline.
+
+        Args:
+            zone_detector: Configured SupplyDemandZoneDetector instance
+            symbol: Trading symbol (e.g., 'EURUSD')
+            timeframe: Timeframe (e.g., 'M1', 'H1')
+            fractal_levels: Optional fractal levels for breakout validation
+
+        Raises:
+            TypeError: If zone_detector is None
+        """
+        if zone_detector is None:
+            raise TypeError("zone_detector cannot be None")
+
+        self.zone_detector = zone_detector
+        self.base_detector = zone_detector.base_detector
+        self.move_detector = zone_detector.move_detector
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.fractal_levels = fractal_levels
+
+        # Appended bars are trusted, so the cache skips full content checks;
+        # it still compares the last bar, which may be revised in place
+        self.feature_cache = FeatureCache()
+        zone_detector.feature_cache = self.feature_cache
+        self.base_detector.feature_cache = self.feature_cache
+        self.move_detector.feature_cache = self.feature_cache
+
+        self._reset_state()
+
+        logger.debug(f"IncrementalZonePipeline initialized for {symbol} {timeframe}")
+
+    @property
+    def zones(self) -> List[SupplyDemandZone]:
+        """Current zones, in the order detect_zones returns them."""
+        return list(self._output.values())
+
+    @property
+    def bar_count(self) -> int:
+        """Number of bars processed."""
+        return self._n_bars
+
+    def reset(self) -> None:
+        """Clear all pipeline state."""
+        self.feature_cache.reset()
+        self._reset_state()
+
+    def update(self, df: pd.DataFrame) -> List[ZoneEvent]:
+        """
+        Process bars appended since the last update.
+
+        Args:
+            df: OHLC DataFrame with columns ['open', 'high', 'low', 'close', 'time'];
+                previous bars must be unchanged except for the last one
+
+        Returns:
+            Zone events describing how the zone set changed
+
+        Raises:
+            ValueError: If data is invalid or processing fails
+        """
+        if df is None or len(df) == 0:
+            return self._publish({}, -1)
+
+        n_bars = len(df)
+        generation = self.feature_cache.generation
+
+        # Only bars not validated before (the last one may have been revised)
+        first_new = self._n_bars - 1 if 0 < self._n_bars <= n_bars else 0
+        self.zone_detector._validate_input_data(df)
+        self.base_detector._validate_input_data(df.iloc[first_new:])
+        self.feature_cache.update(df)
+
+        # Earlier bars changed: this is a different dataset, rebuild from scratch
+        if self._n_bars > 0 and self.feature_cache.generation != generation:
+            logger.info("Dataset changed, rebuilding zone pipeline state")
+            if first_new > 0:
+                self.base_detector._validate_input_data(df)
+            published = self._output
+            self._reset_state()
+            self._output = published
+
+        self._n_bars = n_bars
+
+        if n_bars < self.base_detector.atr_period:
+            return self._publish({}, n_bars - 1)
+
+        try:
+            tentative_bases = self._update_base_ranges(df)
+            tentative_zones = self._update_moves(df, tentative_bases)
+            return self._publish(self._resolve(tentative_zones), n_bars - 1)
+
+        except Exception as e:
+            logger.error(f"Error in incremental zone detection: {e}")
+            raise ValueError(f"Zone detection failed: {e}")
+
+    def _reset_state(self) -> None:
+        """Initialize detection state."""
+        self._n_bars = 0
+        self._scan_from = 0
+        self._pending_bases: List[BaseCandleRange] = []
+
+        # Finalized zones keyed by base start index, and those kept by overlap resolution
+        self._final_zones: Dict[int, SupplyDemandZone] = {}
+        self._kept: Set[int] = set()
+
+        # Price index of finalized zones: (bottom_price, key) sorted
+        self._index_bottoms: List[float] = []
+        self._index_keys: List[int] = []
+        self._max_height = 0.0
+
+        # Kept finalized zones ranked strongest first: (-strength, key)
+        self._ranked: List[Tuple[float, int]] = []
+
+        self._output: Dict[int, SupplyDemandZone] = {}
+
+    def _update_base_ranges(self, df: pd.DataFrame) -> List[BaseCandleRange]:
+        """
+        Commit closed base ranges and return the still-open one, if any.
+
+        Only bars from the first unfinished chunk onward are scanned. A chunk
+        is closed once all its bars have settled and either it reached
+        max_base_candles or the bar after it settled as non-consolidation.
+
+        Returns:
+            Tentative base ranges (at most one) that may still change
+        """
+        n_bars = self._n_bars
+        settled = n_bars - 2
+
+        atr = self.feature_cache.atr(self.base_detector.atr_period)
+        mask = self.base_detector._consolidation_mask(atr, self._scan_from, n_bars)
+        starts, ends = self.base_detector._split_consolidation_runs(mask, self._scan_from)
+
+        lengths = ends - starts + 1
+        closed = (ends <= settled) & (
+            (lengths == self.base_detector.max_base_candles) | (ends + 1 <= settled)
+        )
+
+        committed = closed & (lengths >= self.base_detector.min_base_candles)
+        self._pending_bases.extend(
+            self.base_detector._create_base_ranges(df, starts[committed], ends[committed], atr)
+        )
+
+        # Only the last chunk can still be open
+        open_chunks = np.flatnonzero(~closed)
+        self._scan_from = int(starts[open_chunks[0]]) if len(open_chunks) else n_bars - 1
+
+        tentative = (
+            ~closed &
+            (lengths >= self.base_detector.min_base_candles) &
+            (starts <= n_bars - 1 - self.base_detector.min_base_candles)
+        )
+        return self.base_detector._create_base_ranges(df, starts[tentative], ends[tentative], atr)
+
+    def _update_moves(
+        self,
+        df: pd.DataFrame,
+        tentative_bases: List[BaseCandleRange]
+    ) -> Dict[int, SupplyDemandZone]:
+        """
+        Detect moves for bases awaiting one and finalize settled zones.
+
+        A base range's move is final once its last candidate move end
+        (MAX_SCAN_DISTANCE bars after the base) has settled.
+
+        Returns:
+            Zones that may still change, keyed by base start index
+        """
+        bases = self._pending_bases + tentative_bases
+        if not bases:
+            return {}
+
+        moves = self.move_detector._detect_moves_after_bases(df, bases, self.fractal_levels)
+        moves_by_start: Dict[int, BigMove] = {move.start_index: move for move in moves}
+
+        last_final_end = self._n_bars - 2 - MAX_SCAN_DISTANCE
+        tentative_zones: Dict[int, SupplyDemandZone] = {}
+        pending: List[BaseCandleRange] = []
+
+        for position, base_range in enumerate(bases):
+            is_final = position < len(self._pending_bases) and base_range.end_index <= last_final_end
+            if not is_final and position < len(self._pending_bases):
+                pending.append(base_range)
+
+            big_move = moves_by_start.get(base_range.end_index + 1)
+            if big_move is None:
+                continue
+
+            zone = self._create_zone(df, base_range, big_move)
+            if zone is None:
+                continue
+
+            if is_final:
+                self._add_final_zone(zone)
+            else:
+                tentative_zones[base_range.start_index] = zone
+
+        self._pending_bases = pending
+        return tentative_zones
+
+    def _create_zone(
+        self,
+        df: pd.DataFrame,
+        base_range: BaseCandleRange,
+        big_move: BigMove
+    ) -> Optional[SupplyDemandZone]:
+        """Create a zone, reusing the published object if nothing changed."""
+        try:
+            zone = self.zone_detector._create_zone_from_base_and_move(
+                df, base_range, big_move, self.symbol, self.timeframe
+            )
+        except Exception as e:
+            logger.warning(f"Failed to create zone from base {base_range.start_index}: {e}")
+            return None
+
+        published = self._output.get(base_range.start_index)
+        if published is not None and self._signature(published) == self._signature(zone):
+            return published
+        return zone
+
+    def _add_final_zone(self, zone: SupplyDemandZone) -> None:
+        """Insert a finalized zone into the price index and update overlap decisions."""
+        key = zone.base_range.start_index
+        self._final_zones[key] = zone
+
+        position = bisect.bisect_left(self._index_bottoms, zone.bottom_price)
+        self._index_bottoms.insert(position, zone.bottom_price)
+        self._index_keys.insert(position, key)
+        self._max_height = max(self._max_height, zone.height)
+
+        for changed, kept in self._settle({key: zone}, {}).items():
+            entry = self._rank_key(self._final_zones[changed])
+            if kept:
+                self._kept.add(changed)
+                bisect.insort(self._ranked, entry)
+            else:
+                self._kept.discard(changed)
+                del self._ranked[bisect.bisect_left(self._ranked, entry)]
+
+    def _overlapping_zones(
+        self,
+        zone: SupplyDemandZone,
+        key: int,
+        tentative_zones: Dict[int, SupplyDemandZone]
+    ) -> List[int]:
+        """Other finalized and tentative zones overlapping a zone beyond the tolerance."""
+        # Only zones with a bottom within max height below the top can intersect
+        low = bisect.bisect_left(self._index_bottoms, zone.bottom_price - self._max_height)
+        high = bisect.bisect_left(self._index_bottoms, zone.top_price)
+
+        candidates = [(other, self._final_zones[other]) for other in self._index_keys[low:high]]
+        candidates.extend(tentative_zones.items())
+        return [
+            other for other, other_zone in candidates
+            if other != key
+            and self.zone_detector._calculate_zone_overlap(zone, other_zone)
+            > self.zone_detector.overlap_tolerance
+        ]
+
+    def _settle(
+        self,
+        new_zones: Dict[int, SupplyDemandZone],
+        tentative_zones: Dict[int, SupplyDemandZone]
+    ) -> Dict[int, bool]:
+        """
+        Redo strongest-first overlap resolution where new zones can change it.
+
+        A zone is kept when no stronger kept zone overlaps it beyond the
+        tolerance, so its decision can only change after a stronger overlapping
+        zone's did. Decisions are re-evaluated in rank order starting from the
+        new zones and changes are passed on to weaker overlapping zones.
+
+        Returns:
+            Zones whose kept state differs from the finalized decisions
+        """
+        changes: Dict[int, bool] = {}
+
+        def zone_for(key: int) -> SupplyDemandZone:
+            zone = tentative_zones.get(key)
+            return zone if zone is not None else self._final_zones[key]
+
+        def is_kept(key: int) -> bool:
+            return changes.get(key, key in self._kept)
+
+        queue = [(self._rank_key(zone), key) for key, zone in new_zones.items()]
+        heapq.heapify(queue)
+        visited: Set[int] = set()
+
+        while queue:
+            rank, key = heapq.heappop(queue)
+            if key in visited:
+                continue
+            visited.add(key)
+
+            neighbours = [
+                (self._rank_key(zone_for(other)), other)
+                for other in self._overlapping_zones(zone_for(key), key, tentative_zones)
+            ]
+            kept = not any(
+                other_rank < rank and is_kept(other) for other_rank, other in neighbours
+            )
+            if kept == is_kept(key):
+                continue
+
+            changes[key] = kept
+            for other_rank, other in neighbours:
+                if other_rank > rank:
+                    heapq.heappush(queue, (other_rank, other))
+
+        return changes
+
+    def _resolve(self, tentative_zones: Dict[int, SupplyDemandZone]) -> Dict[int, SupplyDemandZone]:
+        """
+        Resolve overlaps and apply the zone limit, matching detect_zones.
+
+        Tentative zones are overlaid on the finalized decisions, which they
+        can only change through chains of overlapping zones. Unchanged kept
+        zones are taken from the strength ranking, so the cost depends on the
+        zone limit and the zones near tentative ones, not on history length.
+
+        Returns:
+            Zones keyed by base start index, in detect_zones order
+        """
+        changes = self._settle(tentative_zones, tentative_zones)
+        added = [key for key, kept in changes.items() if kept]
+        dropped = {key for key, kept in changes.items() if not kept}
+
+        limit = self.zone_detector.max_zones_per_timeframe
+        zone_count = len(self._ranked) - len(dropped) + len(added)
+
+        # Strongest unchanged kept zones; all of them if under the limit
+        selected: List[SupplyDemandZone] = [
+            tentative_zones[key] if key in tentative_zones else self._final_zones[key]
+            for key in added
+        ]
+        for _, key in self._ranked:
+            if zone_count > limit and len(selected) >= limit + len(added):
+                break
+            if key not in dropped:
+                selected.append(self._final_zones[key])
+
+        if zone_count <= limit:
+            selected.sort(key=lambda zone: zone.base_range.start_index)
+        else:
+            selected.sort(key=self._rank_key)
+            selected = selected[:limit]
+
+        return {zone.base_range.start_index: zone for zone in selected}
+
+    def _publish(self, zones: Dict[int, SupplyDemandZone], bar_index: int) -> List[ZoneEvent]:
+        """Replace the published zone set and return the differences."""
+        events = [
+            ZoneEvent('removed', zone, bar_index)
+            for key, zone in self._output.items() if key not in zones
+        ]
+        for key in sorted(zones):
+            published = self._output.get(key)
+            if published is None:
+                events.append(ZoneEvent('added', zones[key], bar_index))
+            elif published is not zones[key]:
+                events.append(ZoneEvent('updated', zones[key], bar_index))
+
+        self._output = zones
+        if events:
+            logger.debug(f"Zone pipeline emitted {len(events)} events at bar {bar_index}")
+        return events
+
+    @staticmethod
+    def _rank_key(zone: SupplyDemandZone) -> Tuple[float, int]:
+        """Sort key placing stronger zones first, earlier zones on ties."""
+        return (-zone.strength_score, zone.base_range.start_index)
+
+    @staticmethod
+    def _signature(zone: SupplyDemandZone) -> Tuple:
+        """Values that identify a zone version."""
+        return (
+            zone.zone_type, zone.top_price, zone.bottom_price, zone.strength_score,
+            zone.volume_at_creation, zone.big_move.end_index
+        )
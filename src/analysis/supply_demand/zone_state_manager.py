@@ -7,6 +7,9 @@ expiry management, and state transitions using institutional order flow analysis
 Performance Target: <50ms for 100 zones with 1000 price bars
 """
 
+import bisect
+import heapq
+import operator
 import pandas as pd
 import numpy as np
 from typing import List, Optional, Dict, Any, Tuple
@@ -18,6 +21,10 @@ from .zone_detector import SupplyDemandZone
 
 logger = logging.getLogger(__name__)
 
+# Maximum zone x candle pairs evaluated at once when classifying zone tests,
+# bounding the hit matrix of one chunk to a few MB
+MAX_INTERACTION_CELLS = 2_000_000
+
 
 @dataclass
 class ZoneStateUpdate:
@@ -73,6 +80,191 @@ class ZoneTestEvent:
         }
 
 
+@dataclass
+class HistoryRetentionPolicy:
+    """
+    In-memory retention limits for zone history.
+    
+    State updates and test events are each capped per zone. Entries beyond
+    the limits are evicted oldest first and flushed to the repository in
+    batches when one is configured, otherwise discarded.
+    """
+    max_entries_per_zone: Optional[int] = 1000
+    max_age_hours: Optional[int] = None
+    flush_batch_size: int = 100
+
+
+class _ZoneHistory:
+    """
+    Zone history records indexed by zone ID and kept in time order.
+    
+    Records usually arrive in time order and are appended; late records are
+    placed by binary search on a parallel list of times.
+    """
+    
+    def __init__(self, time_attr: str):
+        self._time_attr = time_attr
+        self._records: Dict[Any, List[Any]] = {}
+        self._times: Dict[Any, List[datetime]] = {}
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, record: Any) -> int:
+        """Add a record, returning the number of records held for its zone"""
+        record_time = getattr(record, self._time_attr)
+        records = self._records.setdefault(record.zone_id, [])
+        times = self._times.setdefault(record.zone_id, [])
+        
+        if not times or times[-1] <= record_time:
+            times.append(record_time)
+            records.append(record)
+        else:
+            position = bisect.bisect_right(times, record_time)
+            times.insert(position, record_time)
+            records.insert(position, record)
+        
+        self._size += 1
+        return len(records)
+    
+    def get(self, zone_id: Any) -> List[Any]:
+        """Records of one zone in time order"""
+        return list(self._records.get(zone_id, ()))
+    
+    def all(self) -> List[Any]:
+        """Records of all zones in time order"""
+        time_of = operator.attrgetter(self._time_attr)
+        return list(heapq.merge(*self._records.values(), key=time_of))
+    
+    def evict_oldest(self, zone_id: Any, keep: int) -> List[Any]:
+        """Remove all but the newest `keep` records of a zone"""
+        records = self._records.get(zone_id)
+        if records is None or len(records) <= keep:
+            return []
+        return self._evict(zone_id, len(records) - keep)
+    
+    def evict_before(self, cutoff: datetime) -> List[Any]:
+        """Remove records older than cutoff from all zones"""
+        evicted = []
+        for zone_id, times in list(self._times.items()):
+            if times[0] < cutoff:
+                evicted.extend(self._evict(zone_id, bisect.bisect_left(times, cutoff)))
+        return evicted
+    
+    def _evict(self, zone_id: Any, count: int) -> List[Any]:
+        records = self._records[zone_id]
+        evicted = records[:count]
+        del records[:count]
+        del self._times[zone_id][:count]
+        
+        if not records:
+            del self._records[zone_id]
+            del self._times[zone_id]
+        
+        self._size -= count
+        return evicted
+
+
+class _ZoneTrackers:
+    """
+    Incremental per-zone state stored column-wise.
+    
+    Each slot holds the zone geometry it was built for, the time of the last
+    processed bar (watermark), the furthest price reach into the zone (high
+    for supply, negated low for demand), the price of the last candle entering
+    the zone and the number of latest consecutive candles confirming a flip.
+    """
+    
+    NO_WATERMARK = np.iinfo(np.int64).min
+    COLUMNS = ('top', 'bottom', 'supply', 'watermark', 'reach', 'trigger', 'flip_run')
+    
+    def __init__(self, initial_capacity: int = 64):
+        self._slots: Dict[Any, int] = {}
+        self._keys: List[Any] = []
+        self.top = np.full(initial_capacity, np.nan)
+        self.bottom = np.full(initial_capacity, np.nan)
+        self.supply = np.zeros(initial_capacity, dtype=bool)
+        self.watermark = np.full(initial_capacity, self.NO_WATERMARK, dtype=np.int64)
+        self.reach = np.full(initial_capacity, -np.inf)
+        self.trigger = np.full(initial_capacity, np.nan)
+        self.flip_run = np.zeros(initial_capacity, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def slots_for(
+        self,
+        keys: List[Any],
+        top: np.ndarray,
+        bottom: np.ndarray,
+        supply: np.ndarray
+    ) -> np.ndarray:
+        """Get slots for zones, starting fresh for new zones or changed boundaries"""
+        slots = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key)
+            slots[i] = slot
+        
+        changed = (
+            (self.top[slots] != top) | (self.bottom[slots] != bottom) |
+            (self.supply[slots] != supply)
+        )
+        if changed.any():
+            reset = slots[changed]
+            self.top[reset] = top[changed]
+            self.bottom[reset] = bottom[changed]
+            self.supply[reset] = supply[changed]
+            self._reset(reset)
+        
+        return slots
+    
+    def discard(self, keys: List[Any]) -> None:
+        """Stop tracking zones, moving the last slot into each freed one"""
+        for key in keys:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                continue
+            
+            last = len(self._keys) - 1
+            last_key = self._keys.pop()
+            if slot != last:
+                self._keys[slot] = last_key
+                self._slots[last_key] = slot
+                for name in self.COLUMNS:
+                    column = getattr(self, name)
+                    column[slot] = column[last]
+            self.top[last] = np.nan
+    
+    def clear(self) -> None:
+        """Stop tracking all zones"""
+        self.discard(list(self._keys))
+    
+    def _allocate(self, key: Any) -> int:
+        slot = len(self._keys)
+        if slot == len(self.top):
+            capacity = 2 * len(self.top)
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:slot] = column
+                setattr(self, name, grown)
+        
+        # NaN boundaries never match, so the slot is reset on first use
+        self.top[slot] = np.nan
+        self._slots[key] = slot
+        self._keys.append(key)
+        return slot
+    
+    def _reset(self, slots: np.ndarray) -> None:
+        self.watermark[slots] = self.NO_WATERMARK
+        self.reach[slots] = -np.inf
+        self.trigger[slots] = np.nan
+        self.flip_run[slots] = 0
+
+
 class ZoneStateManager:
     """
     Manages supply/demand zone states including testing detection, flip detection,
@@ -89,7 +281,9 @@ class ZoneStateManager:
         flip_confirmation_bars: int = 3,              # Bars needed to confirm flip
         max_test_attempts: int = 5,                   # Max tests before weak zone
         zone_expiry_hours: int = 168,                 # 1 week zone expiry
-        reaction_strength_threshold: float = 0.6      # 60% reaction for success
+        reaction_strength_threshold: float = 0.6,     # 60% reaction for success
+        repository: Optional[Any] = None,             # Store for evicted history
+        history_retention: Optional[HistoryRetentionPolicy] = None
     ):
         """
         Initialize zone state manager.
@@ -101,6 +295,9 @@ class ZoneStateManager:
             max_test_attempts: Maximum test attempts before marking weak
             zone_expiry_hours: Hours before zone expires
             reaction_strength_threshold: Minimum reaction strength for success
+            repository: SupplyDemandRepository receiving history evicted from memory
+                (wrap it in a ZoneHistoryWriter to write history behind)
+            history_retention: In-memory history limits (default HistoryRetentionPolicy())
             
         Raises:
             ValueError: If parameters are invalid
@@ -109,6 +306,8 @@ class ZoneStateManager:
             test_penetration_threshold, break_threshold, flip_confirmation_bars,
             max_test_attempts, zone_expiry_hours, reaction_strength_threshold
         )
+        history_retention = history_retention or HistoryRetentionPolicy()
+        self._validate_retention(history_retention)
         
         self.test_penetration_threshold = test_penetration_threshold
         self.break_threshold = break_threshold
@@ -116,12 +315,22 @@ class ZoneStateManager:
         self.max_test_attempts = max_test_attempts
         self.zone_expiry_hours = zone_expiry_hours
         self.reaction_strength_threshold = reaction_strength_threshold
+        self.repository = repository
+        self.history_retention = history_retention
         
         # Internal state tracking
         self._zones: Dict[int, SupplyDemandZone] = {}
-        self._zone_updates: List[ZoneStateUpdate] = []
-        self._test_events: List[ZoneTestEvent] = []
         self._zone_statistics: Dict[int, Dict[str, Any]] = {}
+        self._reaction_totals: Dict[int, Tuple[float, int]] = {}
+        
+        # Per-zone history and evicted records awaiting persistence
+        self._update_history = _ZoneHistory('update_time')
+        self._event_history = _ZoneHistory('test_time')
+        self._pending_updates: List[ZoneStateUpdate] = []
+        self._pending_events: List[ZoneTestEvent] = []
+        
+        # Per-zone watermarks and running penetration/flip state
+        self._trackers = _ZoneTrackers()
         
         logger.debug(f"ZoneStateManager initialized with test_threshold={test_penetration_threshold}")
     
@@ -156,6 +365,17 @@ class ZoneStateManager:
         if not 0.0 <= reaction_strength_threshold <= 1.0:
             raise ValueError(f"reaction_strength_threshold must be 0.0-1.0, got {reaction_strength_threshold}")
     
+    def _validate_retention(self, retention: HistoryRetentionPolicy) -> None:
+        """Validate history retention policy"""
+        if retention.max_entries_per_zone is not None and retention.max_entries_per_zone < 1:
+            raise ValueError(f"max_entries_per_zone must be >= 1, got {retention.max_entries_per_zone}")
+        
+        if retention.max_age_hours is not None and retention.max_age_hours < 1:
+            raise ValueError(f"max_age_hours must be >= 1, got {retention.max_age_hours}")
+        
+        if retention.flush_batch_size < 1:
+            raise ValueError(f"flush_batch_size must be >= 1, got {retention.flush_batch_size}")
+    
     def update_zone_states(
         self,
         zones: List[SupplyDemandZone],
@@ -165,9 +385,14 @@ class ZoneStateManager:
         """
         Update all zone states based on current price action.
         
+        Each zone keeps a watermark of the last candle it has processed along
+        with its running maximum penetration and flip confirmation count, so
+        only candles newer than the watermark are consumed. Passing a rolling
+        window of recent bars on every new bar costs microseconds per zone.
+        
         Args:
             zones: List of zones to update
-            price_data: Recent OHLC price data
+            price_data: Recent OHLC price data ordered by time
             current_time: Current timestamp
             
         Returns:
@@ -185,12 +410,9 @@ class ZoneStateManager:
             # Collect all state updates
             all_updates = []
             
-            # 1. Detect zone tests and breaks
-            test_updates = self._detect_zone_interactions(zones, price_data, current_time)
+            # 1-2. Detect zone tests, breaks and flips on candles past each watermark
+            test_updates, flip_updates = self._advance_zone_trackers(zones, price_data, current_time)
             all_updates.extend(test_updates)
-            
-            # 2. Detect zone flips
-            flip_updates = self.detect_zone_flips(zones, price_data, current_time)
             all_updates.extend(flip_updates)
             
             # 3. Handle zone expiry
@@ -201,7 +423,8 @@ class ZoneStateManager:
             self._update_zone_statistics(zones, all_updates)
             
             # Store updates for history
-            self._zone_updates.extend(all_updates)
+            self._record_history(self._update_history, all_updates, self._pending_updates)
+            self._enforce_history_age(current_time)
             
             logger.debug(f"Updated {len(zones)} zones, generated {len(all_updates)} state changes")
             return all_updates
@@ -230,23 +453,30 @@ class ZoneStateManager:
         if not zones or price_data.empty:
             return []
         
-        test_events = []
+        candidate_zones = [zone for zone in zones if zone.status in ['active', 'tested']]
+        if not candidate_zones:
+            return []
         
-        for zone in zones:
-            if zone.status not in ['active', 'tested']:
-                continue
+        try:
+            # Check all zones against all candles in one pass
+            test_events = self._analyze_zone_interactions(candidate_zones, price_data)
             
-            try:
-                # Check for price interaction with zone
-                zone_tests = self._analyze_zone_interaction(zone, price_data, current_time)
-                test_events.extend(zone_tests)
-                
-            except Exception as e:
-                logger.warning(f"Error analyzing zone {zone.id} interaction: {e}")
-                continue
+        except Exception as e:
+            logger.warning(f"Error analyzing zone interactions: {e}")
+            return []
         
         # Store test events for history
-        self._test_events.extend(test_events)
+        self._record_history(self._event_history, test_events, self._pending_events)
+        
+        # Running reaction totals keep averages exact across evictions
+        touched_zones = set()
+        for event in test_events:
+            total, count = self._reaction_totals.get(event.zone_id, (0.0, 0))
+            self._reaction_totals[event.zone_id] = (total + event.reaction_strength, count + 1)
+            touched_zones.add(event.zone_id)
+        for zone_id in touched_zones:
+            if zone_id in self._zone_statistics:
+                self._zone_statistics[zone_id]['average_reaction_strength'] = self._average_reaction(zone_id)
         
         return test_events
     
@@ -274,21 +504,40 @@ class ZoneStateManager:
             logger.debug(f"Insufficient data for flip confirmation: {len(price_data)} < {self.flip_confirmation_bars}")
             return []
         
+        candidate_zones = [zone for zone in zones if zone.status in ['active', 'tested']]
+        if not candidate_zones:
+            return []
+        
+        try:
+            # Get recent candles for flip confirmation
+            recent_candles = price_data.tail(self.flip_confirmation_bars)
+            flipped = self._detect_zone_flips(candidate_zones, recent_candles)
+            trigger_price = float(recent_candles['close'].iloc[-1])
+        
+        except Exception as e:
+            logger.warning(f"Error detecting zone flips: {e}")
+            return []
+        
         flip_updates = []
         
-        for zone in zones:
-            if zone.status not in ['active', 'tested']:
+        for zone, flip_confirmed in zip(candidate_zones, flipped):
+            if not flip_confirmed:
                 continue
             
-            try:
-                # Check for zone flip conditions
-                flip_update = self._detect_zone_flip(zone, price_data, current_time)
-                if flip_update:
-                    flip_updates.append(flip_update)
+            # Create flip update
+            flip_update = ZoneStateUpdate(
+                zone_id=zone.id,
+                old_status=zone.status,
+                new_status='flipped',
+                update_time=current_time,
+                trigger_price=trigger_price,
+                trigger_reason='zone_flip',
+                test_success=False
+            )
                     
-            except Exception as e:
-                logger.warning(f"Error detecting zone {zone.id} flip: {e}")
-                continue
+            new_type = 'demand' if zone.zone_type == 'supply' else 'supply'
+            logger.debug(f"Detected zone {zone.id} flip from {zone.zone_type} to {new_type}")
+            flip_updates.append(flip_update)
         
         return flip_updates
     
@@ -345,22 +594,83 @@ class ZoneStateManager:
         """
         Get complete history of zone state changes.
         
+        Merges records held in memory with those evicted to the repository.
+        
         Args:
             zone_id: Zone ID to get history for
             
         Returns:
             List of zone state updates in chronological order
         """
-        zone_history = [
-            update for update in self._zone_updates 
-            if update.zone_id == zone_id
-        ]
+        persisted = self.repository.get_zone_history(zone_id) if self.repository is not None else []
+        pending = [update for update in self._pending_updates if update.zone_id == zone_id]
         
-        # Sort by update time
+        # Each source is already in time order, so the sort merges runs
+        zone_history = persisted + pending + self._update_history.get(zone_id)
         zone_history.sort(key=lambda x: x.update_time)
         
         return zone_history
     
+    def get_test_events(self, zone_id: int) -> List[ZoneTestEvent]:
+        """
+        Get complete history of zone test events.
+        
+        Merges records held in memory with those evicted to the repository.
+        
+        Args:
+            zone_id: Zone ID to get test events for
+            
+        Returns:
+            List of zone test events in chronological order
+        """
+        persisted = self.repository.get_test_events(zone_id) if self.repository is not None else []
+        pending = [event for event in self._pending_events if event.zone_id == zone_id]
+        
+        zone_events = persisted + pending + self._event_history.get(zone_id)
+        zone_events.sort(key=lambda x: x.test_time)
+        
+        return zone_events
+    
+    def flush_history(self) -> int:
+        """
+        Write history evicted from memory to the repository.
+        
+        Records the repository fails to save are kept for the next flush.
+        Call before shutdown so no evicted history is lost.
+        
+        Returns:
+            Number of records persisted
+        """
+        if self.repository is None:
+            return 0
+        
+        saved = 0
+        for pending, save in (
+            (self._pending_updates, self.repository.save_zone_update),
+            (self._pending_events, self.repository.save_test_event)
+        ):
+            failed = [record for record in pending if not save(record)]
+            saved += len(pending) - len(failed)
+            pending[:] = failed
+        
+        if self._pending_updates or self._pending_events:
+            logger.warning(
+                f"Failed to persist {len(self._pending_updates)} zone updates and "
+                f"{len(self._pending_events)} test events, will retry"
+            )
+        
+        return saved
+    
+    @property
+    def _zone_updates(self) -> List[ZoneStateUpdate]:
+        """Zone state updates held in memory, in chronological order"""
+        return self._update_history.all()
+    
+    @property
+    def _test_events(self) -> List[ZoneTestEvent]:
+        """Zone test events held in memory, in chronological order"""
+        return self._event_history.all()
+    
     def get_test_statistics(self, zone_id: int) -> Dict[str, Any]:
         """
         Get zone test statistics.
@@ -384,305 +694,472 @@ class ZoneStateManager:
             'total_penetrations': 0
         }
     
+    def reset_zone_tracking(self, zone_ids: Optional[List[int]] = None) -> None:
+        """
+        Discard zone watermarks so the next update re-analyzes all candles.
+        
+        Needed when price data is reloaded or rewound, e.g. when restarting a
+        backtest with the same state manager.
+        
+        Args:
+            zone_ids: Zones to reset (all tracked zones if None)
+        """
+        if zone_ids is None:
+            self._trackers.clear()
+        else:
+            self._trackers.discard(zone_ids)
+    
+    def _record_history(
+        self,
+        history: _ZoneHistory,
+        records: List[Any],
+        pending: List[Any]
+    ) -> None:
+        """Add records to zone history, evicting the oldest beyond the per-zone cap"""
+        max_entries = self.history_retention.max_entries_per_zone
+        
+        for record in records:
+            count = history.add(record)
+            if max_entries is not None and count > max_entries:
+                self._retire_history(history.evict_oldest(record.zone_id, max_entries), pending)
+    
+    def _enforce_history_age(self, current_time: datetime) -> None:
+        """Evict history older than the retention age"""
+        if self.history_retention.max_age_hours is None:
+            return
+        
+        cutoff = current_time - timedelta(hours=self.history_retention.max_age_hours)
+        self._retire_history(self._update_history.evict_before(cutoff), self._pending_updates)
+        self._retire_history(self._event_history.evict_before(cutoff), self._pending_events)
+    
+    def _retire_history(self, records: List[Any], pending: List[Any]) -> None:
+        """Queue evicted records for persistence, flushing full batches"""
+        if not records or self.repository is None:
+            return
+        
+        # Records without a saved zone cannot be persisted
+        pending.extend(record for record in records if record.zone_id is not None)
+        
+        batch_size = self.history_retention.flush_batch_size
+        if len(self._pending_updates) + len(self._pending_events) >= batch_size:
+            self.flush_history()
+        
+        # Bound the backlog if the repository keeps failing
+        backlog_limit = 10 * batch_size
+        if len(pending) > backlog_limit:
+            logger.warning(f"Dropping {len(pending) - backlog_limit} unpersisted history records")
+            del pending[:len(pending) - backlog_limit]
+    
+    def _average_reaction(self, zone_id: int) -> float:
+        """Average reaction strength over all test events of a zone"""
+        total, count = self._reaction_totals.get(zone_id, (0.0, 0))
+        return total / count if count else 0.0
+    
     def _update_zone_cache(self, zones: List[SupplyDemandZone]) -> None:
         """Update internal zone cache for tracking"""
         for zone in zones:
             if zone.id is not None:
                 self._zones[zone.id] = zone
     
-    def _detect_zone_interactions(
+    def _advance_zone_trackers(
         self,
         zones: List[SupplyDemandZone],
         price_data: pd.DataFrame,
         current_time: datetime
-    ) -> List[ZoneStateUpdate]:
+    ) -> Tuple[List[ZoneStateUpdate], List[ZoneStateUpdate]]:
         """
-        Detect zone interactions and generate state updates.
+        Consume candles past each zone's watermark and generate state updates.
+        
+        Deepest penetration follows from the furthest reach into the zone, as
+        penetration grows monotonically with the candle extreme. Trigger price
+        and interaction type come from the last candle entering the zone. Flips
+        are confirmed once the latest flip_confirmation_bars candles all hold
+        beyond the zone.
         
         Args:
             zones: List of zones to analyze
-            price_data: Price data for analysis
+            price_data: Price data ordered by time
             current_time: Current timestamp
             
         Returns:
-            List of state updates from zone interactions
+            Tuple of (interaction updates, flip updates)
         """
-        state_updates = []
+        candidate_zones = []
+        finished = []
         
         for zone in zones:
             if zone.status not in ['active', 'tested']:
-                continue
+                finished.append(self._tracker_key(zone))
+            elif zone.zone_type in ['supply', 'demand']:
+                candidate_zones.append(zone)
+        
+        # Zones leaving the active lifecycle no longer need tracking
+        self._trackers.discard(finished)
+        
+        if not candidate_zones:
+            return [], []
+        
+        times = self._bar_times(price_data)
+        highs = price_data['high'].to_numpy(dtype=float)
+        lows = price_data['low'].to_numpy(dtype=float)
+        closes = price_data['close'].to_numpy(dtype=float)
+        
+        top, bottom, height, is_supply, _ = self._zone_geometry(candidate_zones)
+        keys = [self._tracker_key(zone) for zone in candidate_zones]
+        slots = self._trackers.slots_for(keys, top, bottom, is_supply)
+        
+        # Zones sharing a watermark consume the same candles
+        starts = np.searchsorted(times, self._trackers.watermark[slots], side='right')
+        advanced = starts < len(times)
+        entered = np.zeros(len(candidate_zones), dtype=bool)
+        
+        for start in np.unique(starts[advanced]).tolist():
+            members = np.flatnonzero(starts == start)
+            entered[members] = self._advance_slots(
+                slots[members], highs[start:], lows[start:], closes[start:]
+            )
+            self._trackers.watermark[slots[members]] = times[-1]
+        
+        interaction_updates = []
+        interacting = np.flatnonzero(entered & (height > 0))
+        if len(interacting) > 0:
+            zone_slots = slots[interacting]
+            supply = is_supply[interacting]
+            geometry = (top[interacting], bottom[interacting], height[interacting], supply)
+            reach = self._trackers.reach[zone_slots]
+            max_penetration, _ = self._classify_penetrations(np.where(supply, reach, -reach), *geometry)
+            trigger_price = self._trackers.trigger[zone_slots]
+            _, interaction_type = self._classify_penetrations(trigger_price, *geometry)
             
-            try:
-                # Analyze interaction
-                interaction_result = self._analyze_zone_penetration(zone, price_data)
+            for i, penetration_pct, price, kind in zip(
+                interacting.tolist(), max_penetration.tolist(),
+                trigger_price.tolist(), interaction_type.tolist()
+            ):
+                if not penetration_pct > 0:
+                    continue
                 
-                if interaction_result:
-                    penetration_pct, trigger_price, interaction_type = interaction_result
-                    
-                    # Determine new status based on penetration
-                    new_status = self._classify_zone_interaction(
-                        zone, penetration_pct, interaction_type
-                    )
-                    
-                    if new_status != zone.status:
-                        # Create state update
-                        update = ZoneStateUpdate(
-                            zone_id=zone.id,
-                            old_status=zone.status,
-                            new_status=new_status,
-                            update_time=current_time,
-                            trigger_price=trigger_price,
-                            trigger_reason=self._get_trigger_reason(interaction_type, penetration_pct),
-                            test_success=self._is_test_successful(zone, interaction_type, penetration_pct)
-                        )
-                        
-                        state_updates.append(update)
-                        
-            except Exception as e:
-                logger.warning(f"Error analyzing zone {zone.id} interaction: {e}")
-                continue
+                zone = candidate_zones[i]
+                # Determine new status based on penetration
+                new_status = self._classify_zone_interaction(zone, penetration_pct, kind)
+                
+                if new_status != zone.status:
+                    interaction_updates.append(ZoneStateUpdate(
+                        zone_id=zone.id,
+                        old_status=zone.status,
+                        new_status=new_status,
+                        update_time=current_time,
+                        trigger_price=price,
+                        trigger_reason=self._get_trigger_reason(kind, penetration_pct),
+                        test_success=self._is_test_successful(zone, kind, penetration_pct)
+                    ))
+        
+        flip_updates = []
+        flipped = advanced & (self._trackers.flip_run[slots] >= self.flip_confirmation_bars)
+        for i in np.flatnonzero(flipped).tolist():
+            zone = candidate_zones[i]
+            flip_updates.append(ZoneStateUpdate(
+                zone_id=zone.id,
+                old_status=zone.status,
+                new_status='flipped',
+                update_time=current_time,
+                trigger_price=float(closes[-1]),
+                trigger_reason='zone_flip',
+                test_success=False
+            ))
+            
+            new_type = 'demand' if zone.zone_type == 'supply' else 'supply'
+            logger.debug(f"Detected zone {zone.id} flip from {zone.zone_type} to {new_type}")
         
-        return state_updates
+        return interaction_updates, flip_updates
     
-    def _analyze_zone_interaction(
+    def _advance_slots(
         self,
-        zone: SupplyDemandZone,
-        price_data: pd.DataFrame,
-        current_time: datetime
-    ) -> List[ZoneTestEvent]:
+        slots: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray
+    ) -> np.ndarray:
         """
-        Analyze price interaction with a specific zone.
+        Fold new candles into tracked zone state.
+        
+        Candles entering each zone and the last candle breaking the flip
+        conditions are found by binary search over suffix extremes, so the cost
+        is O((zones + candles) log candles) however many zones are tracked.
         
         Args:
-            zone: Zone to analyze
-            price_data: Price data for analysis
-            current_time: Current timestamp
+            slots: Tracker slots of zones sharing the same watermark
+            highs: High prices of candles past the watermark
+            lows: Low prices of candles past the watermark
+            closes: Close prices of candles past the watermark
             
         Returns:
-            List of test events for this zone
+            Boolean array, True where a new candle entered the zone
         """
-        test_events = []
+        trackers = self._trackers
+        top, bottom, supply = trackers.top[slots], trackers.bottom[slots], trackers.supply[slots]
+        n_bars = len(highs)
         
-        for _, candle in price_data.iterrows():
-            # Check if price interacts with zone
-            interaction = self._check_price_zone_interaction(zone, candle)
-            
-            if interaction:
-                test_type, test_price, penetration_pct = interaction
-                
-                # Calculate reaction strength
-                reaction_strength = self._calculate_reaction_strength(
-                    zone, candle, price_data, test_type
-                )
-                
-                # Determine test success
-                test_success = (
-                    reaction_strength >= self.reaction_strength_threshold and
-                    penetration_pct < self.break_threshold
-                )
-                
-                # Create test event
-                test_event = ZoneTestEvent(
-                    zone_id=zone.id,
-                    test_time=candle['time'],
-                    test_price=test_price,
-                    test_type=test_type,
-                    success=test_success,
-                    reaction_strength=reaction_strength
-                )
-                
-                test_events.append(test_event)
+        # Suffix maxima of highs and negated lows, reversed so they ascend
+        rising_highs = np.maximum.accumulate(np.where(np.isnan(highs), -np.inf, highs)[::-1])
+        rising_neg_lows = np.maximum.accumulate(np.where(np.isnan(lows), -np.inf, -lows)[::-1])
         
-        return test_events
+        # Candles enter a supply zone above its bottom, a demand zone below its top
+        entering = np.where(
+            supply,
+            n_bars - np.searchsorted(rising_highs, bottom, side='right'),
+            n_bars - np.searchsorted(rising_neg_lows, -top, side='right')
+        )
+        entered = entering > 0
+        last_entry = np.maximum(entering - 1, 0)
+        trigger = np.where(supply, highs[last_entry], lows[last_entry])
+        
+        trackers.trigger[slots] = np.where(entered, trigger, trackers.trigger[slots])
+        trackers.reach[slots] = np.maximum(
+            trackers.reach[slots], np.where(supply, rising_highs[-1], rising_neg_lows[-1])
+        )
+        
+        # Suffix minima (ascending by index) locate the last candle failing a flip:
+        # supply needs closes above top and lows within 0.5% of it, demand needs
+        # closes below bottom and highs within 0.5% of it; NaN always fails
+        def suffix_min(values: np.ndarray) -> np.ndarray:
+            return np.minimum.accumulate(np.where(np.isnan(values), -np.inf, values)[::-1])[::-1]
+        
+        failed = np.where(
+            supply,
+            np.maximum(
+                np.searchsorted(suffix_min(closes), top, side='right'),
+                np.searchsorted(suffix_min(lows), top * 0.995, side='left')
+            ),
+            np.maximum(
+                np.searchsorted(suffix_min(-closes), -bottom, side='right'),
+                np.searchsorted(suffix_min(-highs), -(bottom * 1.005), side='left')
+            )
+        )
+        holding = n_bars - failed
+        trackers.flip_run[slots] = np.where(
+            holding == n_bars, trackers.flip_run[slots] + n_bars, holding
+        )
+        
+        return entered
     
-    def _analyze_zone_penetration(
+    def _analyze_zone_interactions(
         self,
-        zone: SupplyDemandZone,
+        zones: List[SupplyDemandZone],
         price_data: pd.DataFrame
-    ) -> Optional[Tuple[float, float, str]]:
+    ) -> List[ZoneTestEvent]:
         """
-        Analyze the deepest penetration of zone by price.
+        Analyze price interaction of every zone with every candle.
+        
+        A supply zone is tested by any candle whose high reaches its bottom and
+        a demand zone by any candle whose low reaches its top. Zones are
+        evaluated against all candles at once in chunks of at most
+        MAX_INTERACTION_CELLS zone/candle pairs.
         
         Args:
-            zone: Zone to analyze
+            zones: Zones to analyze
             price_data: Price data for analysis
             
         Returns:
-            Tuple of (penetration_percentage, trigger_price, interaction_type) or None
-        """
-        max_penetration = 0.0
-        trigger_price = zone.center
-        interaction_type = 'touch'
-        
-        zone_height = zone.height
-        if zone_height <= 0:
-            return None
-        
-        for _, candle in price_data.iterrows():
-            # Check penetration based on zone type
-            if zone.zone_type == 'supply':
-                # For supply zones, check upward penetration
-                if candle['high'] > zone.bottom_price:
-                    if candle['high'] >= zone.top_price:
-                        # Complete penetration
-                        penetration = 1.0
-                        trigger_price = candle['high']
-                        interaction_type = 'break'
-                    else:
-                        # Partial penetration
-                        penetration = (candle['high'] - zone.bottom_price) / zone_height
-                        trigger_price = candle['high']
-                        interaction_type = 'penetration' if penetration > self.test_penetration_threshold else 'touch'
-                    
-                    max_penetration = max(max_penetration, penetration)
-            
-            elif zone.zone_type == 'demand':
-                # For demand zones, check downward penetration
-                if candle['low'] < zone.top_price:
-                    if candle['low'] <= zone.bottom_price:
-                        # Complete penetration
-                        penetration = 1.0
-                        trigger_price = candle['low']
-                        interaction_type = 'break'
-                    else:
-                        # Partial penetration
-                        penetration = (zone.top_price - candle['low']) / zone_height
-                        trigger_price = candle['low']
-                        interaction_type = 'penetration' if penetration > self.test_penetration_threshold else 'touch'
-                    
-                    max_penetration = max(max_penetration, penetration)
+            List of test events ordered by zone, then by candle
+        """
+        highs = price_data['high'].to_numpy(dtype=float)
+        lows = price_data['low'].to_numpy(dtype=float)
+        closes = price_data['close'].to_numpy(dtype=float)
+        times = price_data['time'].tolist()
+        test_indices = self._first_time_indices(price_data['time'])
         
-        if max_penetration > 0:
-            return max_penetration, trigger_price, interaction_type
+        geometry = self._zone_geometry(zones)
+        top, bottom, height, is_supply, is_demand = geometry
+        atr = self._zone_atr(zones)
+        
+        n_bars = len(price_data)
+        chunk_size = max(1, MAX_INTERACTION_CELLS // max(n_bars, 1))
+        test_events = []
         
-        return None
+        for start in range(0, len(zones), chunk_size):
+            end = min(start + chunk_size, len(zones))
+            chunk = slice(start, end)
+            
+            # Zones x candles hit matrix, row-major so hits come out zone by zone
+            hits = (
+                (is_supply[chunk, None] & (highs[None, :] >= bottom[chunk, None])) |
+                (is_demand[chunk, None] & (lows[None, :] <= top[chunk, None]))
+            )
+            hits &= (height[chunk] > 0)[:, None]
+            zone_idx, bar_idx = np.nonzero(hits)
+            if len(zone_idx) == 0:
+                continue
+            zone_idx += start
+                
+            supply = is_supply[zone_idx]
+            test_price = np.where(supply, highs[bar_idx], lows[bar_idx])
+            penetration_pct, test_types = self._classify_penetrations(
+                test_price, top[zone_idx], bottom[zone_idx], height[zone_idx], supply
+            )
+            reaction_strength = self._calculate_reaction_strengths(
+                test_price, test_indices[bar_idx], closes, atr[zone_idx], supply
+            )
+            test_success = (
+                (reaction_strength >= self.reaction_strength_threshold) &
+                (penetration_pct < self.break_threshold)
+            )
+                
+            for z, b, price, test_type, success, strength in zip(
+                zone_idx.tolist(), bar_idx.tolist(), test_price.tolist(),
+                test_types.tolist(), test_success.tolist(), reaction_strength.tolist()
+            ):
+                test_events.append(ZoneTestEvent(
+                    zone_id=zones[z].id,
+                    test_time=times[b],
+                    test_price=price,
+                    test_type=test_type,
+                    success=success,
+                    reaction_strength=strength
+                ))
+        
+        return test_events
     
-    def _check_price_zone_interaction(
+    def _classify_penetrations(
         self,
-        zone: SupplyDemandZone,
-        candle: pd.Series
-    ) -> Optional[Tuple[str, float, float]]:
+        prices: np.ndarray,
+        top: np.ndarray,
+        bottom: np.ndarray,
+        height: np.ndarray,
+        is_supply: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Check if a single candle interacts with zone.
+        Classify candle extremes that reached into their zones.
         
         Args:
-            zone: Zone to check
-            candle: Single candle data
+            prices: Candle high (supply) or low (demand) per interaction
+            top: Zone top price per interaction
+            bottom: Zone bottom price per interaction
+            height: Zone height per interaction
+            is_supply: True for supply zone interactions
             
         Returns:
-            Tuple of (test_type, test_price, penetration_pct) or None
+            Tuple of (penetration_percentage, test_type) arrays
         """
-        zone_height = zone.height
-        if zone_height <= 0:
-            return None
+        broken = np.where(is_supply, prices >= top, prices <= bottom)
+        partial = np.where(is_supply, prices - bottom, top - prices) / height
+        penetration_pct = np.where(broken, 1.0, partial)
         
-        if zone.zone_type == 'supply':
-            # Check upward interaction with supply zone
-            if candle['high'] >= zone.bottom_price:
-                test_price = candle['high']
-                
-                if candle['high'] >= zone.top_price:
-                    # Complete break
-                    penetration_pct = 1.0
-                    test_type = 'break'
-                else:
-                    # Partial penetration
-                    penetration_pct = (candle['high'] - zone.bottom_price) / zone_height
-                    test_type = 'penetration' if penetration_pct > self.test_penetration_threshold else 'touch'
-                
-                return test_type, test_price, penetration_pct
-        
-        elif zone.zone_type == 'demand':
-            # Check downward interaction with demand zone
-            if candle['low'] <= zone.top_price:
-                test_price = candle['low']
-                
-                if candle['low'] <= zone.bottom_price:
-                    # Complete break
-                    penetration_pct = 1.0
-                    test_type = 'break'
-                else:
-                    # Partial penetration
-                    penetration_pct = (zone.top_price - candle['low']) / zone_height
-                    test_type = 'penetration' if penetration_pct > self.test_penetration_threshold else 'touch'
+        test_types = np.where(
+            broken, 'break',
+            np.where(penetration_pct > self.test_penetration_threshold, 'penetration', 'touch')
+        )
+        return penetration_pct, test_types.astype(object)
                 
-                return test_type, test_price, penetration_pct
-        
-        return None
-    
-    def _calculate_reaction_strength(
+    def _calculate_reaction_strengths(
         self,
-        zone: SupplyDemandZone,
-        test_candle: pd.Series,
-        price_data: pd.DataFrame,
-        test_type: str
-    ) -> float:
+        test_prices: np.ndarray,
+        test_indices: np.ndarray,
+        closes: np.ndarray,
+        atr: np.ndarray,
+        is_supply: np.ndarray
+    ) -> np.ndarray:
         """
-        Calculate reaction strength after zone test.
+        Calculate reaction strength after zone tests.
+                
+        The reaction is the mean favourable close move over the next 3 candles
+        in ATR units, normalised so that 2 ATR = 1.0. Tests without at least
+        2 following candles or with a zero ATR score a neutral 0.5.
         
         Args:
-            zone: Zone that was tested
-            test_candle: Candle that tested the zone
-            price_data: Full price data for context
-            test_type: Type of test ('touch', 'penetration', 'break')
+            test_prices: Price that tested each zone
+            test_indices: Index of the test candle (-1 if unknown)
+            closes: Close prices of the full price data
+            atr: Zone ATR at creation per test
+            is_supply: True for supply zone tests
             
         Returns:
-            Reaction strength (0.0 to 1.0)
+            Reaction strength (0.0 to 1.0) per test
         """
-        try:
-            # Find test candle index
-            test_time = test_candle['time']
-            test_index = None
+        n_bars = len(closes)
+        strengths = np.full(len(test_prices), 0.5)
             
-            for i, (_, candle) in enumerate(price_data.iterrows()):
-                if candle['time'] == test_time:
-                    test_index = i
-                    break
+        has_context = (test_indices >= 0) & (test_indices < n_bars - 2) & (atr != 0)
+        if not has_context.any():
+            return strengths
             
-            if test_index is None or test_index >= len(price_data) - 2:
-                return 0.5  # Default if can't find context
+        index = test_indices[has_context]
+        price = test_prices[has_context]
+        supply = is_supply[has_context]
             
-            # Analyze reaction in next 3 candles
-            reaction_candles = price_data.iloc[test_index + 1:test_index + 4]
+        padded_closes = np.append(closes, np.nan)
+        reaction_count = np.where(index + 3 < n_bars, 3, 2)
+        total = np.zeros(len(index))
             
-            if len(reaction_candles) == 0:
-                return 0.5
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for offset in range(1, 4):
+                close = padded_closes[np.minimum(index + offset, n_bars)]
+                move = np.where(supply, price - close, close - price) / atr[has_context]
+                # Only positive reactions count
+                move = np.where(move > 0, move, 0.0)
+                total = np.where(offset <= reaction_count, total + move, total)
             
-            # Calculate reaction strength based on zone type
-            if zone.zone_type == 'supply':
-                # For supply zones, expect downward reaction
-                test_price = test_candle['high']
-                reaction_moves = []
+            # Normalize to 0-1 scale (2 ATR = 1.0)
+            strengths[has_context] = np.minimum(1.0, (total / reaction_count) / 2.0)
                 
-                for _, candle in reaction_candles.iterrows():
-                    move = (test_price - candle['close']) / zone.atr_at_creation
-                    reaction_moves.append(max(0, move))  # Only positive reactions
+        return strengths
                 
-            elif zone.zone_type == 'demand':
-                # For demand zones, expect upward reaction
-                test_price = test_candle['low']
-                reaction_moves = []
+    @staticmethod
+    def _zone_geometry(
+        zones: List[SupplyDemandZone]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Zone top, bottom, height, supply mask and demand mask as arrays"""
+        top = np.array([zone.top_price for zone in zones], dtype=float)
+        bottom = np.array([zone.bottom_price for zone in zones], dtype=float)
+        height = np.array([zone.height for zone in zones], dtype=float)
+        is_supply = np.array([zone.zone_type == 'supply' for zone in zones], dtype=bool)
+        is_demand = np.array([zone.zone_type == 'demand' for zone in zones], dtype=bool)
+        return top, bottom, height, is_supply, is_demand
                 
-                for _, candle in reaction_candles.iterrows():
-                    move = (candle['close'] - test_price) / zone.atr_at_creation
-                    reaction_moves.append(max(0, move))  # Only positive reactions
-            
-            else:
-                return 0.5
-            
-            # Calculate average reaction strength
-            if reaction_moves:
-                avg_reaction = np.mean(reaction_moves)
-                # Normalize to 0-1 scale (2 ATR = 1.0)
-                normalized_reaction = min(1.0, avg_reaction / 2.0)
-                return normalized_reaction
-            
-            return 0.5
+    @staticmethod
+    def _tracker_key(zone: SupplyDemandZone) -> Any:
+        """Zone ID, or the zone's identifying attributes for unsaved zones"""
+        if zone.id is not None:
+            return zone.id
+        return (zone.symbol, zone.timeframe, zone.zone_type, zone.left_time, zone.right_time)
+    
+    @staticmethod
+    def _bar_times(price_data: pd.DataFrame) -> np.ndarray:
+        """
+        Candle times as int64 nanoseconds.
+        
+        Raises:
+            ValueError: If times are missing or not in ascending order
+        """
+        # .values is naive UTC for tz-aware columns and avoids a copy otherwise
+        times = price_data['time'].values
+        if not np.issubdtype(times.dtype, np.datetime64):
+            times = pd.DatetimeIndex(times).values
+        times = times.astype('datetime64[ns]', copy=False).view(np.int64)
+        
+        if np.any(times == _ZoneTrackers.NO_WATERMARK):
+            raise ValueError("price_data 'time' contains missing values")
+        if np.any(times[1:] < times[:-1]):
+            raise ValueError("price_data must be ordered by 'time'")
+        return times
+    
+    @staticmethod
+    def _zone_atr(zones: List[SupplyDemandZone]) -> np.ndarray:
+        """Zone ATR at creation, with 0.0 marking an unusable ATR"""
+        atr = np.zeros(len(zones))
+        for i, zone in enumerate(zones):
+            try:
+                atr[i] = float(zone.atr_at_creation)
+            except (TypeError, ValueError):
+                continue
+        return atr
             
-        except Exception as e:
-            logger.warning(f"Error calculating reaction strength: {e}")
-            return 0.5
+    @staticmethod
+    def _first_time_indices(times: pd.Series) -> np.ndarray:
+        """Index of the first candle sharing each candle's time (-1 for missing)"""
+        codes, _ = pd.factorize(times)
+        unique_codes, first_index = np.unique(codes, return_index=True)
+        indices = first_index[np.searchsorted(unique_codes, codes)]
+        return np.where(codes >= 0, indices, -1)
     
     def _classify_zone_interaction(
         self,
@@ -745,110 +1222,38 @@ class ZoneStateManager:
         # (Real success determined by reaction strength in full analysis)
         return penetration_pct < self.break_threshold
     
-    def _detect_zone_flip(
+    def _detect_zone_flips(
         self,
-        zone: SupplyDemandZone,
-        price_data: pd.DataFrame,
-        current_time: datetime
-    ) -> Optional[ZoneStateUpdate]:
-        """
-        Detect if zone has flipped from supply to demand or vice versa.
-        
-        Args:
-            zone: Zone to check for flip
-            price_data: Recent price data
-            current_time: Current timestamp
-            
-        Returns:
-            Zone flip update or None
-        """
-        if len(price_data) < self.flip_confirmation_bars:
-            return None
-        
-        try:
-            # Get recent candles for flip confirmation
-            recent_candles = price_data.tail(self.flip_confirmation_bars)
-            
-            # Analyze flip conditions based on zone type
-            if zone.zone_type == 'supply':
-                # Supply zone flips to demand if price consistently holds above zone
-                flip_confirmed = self._check_supply_to_demand_flip(zone, recent_candles)
-                new_type = 'demand' if flip_confirmed else None
-                
-            elif zone.zone_type == 'demand':
-                # Demand zone flips to supply if price consistently holds below zone
-                flip_confirmed = self._check_demand_to_supply_flip(zone, recent_candles)
-                new_type = 'supply' if flip_confirmed else None
-                
-            else:
-                return None
-            
-            if flip_confirmed and new_type:
-                # Create flip update
-                flip_update = ZoneStateUpdate(
-                    zone_id=zone.id,
-                    old_status=zone.status,
-                    new_status='flipped',
-                    update_time=current_time,
-                    trigger_price=recent_candles['close'].iloc[-1],
-                    trigger_reason='zone_flip',
-                    test_success=False
-                )
-                
-                logger.debug(f"Detected zone {zone.id} flip from {zone.zone_type} to {new_type}")
-                return flip_update
-            
-            return None
-            
-        except Exception as e:
-            logger.warning(f"Error detecting zone {zone.id} flip: {e}")
-            return None
-    
-    def _check_supply_to_demand_flip(
-        self,
-        zone: SupplyDemandZone,
+        zones: List[SupplyDemandZone],
         recent_candles: pd.DataFrame
-    ) -> bool:
+    ) -> np.ndarray:
         """
-        Check if supply zone flips to demand zone.
+        Detect which zones have flipped from supply to demand or vice versa.
         
-        Args:
-            zone: Supply zone to check
-            recent_candles: Recent candle data
-            
-        Returns:
-            True if flip is confirmed
-        """
-        # Supply flips to demand if price consistently closes above zone top
-        closes_above_zone = (recent_candles['close'] > zone.top_price).all()
-        
-        # Additional confirmation: recent lows should not break below zone top
-        lows_respect_zone = (recent_candles['low'] >= zone.top_price * 0.995).all()  # 0.5% tolerance
-        
-        return closes_above_zone and lows_respect_zone
-    
-    def _check_demand_to_supply_flip(
-        self,
-        zone: SupplyDemandZone,
-        recent_candles: pd.DataFrame
-    ) -> bool:
-        """
-        Check if demand zone flips to supply zone.
+        Supply flips to demand if price consistently closes above the zone top
+        while lows hold above it (0.5% tolerance). Demand flips to supply if
+        price consistently closes below the zone bottom while highs hold below
+        it (0.5% tolerance).
         
         Args:
-            zone: Demand zone to check
-            recent_candles: Recent candle data
+            zones: Zones to check for flip
+            recent_candles: Candles confirming the flip
             
         Returns:
-            True if flip is confirmed
+            Boolean array, True where the flip is confirmed
         """
-        # Demand flips to supply if price consistently closes below zone bottom
-        closes_below_zone = (recent_candles['close'] < zone.bottom_price).all()
+        top, bottom, _, is_supply, is_demand = self._zone_geometry(zones)
         
-        # Additional confirmation: recent highs should not break above zone bottom
-        highs_respect_zone = (recent_candles['high'] <= zone.bottom_price * 1.005).all()  # 0.5% tolerance
-        
-        return closes_below_zone and highs_respect_zone
+        # NaN extremes propagate and never confirm a flip
+        closes = recent_candles['close'].to_numpy(dtype=float)
+        min_close, max_close = np.min(closes), np.max(closes)
+        min_low = np.min(recent_candles['low'].to_numpy(dtype=float))
+        max_high = np.max(recent_candles['high'].to_numpy(dtype=float))
+            
+        supply_to_demand = (min_close > top) & (min_low >= top * 0.995)
+        demand_to_supply = (max_close < bottom) & (max_high <= bottom * 1.005)
+                
+        return (is_supply & supply_to_demand) | (is_demand & demand_to_supply)
     
     def _update_zone_statistics(
         self,
@@ -862,43 +1267,38 @@ class ZoneStateManager:
             zones: List of zones to update statistics for
             updates: Recent zone state updates
         """
+        # Initialize statistics for zones seen for the first time
         for zone in zones:
-            if zone.id is None:
+            if zone.id is None or zone.id in self._zone_statistics:
                 continue
             
-            # Initialize statistics if not present
-            if zone.id not in self._zone_statistics:
-                self._zone_statistics[zone.id] = {
-                    'test_count': zone.test_count,
-                    'success_count': zone.success_count,
-                    'success_rate': 0.0,
-                    'average_reaction_strength': 0.0,
-                    'last_test_time': None,
-                    'total_penetrations': 0
-                }
-            
-            stats = self._zone_statistics[zone.id]
-            
-            # Update statistics based on recent updates
-            zone_updates = [update for update in updates if update.zone_id == zone.id]
-            
-            for update in zone_updates:
-                if update.trigger_reason == 'zone_test':
-                    stats['test_count'] += 1
-                    stats['last_test_time'] = update.update_time
-                    
-                    if update.test_success:
-                        stats['success_count'] += 1
-            
-            # Calculate success rate
+            stats = {
+                'test_count': zone.test_count,
+                'success_count': zone.success_count,
+                'success_rate': 0.0,
+                'average_reaction_strength': self._average_reaction(zone.id),
+                'last_test_time': None,
+                'total_penetrations': 0
+            }
             if stats['test_count'] > 0:
                 stats['success_rate'] = stats['success_count'] / stats['test_count']
             
-            # Update average reaction strength from test events
-            zone_test_events = [event for event in self._test_events if event.zone_id == zone.id]
-            if zone_test_events:
-                avg_reaction = np.mean([event.reaction_strength for event in zone_test_events])
-                stats['average_reaction_strength'] = avg_reaction
+            self._zone_statistics[zone.id] = stats
+        
+        # Only zones with recent updates change their counts
+        for update in updates:
+            stats = self._zone_statistics.get(update.zone_id)
+            if stats is None or update.trigger_reason != 'zone_test':
+                continue
+            
+            stats['test_count'] += 1
+            stats['last_test_time'] = update.update_time
+            
+            if update.test_success:
+                stats['success_count'] += 1
+            
+            # Calculate success rate
+            stats['success_rate'] = stats['success_count'] / stats['test_count']
 
 
 def create_test_state_manager() -> ZoneStateManager:
@@ -4,15 +4,21 @@ SQLAlchemy models and database management for trading bot data storage.
 """
 
 import asyncio
+import io
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from functools import partial
+from typing import Callable, List, Optional, Dict, Any
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import func, and_, or_
+from sqlalchemy.dialects.postgresql import UUID, insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import func, and_, or_, inspect, select, table
 import uuid
 import json
+import struct
+import numpy as np
 import pandas as pd
 
 from src.utils.config import get_config
@@ -23,15 +29,44 @@ logger = get_logger("database")
 # Database base class
 Base = declarative_base()
 
+# Rows written per transaction by store_historical_data
+HISTORICAL_CHUNK_SIZE = 100_000
+
+# historical_data columns written by the bulk ingest, in table order
+HISTORICAL_COLUMNS = ['symbol', 'timeframe', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 'created_at']
+HISTORICAL_PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Natural key of a bar; re-imported bars update the stored row
+HISTORICAL_KEY_COLUMNS = ['symbol', 'timeframe', 'timestamp']
+HISTORICAL_UNIQUE_INDEX = 'ix_historical_data_symbol_timeframe_timestamp'
+
+# Single-column indexes made redundant by the unique index
+LEGACY_HISTORICAL_INDEXES = ['ix_historical_data_symbol', 'ix_historical_data_timeframe', 'ix_historical_data_timestamp']
+
+# Migrates existing historical_data tables to the unique index
+HISTORICAL_MIGRATION_TOOL = 'tools/utilities/dedupe_historical_data.py'
+
+# Per-transaction staging table for PostgreSQL COPY upserts
+HISTORICAL_STAGING_TABLE = 'historical_data_staging'
+
+# PostgreSQL binary COPY framing and timestamp epoch
+PG_COPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PG_COPY_TRAILER = struct.pack('>h', -1)
+PG_EPOCH = np.datetime64('2000-01-01T00:00:00', 'us')
+
+# SQLite pragmas for bulk loads: skip fsyncs and keep a 256MB page cache;
+# a crash mid-import can lose the import but the import can be re-run
+SQLITE_BULK_PRAGMAS = {'synchronous': 'OFF', 'cache_size': '-262144'}
+
 
 class HistoricalData(Base):
     """Table for storing historical price data."""
     __tablename__ = "historical_data"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(10), nullable=False, index=True)
-    timeframe = Column(String(5), nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    symbol = Column(String(10), nullable=False)
+    timeframe = Column(String(5), nullable=False)
+    timestamp = Column(DateTime, nullable=False)
     open = Column(Float, nullable=False)
     high = Column(Float, nullable=False)
     low = Column(Float, nullable=False)
@@ -39,8 +74,13 @@ class HistoricalData(Base):
     volume = Column(Float, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Composite index for efficient queries
+    # Composite unique index: one bar per (symbol, timeframe, timestamp).
+    # On PostgreSQL it also carries the prices so range reads are index-only scans
     __table_args__ = (
+        Index(
+            HISTORICAL_UNIQUE_INDEX, *HISTORICAL_KEY_COLUMNS, unique=True,
+            postgresql_include=HISTORICAL_PRICE_COLUMNS
+        ),
         {'comment': 'Historical market data storage'},
     )
 
@@ -426,6 +466,12 @@ class DatabaseManager:
             # Create all tables
             Base.metadata.create_all(bind=self.engine)
             
+            if not self._has_historical_unique_index():
+                logger.warning(
+                    "historical_data has no unique (symbol, timeframe, timestamp) index; "
+                    f"run {HISTORICAL_MIGRATION_TOOL} before importing data"
+                )
+            
             # Create session factory
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
             
@@ -449,42 +495,290 @@ class DatabaseManager:
             logger.info("Database disconnected")
     
     # Historical Data Operations
-    def store_historical_data(self, symbol: str, timeframe: str, data: pd.DataFrame) -> bool:
-        """Store historical market data."""
+    def store_historical_data(self, symbol: str, timeframe: str, data: pd.DataFrame,
+                              chunk_size: int = HISTORICAL_CHUNK_SIZE,
+                              progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        Store historical market data, updating bars that are already stored.
+        
+        Rows are built column-wise and upserted on (symbol, timeframe,
+        timestamp) in chunks, one transaction per chunk: COPY into a staging
+        table plus INSERT ... ON CONFLICT on PostgreSQL, executemany of an
+        INSERT ... ON CONFLICT on SQLite (with bulk-load pragmas). Re-running
+        an import is idempotent; unchanged bars are not rewritten. Chunks
+        written before a failure stay stored.
+        
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe
+            data: OHLC DataFrame indexed by timestamp, optionally with 'volume'
+            chunk_size: Rows per transaction
+            progress_callback: Called after each chunk with (rows stored, total rows)
+        
+        Returns:
+            True if every row was stored
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        
         try:
-            with self.get_session() as session:
-                records = []
-                for index, row in data.iterrows():
-                    record = HistoricalData(
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        timestamp=index,
-                        open=row['open'],
-                        high=row['high'],
-                        low=row['low'],
-                        close=row['close'],
-                        volume=row.get('volume', 0)
-                    )
-                    records.append(record)
-                
-                # Use bulk insert for better performance
-                session.bulk_save_objects(records)
-                session.commit()
-                
-                logger.info(f"Stored {len(records)} historical data records for {symbol} {timeframe}")
-                return True
-                
+            if not self._has_historical_unique_index():
+                logger.error(
+                    "Cannot upsert historical data without the unique (symbol, timeframe, timestamp) "
+                    f"index; run {HISTORICAL_MIGRATION_TOOL}"
+                )
+                return False
+            
+            rows = self._historical_rows(symbol, timeframe, data)
+            total = len(rows)
+            stored = 0
+            start_time = time.perf_counter()
+            
+            with self.engine.connect() as connection:
+                upsert = self._historical_upsert(connection.dialect.name)
+                if connection.dialect.name == 'postgresql':
+                    write_chunk = partial(self._copy_historical_chunk, upsert=upsert)
+                    restore_pragmas = {}
+                else:
+                    upsert = upsert.compile(dialect=connection.dialect, column_keys=HISTORICAL_COLUMNS)
+                    write_chunk = partial(self._insert_historical_chunk, upsert=upsert)
+                    restore_pragmas = self._set_bulk_pragmas(connection, SQLITE_BULK_PRAGMAS)
+                
+                try:
+                    for start in range(0, total, chunk_size):
+                        chunk = rows.iloc[start:start + chunk_size]
+                        with connection.begin():
+                            write_chunk(connection, chunk)
+                        
+                        stored += len(chunk)
+                        if progress_callback is not None:
+                            progress_callback(stored, total)
+                finally:
+                    self._set_bulk_pragmas(connection, restore_pragmas)
+            
+            elapsed = time.perf_counter() - start_time
+            logger.info(
+                f"Stored {stored} historical data records for {symbol} {timeframe} "
+                f"({stored / elapsed if elapsed > 0 else 0:.0f} rows/s)"
+            )
+            return True
+        
         except Exception as e:
             logger.error(f"Failed to store historical data: {e}")
             return False
     
+    def _historical_rows(self, symbol: str, timeframe: str, data: pd.DataFrame) -> pd.DataFrame:
+        """Build historical_data rows column-wise from an OHLC DataFrame."""
+        # A bar listed twice can't be upserted twice in one statement; the last one wins
+        data = data[~data.index.duplicated(keep='last')]
+        
+        timestamps = pd.DatetimeIndex(data.index)
+        if timestamps.tz is not None:
+            # Stored as wall time, like the ORM path did
+            timestamps = timestamps.tz_localize(None)
+        
+        volume = data['volume'].to_numpy(dtype=float) if 'volume' in data.columns else 0.0
+        return pd.DataFrame({
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'timestamp': timestamps,
+            'open': data['open'].to_numpy(dtype=float),
+            'high': data['high'].to_numpy(dtype=float),
+            'low': data['low'].to_numpy(dtype=float),
+            'close': data['close'].to_numpy(dtype=float),
+            'volume': volume,
+            'created_at': pd.Timestamp(datetime.utcnow())
+        }, columns=HISTORICAL_COLUMNS)
+    
+    def _historical_upsert(self, dialect_name: str):
+        """
+        INSERT ... ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE for the dialect.
+        
+        PostgreSQL inserts from the staging table; SQLite takes row values.
+        Only bars whose prices changed are updated.
+        """
+        historical = HistoricalData.__table__
+        if dialect_name == 'postgresql':
+            staging = table(HISTORICAL_STAGING_TABLE, *(historical.c[column].copy() for column in HISTORICAL_COLUMNS))
+            upsert = postgresql_insert(historical).from_select(HISTORICAL_COLUMNS, select(staging))
+        elif dialect_name == 'sqlite':
+            upsert = sqlite_insert(historical)
+        else:
+            raise ValueError(f"Upserts are not supported on {dialect_name}")
+        
+        return upsert.on_conflict_do_update(
+            index_elements=HISTORICAL_KEY_COLUMNS,
+            set_={column: upsert.excluded[column] for column in HISTORICAL_PRICE_COLUMNS},
+            where=or_(*(
+                historical.c[column].is_distinct_from(upsert.excluded[column])
+                for column in HISTORICAL_PRICE_COLUMNS
+            ))
+        )
+    
+    def _copy_historical_chunk(self, connection, chunk: pd.DataFrame, upsert) -> None:
+        """
+        Upsert rows through a binary COPY into a staging table (PostgreSQL).
+        
+        Symbol and timeframe are the same for every row, so each row has a
+        fixed size and the whole COPY buffer is one numpy record array.
+        """
+        symbol = chunk['symbol'].iloc[0].encode()
+        timeframe = chunk['timeframe'].iloc[0].encode()
+        row_type = np.dtype(
+            [('fields', '>i2'),
+             ('symbol_size', '>i4'), ('symbol', f'S{len(symbol)}'),
+             ('timeframe_size', '>i4'), ('timeframe', f'S{len(timeframe)}'),
+             ('timestamp_size', '>i4'), ('timestamp', '>i8')] +
+            [field for column in HISTORICAL_PRICE_COLUMNS
+             for field in ((f'{column}_size', '>i4'), (column, '>f8'))] +
+            [('created_at_size', '>i4'), ('created_at', '>i8')]
+        )
+        
+        rows = np.empty(len(chunk), dtype=row_type)
+        rows['fields'] = len(HISTORICAL_COLUMNS)
+        for name in row_type.names:
+            if name.endswith('_size'):
+                rows[name] = row_type[name[:-len('_size')]].itemsize
+        rows['symbol'] = symbol
+        rows['timeframe'] = timeframe
+        for column in ('timestamp', 'created_at'):
+            rows[column] = (chunk[column].to_numpy(dtype='datetime64[us]') - PG_EPOCH).astype(np.int64)
+        for column in HISTORICAL_PRICE_COLUMNS:
+            rows[column] = chunk[column].to_numpy()
+        
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE {HISTORICAL_STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {', '.join(HISTORICAL_COLUMNS)} FROM {HistoricalData.__tablename__} WITH NO DATA"
+        )
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {HISTORICAL_STAGING_TABLE} ({', '.join(HISTORICAL_COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT binary)",
+                io.BytesIO(PG_COPY_HEADER + rows.tobytes() + PG_COPY_TRAILER)
+            )
+        finally:
+            cursor.close()
+        connection.execute(upsert)
+    
+    def _insert_historical_chunk(self, connection, chunk: pd.DataFrame, upsert) -> None:
+        """
+        Upsert rows with executemany of the compiled Core upsert (SQLite).
+        
+        Values are passed to the driver as prepared tuples, with timestamps
+        formatted the way SQLAlchemy stores them on SQLite, instead of going
+        through per-row bind processing.
+        """
+        columns = {column: chunk[column].tolist() for column in HISTORICAL_COLUMNS}
+        for column in ('timestamp', 'created_at'):
+            columns[column] = np.char.replace(
+                np.datetime_as_string(chunk[column].to_numpy(dtype='datetime64[us]'), unit='us'), 'T', ' '
+            ).tolist()
+        
+        connection.exec_driver_sql(
+            str(upsert), list(zip(*(columns[column] for column in upsert.positiontup)))
+        )
+    
+    def _set_bulk_pragmas(self, connection, pragmas: Dict[str, str]) -> Dict[str, str]:
+        """Set SQLite pragmas outside a transaction, returning the previous values."""
+        if connection.dialect.name != 'sqlite' or not pragmas:
+            return {}
+        
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = str(connection.exec_driver_sql(f"PRAGMA {name}").scalar())
+            connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+        connection.commit()
+        return previous
+    
+    def _has_historical_unique_index(self, bind=None) -> bool:
+        """Whether historical_data has the unique (symbol, timeframe, timestamp) index."""
+        indexes = inspect(bind if bind is not None else self.engine).get_indexes(HistoricalData.__tablename__)
+        return any(
+            index['unique'] and index['column_names'] == HISTORICAL_KEY_COLUMNS
+            for index in indexes
+        )
+    
+    def deduplicate_historical_data(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        One-off migration to the unique (symbol, timeframe, timestamp) index.
+        
+        Deletes duplicate bars, keeping the most recently imported row of each
+        (symbol, timeframe, timestamp), creates the unique index and drops the
+        single-column indexes it replaces, all in one transaction. Statistics
+        are refreshed afterwards (VACUUM ANALYZE on PostgreSQL, so index-only
+        scans can skip the table).
+        
+        Args:
+            dry_run: Only count duplicates
+        
+        Returns:
+            Stats with 'duplicate_bars' (keys stored more than once),
+            'deleted_rows' and 'index_created' (1 if the index was created)
+        """
+        historical = HistoricalData.__tablename__
+        key = ', '.join(HISTORICAL_KEY_COLUMNS)
+        stats = {'duplicate_bars': 0, 'deleted_rows': 0, 'index_created': 0}
+        
+        with self.engine.connect() as connection:
+            with connection.begin():
+                duplicate_bars, duplicate_rows = connection.exec_driver_sql(f"""
+                    SELECT COUNT(*), COALESCE(SUM(copies - 1), 0)
+                    FROM (SELECT COUNT(*) AS copies FROM {historical} GROUP BY {key} HAVING COUNT(*) > 1) duplicates
+                """).one()
+                stats['duplicate_bars'] = int(duplicate_bars)
+                logger.info(f"historical_data has {duplicate_bars} duplicated bars ({duplicate_rows} extra rows)")
+                
+                if dry_run:
+                    return stats
+                
+                if duplicate_rows:
+                    stats['deleted_rows'] = connection.exec_driver_sql(f"""
+                        DELETE FROM {historical} WHERE id IN (
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY id DESC) AS copy
+                                FROM {historical}
+                            ) ranked
+                            WHERE copy > 1
+                        )
+                    """).rowcount
+                
+                if not self._has_historical_unique_index(connection):
+                    unique_index = next(
+                        index for index in HistoricalData.__table__.indexes if index.name == HISTORICAL_UNIQUE_INDEX
+                    )
+                    unique_index.create(bind=connection)
+                    stats['index_created'] = 1
+                
+                for index_name in LEGACY_HISTORICAL_INDEXES:
+                    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name}")
+            
+            if connection.dialect.name == 'postgresql':
+                connection.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql(
+                    f"VACUUM ANALYZE {historical}"
+                )
+            else:
+                connection.exec_driver_sql(f"ANALYZE {historical}")
+                connection.commit()
+        
+        logger.info(
+            f"Removed {stats['deleted_rows']} duplicate historical data rows"
+            f"{', created unique index' if stats['index_created'] else ''}"
+        )
+        return stats
+    
     def get_historical_data(self, symbol: str, timeframe: str, 
                           start_date: datetime = None, end_date: datetime = None,
                           limit: int = None) -> pd.DataFrame:
         """Retrieve historical market data."""
         try:
             with self.get_session() as session:
-                query = session.query(HistoricalData).filter(
+                # Only columns in the unique index, so PostgreSQL can answer
+                # the range from the index alone
+                query = session.query(
+                    HistoricalData.timestamp,
+                    *(getattr(HistoricalData, column) for column in HISTORICAL_PRICE_COLUMNS)
+                ).filter(
                     HistoricalData.symbol == symbol,
                     HistoricalData.timeframe == timeframe
                 )
@@ -505,16 +799,8 @@ class DatabaseManager:
                     return pd.DataFrame()
                 
                 # Convert to DataFrame
-                data = {
-                    'open': [r.open for r in results],
-                    'high': [r.high for r in results],
-                    'low': [r.low for r in results],
-                    'close': [r.close for r in results],
-                    'volume': [r.volume for r in results]
-                }
-                
-                df = pd.DataFrame(data, index=[r.timestamp for r in results])
-                return df
+                df = pd.DataFrame.from_records(results, columns=['timestamp'] + HISTORICAL_PRICE_COLUMNS)
+                return df.set_index('timestamp').rename_axis(None)
                 
         except Exception as e:
             logger.error(f"Failed to retrieve historical data: {e}")
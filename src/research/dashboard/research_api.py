@@ -18,6 +18,9 @@ import pandas as pd
 from src.data.database import get_database_manager, initialize_database
 from src.data.importers import MT4DataImporter, MT5DataImporter
 from src.monitoring import get_logger
+from src.analysis.supply_demand import (
+    BaseCandleDetector, BigMoveDetector, SupplyDemandZoneDetector, SupplyDemandZone, ZoneSetCache
+)
 from src.strategy.backtesting_engine import BacktestingEngine
 from sqlalchemy import text
 import uvicorn
@@ -7013,74 +7016,101 @@ async def get_real_time_signal_performance():
 # SUPPLY & DEMAND ZONES ENDPOINTS
 # =====================================
 
-@app.get("/api/supply-demand/zones")
-async def get_supply_demand_zones(
-    symbol: str = Query(...),
-    timeframe: str = Query(...),
-    limit: int = Query(50, description="Maximum number of zones to return")
-):
-    """Get supply and demand zones for symbol and timeframe."""
-    try:
-        logger.info(f"🔄 Getting S&D zones: {symbol} {timeframe} (limit: {limit})")
+def create_zone_detector() -> SupplyDemandZoneDetector:
+    """Create the zone detector used for dashboard zone sets."""
+    return SupplyDemandZoneDetector(
+        base_detector=BaseCandleDetector(),
+        move_detector=BigMoveDetector()
+    )
 
-        # For now, create demo zones based on current market data
-        # In the future, this will use the actual SupplyDemandZoneDetector
+# Zone sets per (symbol, timeframe), refreshed from new bars on each request
+zone_cache = ZoneSetCache(create_zone_detector)
 
-        db_manager = get_database_manager()
-        if not db_manager:
-            raise HTTPException(status_code=500, detail="Database not available")
+def load_zone_bars(db_manager, symbol: str, timeframe: str):
+    """Bar loader for the zone cache, reading historical_data."""
+    def load_bars(since: Optional[datetime], limit: int) -> pd.DataFrame:
+        params = {'symbol': symbol, 'timeframe': timeframe, 'limit': limit}
+        since_filter = ""
+        if since is not None:
+            params['since'] = since
+            since_filter = "AND timestamp >= :since"
 
-        # Get recent market data for zone detection
         with db_manager.get_session() as session:
-            # Query recent data (last 1000 bars for zone detection)
-            query = text("""
+            query = text(f"""
                 SELECT timestamp, open, high, low, close, volume
                 FROM historical_data
                 WHERE symbol = :symbol
                 AND timeframe = :timeframe
+                {since_filter}
                 ORDER BY timestamp DESC
-                LIMIT 1000
+                LIMIT :limit
             """)
 
-            result = session.execute(query, {
-                'symbol': symbol,
-                'timeframe': timeframe
-            })
-
-            rows = result.fetchall()
+            rows = session.execute(query, params).fetchall()
 
-            if not rows:
-                return JSONResponse({
-                    "success": True,
-                    "zones": [],
-                    "message": f"No market data found for {symbol} {timeframe}"
-                })
-
-            # Convert to DataFrame for zone detection
-            # Using pandas import from top of file
-            df = pd.DataFrame([{
-                'timestamp': row[0],
-                'open': float(row[1]),
-                'high': float(row[2]),
-                'low': float(row[3]),
-                'close': float(row[4]),
-                'volume': float(row[5]) if row[5] else 0.0
-            } for row in rows])
+        # Rows are newest first; reverse to chronological order
+        df = pd.DataFrame.from_records(
+            rows[::-1], columns=['time', 'open', 'high', 'low', 'close', 'volume']
+        )
+        df['time'] = pd.to_datetime(df['time'])
+        df[['open', 'high', 'low', 'close', 'volume']] = (
+            df[['open', 'high', 'low', 'close', 'volume']].astype(float).fillna({'volume': 0.0})
+        )
+        return df
+
+    return load_bars
+
+def zone_to_dict(zone: SupplyDemandZone) -> Dict[str, Any]:
+    """Serialize a detected zone for the dashboard."""
+    return {
+        'id': f"{zone.zone_type}_{zone.symbol}_{zone.left_time:%Y%m%d%H%M%S}",
+        'symbol': zone.symbol,
+        'timeframe': zone.timeframe,
+        'zone_type': zone.zone_type,
+        'top_price': float(zone.top_price),
+        'bottom_price': float(zone.bottom_price),
+        'left_time': zone.left_time.isoformat(),
+        'right_time': zone.right_time.isoformat(),
+        'strength_score': float(zone.strength_score),
+        'status': zone.status,
+        'test_count': zone.test_count,
+        'created_at': zone.created_at.isoformat()
+    }
 
-            # Reverse to chronological order
-            df = df.iloc[::-1].reset_index(drop=True)
+@app.get("/api/supply-demand/zones")
+async def get_supply_demand_zones(
+    symbol: str = Query(...),
+    timeframe: str = Query(...),
+    limit: int = Query(50, description="Maximum number of zones to return")
+):
+    """Get supply and demand zones for symbol and timeframe."""
+    try:
+        logger.info(f"🔄 Getting S&D zones: {symbol} {timeframe} (limit: {limit})")
 
-            # Create demo zones based on price action
-            zones = create_demo_zones_from_data(df, symbol, timeframe, limit)
+        db_manager = get_database_manager()
+        if not db_manager:
+            raise HTTPException(status_code=500, detail="Database not available")
 
-            logger.info(f"✅ Generated {len(zones)} S&D zones for {symbol} {timeframe}")
+        # Cached zone set, updated only with bars that arrived since the last request
+        detected = zone_cache.get_zones(symbol, timeframe, load_zone_bars(db_manager, symbol, timeframe))
 
+        if zone_cache.bar_count(symbol, timeframe) == 0:
             return JSONResponse({
                 "success": True,
-                "zones": zones,
-                "count": len(zones)
+                "zones": [],
+                "message": f"No market data found for {symbol} {timeframe}"
             })
 
+        zones = [zone_to_dict(zone) for zone in detected[:limit]]
+
+        logger.info(f"✅ Served {len(zones)} S&D zones for {symbol} {timeframe}")
+
+        return JSONResponse({
+            "success": True,
+            "zones": zones,
+            "count": len(zones)
+        })
+
     except Exception as e:
         logger.error(f"Error getting S&D zones: {e}")
         return JSONResponse({
@@ -7089,96 +7119,6 @@ async def get_supply_demand_zones(
             "zones": []
         })
 
-def create_demo_zones_from_data(df, symbol, timeframe, limit):
-    """Create demo supply and demand zones from market data."""
-    zones = []
-
-    if len(df) < 50:
-        return zones
-
-    try:
-        # Find significant highs and lows for zone creation
-        window = 20
-
-        # Find local highs (potential supply zones)
-        for i in range(window, len(df) - window):
-            current_high = df.iloc[i]['high']
-
-            # Check if this is a local high
-            is_local_high = True
-            for j in range(i - window, i + window + 1):
-                if j != i and df.iloc[j]['high'] >= current_high:
-                    is_local_high = False
-                    break
-
-            if is_local_high and len([z for z in zones if z['zone_type'] == 'supply']) < limit // 2:
-                # Create supply zone
-                zone_height = current_high * 0.002  # 0.2% zone height
-                zones.append({
-                    'id': f"supply_{symbol}_{i}",
-                    'symbol': symbol,
-                    'timeframe': timeframe,
-                    'zone_type': 'supply',
-                    'top_price': current_high + zone_height,
-                    'bottom_price': current_high - zone_height,
-                    'left_time': df.iloc[max(0, i-10)]['timestamp'],
-                    'right_time': df.iloc[min(len(df)-1, i+10)]['timestamp'],
-                    'strength_score': 0.6 + (abs(current_high - df.iloc[i]['close']) / current_high) * 2,
-                    'status': 'active',
-                    'test_count': 0,
-                    'created_at': df.iloc[i]['timestamp']
-                })
-
-        # Find local lows (potential demand zones)
-        for i in range(window, len(df) - window):
-            current_low = df.iloc[i]['low']
-
-            # Check if this is a local low
-            is_local_low = True
-            for j in range(i - window, i + window + 1):
-                if j != i and df.iloc[j]['low'] <= current_low:
-                    is_local_low = False
-                    break
-
-            if is_local_low and len([z for z in zones if z['zone_type'] == 'demand']) < limit // 2:
-                # Create demand zone
-                zone_height = current_low * 0.002  # 0.2% zone height
-                zones.append({
-                    'id': f"demand_{symbol}_{i}",
-                    'symbol': symbol,
-                    'timeframe': timeframe,
-                    'zone_type': 'demand',
-                    'top_price': current_low + zone_height,
-                    'bottom_price': current_low - zone_height,
-                    'left_time': df.iloc[max(0, i-10)]['timestamp'],
-                    'right_time': df.iloc[min(len(df)-1, i+10)]['timestamp'],
-                    'strength_score': 0.6 + (abs(df.iloc[i]['close'] - current_low) / current_low) * 2,
-                    'status': 'active',
-                    'test_count': 0,
-                    'created_at': df.iloc[i]['timestamp']
-                })
-
-        # Sort zones by strength score (strongest first)
-        zones.sort(key=lambda x: x['strength_score'], reverse=True)
-
-        # Limit to requested number
-        zones = zones[:limit]
-
-        # Convert timestamps to ISO format for frontend
-        for zone in zones:
-            if hasattr(zone['left_time'], 'isoformat'):
-                zone['left_time'] = zone['left_time'].isoformat()
-            if hasattr(zone['right_time'], 'isoformat'):
-                zone['right_time'] = zone['right_time'].isoformat()
-            if hasattr(zone['created_at'], 'isoformat'):
-                zone['created_at'] = zone['created_at'].isoformat()
-
-        return zones
-
-    except Exception as e:
-        logger.error(f"Error creating demo zones: {e}")
-        return []
-
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
@@ -10,6 +10,7 @@ from datetime import datetime
 import logging
 
 from .fibonacci_strategy import FibonacciStrategy
+from ..analysis.confluence_writer import ConfluenceWriter
 from .trading_types import TradingSignal
 
 logger = logging.getLogger(__name__)
@@ -20,18 +21,21 @@ class BacktestingEngine:
     Processes one bar at a time and updates strategy state.
     """
     
-    def __init__(self, initial_capital: float = 10000.0):
+    def __init__(self, initial_capital: float = 10000.0,
+                 confluence_writer: Optional[ConfluenceWriter] = None):
         """
         Initialize backtesting engine.
         
         Args:
             initial_capital: Starting capital for backtesting
+            confluence_writer: Records the full confluence history of the
+                backtest in the database (the caller closes it)
         """
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
         
         # Strategy instance
-        self.strategy = FibonacciStrategy()
+        self.strategy = FibonacciStrategy(confluence_writer=confluence_writer)
         
         # Trading state
         self.current_position = None  # 'long', 'short', or None
@@ -75,8 +75,15 @@ class EnhancedSignalGenerator:
     to create high-quality entry signals.
     """
     
-    def __init__(self):
-        self.confluence_engine = ConfluenceEngine()
+    def __init__(self, confluence_engine: Optional[ConfluenceEngine] = None):
+        """
+        Initialize enhanced signal generator.
+        
+        Args:
+            confluence_engine: Engine to share candlestick pattern arrays with
+                (a private engine is created when None)
+        """
+        self.confluence_engine = confluence_engine or ConfluenceEngine()
         
         # Signal quality thresholds
         self.quality_thresholds = {
@@ -201,7 +208,7 @@ class EnhancedSignalGenerator:
         Returns:
             Bar pattern confirmation or None
         """
-        # Get candlestick patterns from confluence engine
+        # Look up candlestick patterns from the confluence engine's precomputed arrays
         patterns = self.confluence_engine.detect_candlestick_patterns(df, current_index)
         
         if not patterns:
@@ -310,11 +317,13 @@ class EnhancedSignalGenerator:
         if 'volume' not in df.columns:
             return 10  # Default moderate score if no volume data
         
-        current_volume = df.iloc[current_index]['volume']
+        features = self.confluence_engine.features
+        features.update(df)
+        current_volume = features.column('volume')[current_index]
         
         # Calculate average volume over last 20 bars
         start_idx = max(0, current_index - 20)
-        avg_volume = df.iloc[start_idx:current_index]['volume'].mean()
+        avg_volume = features.window_mean('volume', start_idx, current_index)
         
         if avg_volume == 0:
             return 10
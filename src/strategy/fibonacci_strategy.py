@@ -10,7 +10,9 @@ from dataclasses import dataclass
 import logging
 
 # Import confluence engine
-from ..analysis.confluence_engine import ConfluenceEngine, ConfluenceZone, CandlestickPattern
+from ..analysis.confluence_engine import ConfluenceEngine
+from ..analysis.confluence_history import BoundedHistory, HistorySpillStore
+from ..analysis.confluence_writer import ConfluenceWriter
 
 # Import enhanced signal generator
 from .enhanced_signal_generator import EnhancedSignalGenerator, EnhancedTradingSignal
@@ -41,7 +43,10 @@ class FibonacciStrategy:
                  fibonacci_levels: List[float] = None,
                  risk_reward_ratio: float = 2.0,
                  lookback_candles: int = 140,
-                 enable_confluence_analysis: bool = True):
+                 enable_confluence_analysis: bool = True,
+                 history_window: int = 5000,
+                 history_spill_store: Optional[HistorySpillStore] = None,
+                 confluence_writer: Optional[ConfluenceWriter] = None):
         """
         Initialize Fibonacci Strategy.
         
@@ -51,6 +56,11 @@ class FibonacciStrategy:
             fibonacci_levels: Fibonacci retracement levels to monitor
             risk_reward_ratio: Risk/reward ratio for trade management
             lookback_candles: Number of candles to look back for swing analysis
+            enable_confluence_analysis: Run the confluence engine on every bar
+            history_window: Confluence zones/patterns kept in memory
+            history_spill_store: Where the confluence engine writes older history
+            confluence_writer: Persists every bar's confluence factors and zones
+                to the database (the caller closes it)
         """
         self.fractal_period = fractal_period
         self.min_swing_points = min_swing_points
@@ -72,12 +82,17 @@ class FibonacciStrategy:
         
         # Confluence analysis engine
         self.enable_confluence_analysis = enable_confluence_analysis
-        self.confluence_engine = ConfluenceEngine() if enable_confluence_analysis else None
-        self.confluence_zones: List[ConfluenceZone] = []
-        self.candlestick_patterns: List[CandlestickPattern] = []
+        self.confluence_engine = ConfluenceEngine(
+            history_window=history_window, spill_store=history_spill_store,
+            writer=confluence_writer
+        ) if enable_confluence_analysis else None
+        
+        # Recent serialized results; the engine's history retains (and spills) the full record
+        self.confluence_zones = BoundedHistory('strategy_confluence_zones', history_window)
+        self.candlestick_patterns = BoundedHistory('strategy_candlestick_patterns', history_window)
         
         # Enhanced signal generator with pattern confirmation
-        self.enhanced_signal_generator = EnhancedSignalGenerator()
+        self.enhanced_signal_generator = EnhancedSignalGenerator(confluence_engine=self.confluence_engine)
         self.enhanced_signals: List[EnhancedTradingSignal] = []
         
         # Signal performance tracking for ML/AI development
@@ -1017,6 +1032,27 @@ class FibonacciStrategy:
         """Get comprehensive signal analytics for ML/AI development."""
         return self.signal_performance_tracker.get_signal_analytics()
     
+    def query_confluence_history(self,
+                                 kind: str = 'confluence_zones',
+                                 start: Optional[pd.Timestamp] = None,
+                                 end: Optional[pd.Timestamp] = None,
+                                 limit: Optional[int] = None) -> List[Dict]:
+        """
+        Query confluence history across memory and spilled entries.
+        
+        Args:
+            kind: 'confluence_zones', 'confluence_factors' or 'candlestick_patterns'
+            start: Earliest timestamp to include
+            end: Latest timestamp to include
+            limit: Return only the most recent N records
+            
+        Returns:
+            Serialized records in chronological order
+        """
+        if self.confluence_engine is None:
+            return []
+        return self.confluence_engine.query_history(kind, start, end, limit)
+    
     def export_signal_performance_data(self) -> pd.DataFrame:
         """Export all signal performance data for external analysis."""
         return self.signal_performance_tracker.export_performance_data()
@@ -167,6 +167,40 @@ def abc_pattern_data():
     return pd.DataFrame(data).set_index('timestamp')
 
 
+@pytest.fixture
+def random_ohlcv():
+    """Factory for seeded random OHLCV data alternating quiet consolidation and volatile bars."""
+    def make(n_bars: int, seed: int, freq: str = '15min', start: str = '2025-01-01') -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        volatility = np.where(rng.random(n_bars) < 0.5, 0.00005, 0.001)
+        opens = 1.1 + np.cumsum(rng.normal(0, 1, n_bars) * volatility)
+        closes = opens + rng.normal(0, 1, n_bars) * volatility * 0.5
+        return pd.DataFrame({
+            'open': opens,
+            'high': np.maximum(opens, closes) + np.abs(rng.normal(0, 1, n_bars)) * volatility * 0.3,
+            'low': np.minimum(opens, closes) - np.abs(rng.normal(0, 1, n_bars)) * volatility * 0.3,
+            'close': closes,
+            'volume': rng.integers(100, 1000, n_bars).astype(float),
+            'time': pd.date_range(start, periods=n_bars, freq=freq)
+        })
+
+    return make
+
+
+@pytest.fixture
+def zone_key():
+    """Comparable summary of a supply/demand zone, for matching zone sets."""
+    def key(zone):
+        return (
+            zone.symbol, zone.timeframe, zone.zone_type,
+            zone.base_range.start_time, zone.big_move.end_time,
+            pytest.approx(zone.top_price), pytest.approx(zone.bottom_price),
+            pytest.approx(zone.strength_score)
+        )
+
+    return key
+
+
 @pytest.fixture
 def fibonacci_strategy():
     """Create a FibonacciStrategy instance with standard parameters."""
@@ -0,0 +1,156 @@
+"""
+Bulk write benchmarks for SupplyDemandRepository.
+
+Runs against the embedded SQLite backend, and against a real PostgreSQL
+server when one is given by the SUPPLY_DEMAND_TEST_DSN environment variable, e.g.
+
+    SUPPLY_DEMAND_TEST_DSN="dbname=trading user=postgres host=localhost" \
+        python -m pytest tests/performance/test_supply_demand_repository_bulk.py -s
+
+PostgreSQL tables are created in a scratch schema that is dropped afterwards.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extensions import make_dsn
+
+from src.analysis.supply_demand.repository import SupplyDemandRepository
+from src.analysis.supply_demand.zone_detector import SupplyDemandZone
+from src.analysis.supply_demand.zone_state_manager import ZoneStateUpdate, ZoneTestEvent
+from src.analysis.supply_demand.base_candle_detector import BaseCandleRange
+from src.analysis.supply_demand.big_move_detector import BigMove
+
+TEST_DSN = os.environ.get("SUPPLY_DEMAND_TEST_DSN")
+SCHEMA = "sd_bulk_benchmark"
+ZONE_COUNT = 10_000
+SAVE_TARGET_MS = 10.0  # Documented "<10ms per zone save" target
+
+pytestmark = pytest.mark.slow
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def repository(request, tmp_path_factory):
+    """Repository on a scratch SQLite file or PostgreSQL schema"""
+    if request.param == "sqlite":
+        repository = SupplyDemandRepository(
+            connection_string=f"sqlite:///{tmp_path_factory.mktemp('bulk') / 'zones.db'}"
+        )
+        yield repository
+        repository.close()
+        return
+
+    if not TEST_DSN:
+        pytest.skip("SUPPLY_DEMAND_TEST_DSN not set")
+
+    admin = psycopg2.connect(TEST_DSN)
+    admin.autocommit = True
+    admin.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+
+    repository = SupplyDemandRepository(
+        connection_string=make_dsn(TEST_DSN, options=f"-c search_path={SCHEMA}"),
+        pool_size=2,
+        max_overflow=0
+    )
+
+    yield repository
+
+    repository.close()
+    admin.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+    admin.close()
+
+
+def _make_zones(count):
+    zones = []
+    for i in range(count):
+        start = datetime(2025, 1, 1) + timedelta(minutes=i)
+        zones.append(SupplyDemandZone(
+            id=None, symbol=f"PAIR{i % 20}", timeframe="M1",
+            zone_type="supply" if i % 2 else "demand",
+            top_price=1.0850 + i * 1e-5, bottom_price=1.0830 + i * 1e-5,
+            left_time=start, right_time=start + timedelta(minutes=5),
+            strength_score=0.8, test_count=0, success_count=0, status="active",
+            base_range=BaseCandleRange(0, 4, start, start + timedelta(minutes=4),
+                                       1.0850, 1.0830, 0.0010, 5, 0.8),
+            big_move=BigMove(5, 8, start + timedelta(minutes=5), start + timedelta(minutes=8),
+                             "bearish", 3.0, 0.8, 1.0830, True),
+            atr_at_creation=0.0010, volume_at_creation=1000.0,
+            created_at=start, updated_at=start
+        ))
+    return zones
+
+
+def _timed(operation):
+    start_time = time.perf_counter()
+    result = operation()
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+def test_bulk_zone_writes_meet_save_target(repository):
+    """
+    Bulk insert and bulk upsert of 10k zones stay well under 10ms per zone
+    and keep IDs aligned with the input order.
+    """
+    zones = _make_zones(ZONE_COUNT)
+
+    zone_ids, save_ms = _timed(lambda: repository.bulk_save_zones(zones))
+    assert None not in zone_ids
+    assert repository.get_zone_by_id(zone_ids[1234]).left_time == zones[1234].left_time
+
+    for zone, zone_id in zip(zones, zone_ids):
+        zone.id = zone_id
+        zone.status = "tested"
+        zone.test_count = 1
+
+    upserted_ids, upsert_ms = _timed(lambda: repository.bulk_upsert_zones(zones))
+    assert upserted_ids == zone_ids
+    assert repository.get_zone_by_id(zone_ids[-1]).status == "tested"
+
+    print(f"\nbulk_save_zones {ZONE_COUNT}: {save_ms:.0f}ms ({save_ms / ZONE_COUNT:.3f}ms/zone)")
+    print(f"bulk_upsert_zones {ZONE_COUNT}: {upsert_ms:.0f}ms ({upsert_ms / ZONE_COUNT:.3f}ms/zone)")
+
+    assert save_ms / ZONE_COUNT < SAVE_TARGET_MS
+    assert upsert_ms / ZONE_COUNT < SAVE_TARGET_MS
+
+
+def test_copy_history_writes(repository):
+    """
+    COPY paths for state updates and test events write every row.
+    """
+    zone_ids = repository.bulk_save_zones(_make_zones(100))
+    base_time = datetime(2025, 1, 2)
+
+    updates = [
+        ZoneStateUpdate(
+            zone_id=zone_ids[i % 100], old_status="active", new_status="tested",
+            update_time=base_time + timedelta(seconds=i), trigger_price=1.0845,
+            trigger_reason="zone_test", test_success=i % 2 == 0
+        )
+        for i in range(ZONE_COUNT)
+    ]
+    events = [
+        ZoneTestEvent(
+            zone_id=zone_ids[i % 100], test_time=base_time + timedelta(seconds=i),
+            test_price=1.0845, test_type="touch", success=i % 2 == 0,
+            reaction_strength=0.5
+        )
+        for i in range(ZONE_COUNT)
+    ]
+
+    saved_updates, updates_ms = _timed(lambda: repository.save_zone_updates(updates))
+    saved_events, events_ms = _timed(lambda: repository.save_test_events(events))
+
+    print(f"\nsave_zone_updates {ZONE_COUNT}: {updates_ms:.0f}ms")
+    print(f"save_test_events {ZONE_COUNT}: {events_ms:.0f}ms")
+
+    assert saved_updates == ZONE_COUNT
+    assert saved_events == ZONE_COUNT
+
+    history = repository.get_zone_history(zone_ids[0])
+    assert len(history) == ZONE_COUNT // 100
+    assert [update.test_success for update in history[:2]] == [True, True]
+    assert len(repository.get_test_events(zone_ids[1])) == ZONE_COUNT // 100
@@ -532,7 +532,58 @@ class TestBaseCandleDetector:
         
         with pytest.raises((ValueError, IndexError)):
             detector.detect_base_candles(empty_data)
-    
+
+    def test_vectorized_detection_matches_candle_rules(self):
+        """
+        Test vectorized detection agrees with the per-candle rules.
+
+        Success Criteria:
+        - Every detected range consists of consolidation candles only
+        - Ranges respect min/max candle limits and are scored like _validate_base_range
+        - Long consolidation runs are split at max_base_candles
+        """
+        detector = BaseCandleDetector(min_base_candles=2, max_base_candles=4)
+        data = self._create_large_dataset(300)
+        # Flatten a long stretch into a 12-candle consolidation run
+        data.loc[100:111, ['open', 'close']] = 1.08
+        data.loc[100:111, 'high'] = 1.08001
+        data.loc[100:111, 'low'] = 1.07999
+
+        ranges = detector.detect_base_candles(data)
+        atr_series = detector._calculate_atr(data)
+
+        assert [(r.start_index, r.end_index) for r in ranges if 100 <= r.start_index <= 111] == \
+            [(100, 103), (104, 107), (108, 111)]
+
+        for base_range in ranges:
+            assert 2 <= base_range.candle_count <= 4
+            for i in range(base_range.start_index, base_range.end_index + 1):
+                assert detector._is_consolidation_candle(data.iloc[i], atr_series.iloc[i])
+
+            candles = data.iloc[base_range.start_index:base_range.end_index + 1]
+            assert base_range.consolidation_score == pytest.approx(detector._validate_base_range(candles))
+            assert base_range.high == candles['high'].max()
+            assert base_range.low == candles['low'].min()
+
+    def test_atr_cache_keyed_by_content(self, detector):
+        """
+        Test ATR is recomputed for different data of the same length.
+
+        Success Criteria:
+        - Frames with equal length but different prices get their own ATR
+        - In-place edits of a cached frame are picked up
+        """
+        data = self._create_large_dataset(100)
+        wider = data.copy()
+        wider.loc[40:60, 'high'] += 0.001
+
+        atr_original = detector._calculate_atr(data)
+        atr_wider = detector._calculate_atr(wider)
+        assert atr_wider.iloc[60] > atr_original.iloc[60]
+
+        data.loc[40:60, 'high'] += 0.001
+        pd.testing.assert_series_equal(detector._calculate_atr(data), atr_wider)
+
     # Helper methods for test data creation
     def _create_large_dataset(self, size: int) -> pd.DataFrame:
         """Create large dataset for performance testing"""
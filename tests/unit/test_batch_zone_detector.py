@@ -0,0 +1,109 @@
+"""
+Unit tests for BatchZoneDetector.
+
+Tests cover:
+- Resampling higher timeframes from a base load
+- Pooled detection matching serial detect_zones calls
+- Bulk saving through the repository
+- Parameter validation
+"""
+
+import pytest
+import numpy as np
+
+from src.analysis.supply_demand.zone_detector import create_test_detector
+from src.analysis.supply_demand.batch_detector import BatchZoneDetector, resample_ohlc
+from src.analysis.supply_demand.repository import SupplyDemandRepository, ZoneQueryFilter
+
+TIMEFRAMES = ['M15', 'H1', 'H4']
+
+
+class TestBatchZoneDetector:
+    """Tests for parallel multi-symbol, multi-timeframe detection."""
+
+    def test_resample_matches_pandas(self, random_ohlcv):
+        """Test resampled bars match pandas resample, including partial buckets"""
+        df = random_ohlcv(500, 0, start='2025-01-01 00:45').drop(index=range(100, 120)).reset_index(drop=True)
+
+        for timeframe, rule in (('H1', '1h'), ('H4', '4h'), ('D1', '1D')):
+            expected = (
+                df.set_index('time')
+                .resample(rule)
+                .agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+                .dropna()
+                .reset_index()
+            )
+            resampled = resample_ohlc(df, timeframe)
+
+            assert list(resampled['time']) == list(expected['time'])
+            np.testing.assert_allclose(
+                resampled[['open', 'high', 'low', 'close', 'volume']].to_numpy(),
+                expected[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+            )
+
+        assert list(resample_ohlc(df.drop(columns='volume'), 'H1').columns) == \
+            ['open', 'high', 'low', 'close', 'time']
+
+    def test_pooled_detection_matches_serial(self, random_ohlcv, zone_key):
+        """
+        Test pooled jobs return what serial detect_zones calls return.
+
+        Success Criteria:
+        - Every (symbol, timeframe) job has a result
+        - Zones equal detect_zones on the resampled frames
+        - The pool is reused across batches
+        """
+        data = {symbol: random_ohlcv(600, seed) for seed, symbol in enumerate(['EURUSD', 'GBPUSD'])}
+
+        expected = {}
+        for symbol, df in data.items():
+            for timeframe in TIMEFRAMES:
+                frame = df if timeframe == 'M15' else resample_ohlc(df, timeframe)
+                expected[(symbol, timeframe)] = create_test_detector().detect_zones(frame, symbol, timeframe)
+
+        with BatchZoneDetector(create_test_detector(), max_workers=2) as batch_detector:
+            results = batch_detector.detect(data, TIMEFRAMES, 'M15')
+            pool = batch_detector._pool
+            assert batch_detector.detect(data, ['H1'], 'M15').keys() == {('EURUSD', 'H1'), ('GBPUSD', 'H1')}
+            assert batch_detector._pool is pool
+
+        assert results.keys() == expected.keys()
+        for key, zones in expected.items():
+            assert [zone_key(zone) for zone in results[key]] == [zone_key(zone) for zone in zones]
+
+        assert sum(len(zones) for zones in results.values()) > 0
+        assert batch_detector.stats['jobs'] == 8
+        assert batch_detector.stats['failed_jobs'] == 0
+        assert batch_detector._pool is None
+
+    def test_detect_and_save(self, tmp_path, random_ohlcv):
+        """Test detected zones are bulk-saved and get their database IDs"""
+        repository = SupplyDemandRepository(connection_string=f"sqlite:///{tmp_path / 'zones.db'}")
+        batch_detector = BatchZoneDetector(create_test_detector(), repository=repository, max_workers=1)
+
+        results = batch_detector.detect_and_save({'EURUSD': random_ohlcv(400, 3)}, ['M15', 'H1'], 'M15')
+
+        saved = results[('EURUSD', 'M15')] + results[('EURUSD', 'H1')]
+        assert saved and all(zone.id is not None for zone in saved)
+        assert batch_detector.stats['zones_saved'] == len(saved)
+        assert len(repository.query_zones(ZoneQueryFilter(symbol='EURUSD', timeframe='H1'))) == \
+            len(results[('EURUSD', 'H1')])
+        repository.close()
+
+    def test_invalid_parameters(self, random_ohlcv):
+        """Test parameter validation"""
+        with pytest.raises(TypeError):
+            BatchZoneDetector(None)
+        with pytest.raises(ValueError):
+            BatchZoneDetector(create_test_detector(), max_workers=0)
+
+        batch_detector = BatchZoneDetector(create_test_detector(), max_workers=1)
+        data = {'EURUSD': random_ohlcv(50, 0)}
+        with pytest.raises(ValueError):
+            batch_detector.detect(data, ['M5'], 'M15')
+        with pytest.raises(ValueError):
+            batch_detector.detect(data, ['W1'], 'M15')
+        with pytest.raises(ValueError):
+            batch_detector.detect_and_save(data, ['H1'], 'M15')
+        with pytest.raises(ValueError):
+            resample_ohlc(data['EURUSD'], 'M2')
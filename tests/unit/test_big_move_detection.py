@@ -588,7 +588,53 @@ class TestBigMoveDetector:
         
         big_moves_empty = detector.detect_big_moves(empty_data, base_ranges)
         assert big_moves_empty == [], "Empty data should return empty list"
-    
+
+    def test_batch_scoring_matches_single_base(self):
+        """
+        Test scoring all base ranges together matches scoring them one by one.
+
+        Success Criteria:
+        - Batch detection returns the same move for every base range
+        - Reported momentum matches _calculate_momentum_score
+        """
+        detector = BigMoveDetector(move_threshold=0.5, momentum_threshold=0.4)
+        data = self._create_large_move_dataset(500)
+        base_ranges = self._create_multiple_base_ranges(45)
+
+        batch_moves = detector.detect_big_moves(data, base_ranges)
+        single_moves = [
+            move for base_range in base_ranges
+            for move in detector.detect_big_moves(data, [base_range])
+        ]
+
+        assert len(batch_moves) > 10
+        assert batch_moves == single_moves
+
+        for move in batch_moves:
+            momentum_score = detector._calculate_momentum_score(data, move.start_index, move.end_index)
+            assert move.momentum_score == pytest.approx(momentum_score)
+            assert move.momentum_score >= detector.momentum_threshold
+
+    def test_momentum_score_formula(self, detector, sample_big_move_data):
+        """
+        Test prefix-sum momentum scoring against a direct computation.
+
+        Success Criteria:
+        - Directional consistency, body strength and persistence weighted 0.4/0.3/0.3
+        """
+        move = sample_big_move_data.iloc[4:9]
+        closes = move['close'].to_numpy()
+        changes = np.diff(closes)
+        direction = np.sign(closes[-1] - closes[0])
+
+        consistency = np.mean(changes * direction > 0)
+        body_strength = np.mean(abs(move['close'] - move['open']) / (move['high'] - move['low']))
+        persistence = min(1.0, np.mean(np.maximum(0, changes * direction)) /
+                          abs(closes[-1] - closes[0]) * len(closes))
+        expected = min(1.0, consistency * 0.4 + body_strength * 0.3 + persistence * 0.3)
+
+        assert detector._calculate_momentum_score(sample_big_move_data, 4, 8) == pytest.approx(expected)
+
     # Helper methods for test data creation
     def _create_large_move_dataset(self, size: int) -> pd.DataFrame:
         """Create large dataset for performance testing"""
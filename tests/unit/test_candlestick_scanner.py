@@ -0,0 +1,134 @@
+"""
+Unit tests for CandlestickPatternScanner.
+
+Tests cover:
+- Pattern flags and reliability for known candles
+- Incremental extension matching a full scan
+- ConfluenceEngine lookups backed by the scanner
+- Pattern array sharing with EnhancedSignalGenerator
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analysis.candlestick_scanner import CandlestickPatternScanner, PATTERN_TYPES
+from src.analysis.confluence_engine import ConfluenceEngine
+from src.strategy.enhanced_signal_generator import EnhancedSignalGenerator
+
+
+def _random_ohlc(n_bars: int, seed: int = 7) -> pd.DataFrame:
+    """Generate random OHLC data with some zero-body candles."""
+    rng = np.random.default_rng(seed)
+    opens = np.round(1.0 + np.cumsum(rng.normal(0, 0.001, n_bars)), 4)
+    closes = np.round(opens + rng.normal(0, 0.0005, n_bars), 4)
+    closes[::9] = opens[::9]
+    highs = np.maximum(opens, closes) + np.round(np.abs(rng.normal(0, 0.0005, n_bars)), 4)
+    lows = np.minimum(opens, closes) - np.round(np.abs(rng.normal(0, 0.0005, n_bars)), 4)
+    return pd.DataFrame(
+        {'open': opens, 'high': highs, 'low': lows, 'close': closes},
+        index=pd.date_range('2025-01-01', periods=n_bars, freq='1min')
+    )
+
+
+class TestCandlestickPatternScanner:
+    """Tests for vectorized candlestick pattern scanning."""
+
+    @pytest.fixture
+    def pattern_data(self):
+        """
+        Hand-built candles with one known pattern each.
+
+        Bar 2: hammer, Bar 4: bullish engulfing, Bar 5: doji, Bar 6: bearish pin bar
+        """
+        return pd.DataFrame({
+            'open':  [1.1000, 1.1010, 1.1000, 1.1010, 1.0995, 1.1020, 1.1020],
+            'high':  [1.1015, 1.1015, 1.1004, 1.1012, 1.1025, 1.1030, 1.1060],
+            'low':   [1.0995, 1.1000, 1.0980, 1.0998, 1.0990, 1.1010, 1.1015],
+            'close': [1.1010, 1.1005, 1.1003, 1.1000, 1.1020, 1.1020, 1.1022],
+        }, index=pd.date_range('2025-01-01 10:00', periods=7, freq='1min'))
+
+    def test_known_patterns(self, pattern_data):
+        """Test flags for hand-built pattern candles"""
+        scanner = CandlestickPatternScanner()
+        scanner.update(pattern_data)
+
+        assert len(scanner) == len(pattern_data)
+        assert scanner.flags('hammer')[2]
+        assert scanner.flags('bullish_engulfing')[4]
+        assert scanner.flags('doji')[5]
+        assert scanner.flags('bearish_pin_bar')[6]
+
+        # First bar never has an engulfing pattern (no previous bar)
+        assert not scanner.flags('bullish_engulfing')[0]
+        assert not scanner.flags('bearish_engulfing')[0]
+
+        hammer_reliability = scanner.reliability('hammer')[2]
+        assert 0.0 < hammer_reliability <= 1.0
+
+    def test_patterns_at_detection_order(self, pattern_data):
+        """Test per-bar lookup returns patterns in detection order"""
+        scanner = CandlestickPatternScanner()
+        scanner.update(pattern_data)
+
+        for index in range(len(pattern_data)):
+            names = [name for name, _ in scanner.patterns_at(index)]
+            assert names == [name for name in PATTERN_TYPES if name in names]
+
+        assert scanner.patterns_at(len(pattern_data)) == []
+
+    def test_incremental_matches_full_scan(self):
+        """Test appending bars one at a time matches a single full scan"""
+        df = _random_ohlc(500)
+
+        full = CandlestickPatternScanner()
+        full.update(df)
+
+        incremental = CandlestickPatternScanner(initial_capacity=8)
+        for end in range(1, len(df) + 1):
+            incremental.update(df.iloc[:end])
+
+        for pattern_type in PATTERN_TYPES:
+            np.testing.assert_array_equal(
+                full.reliability(pattern_type), incremental.reliability(pattern_type)
+            )
+
+    def test_rescan_on_different_dataset(self):
+        """Test a different dataset of the same length triggers a rescan"""
+        first = _random_ohlc(200, seed=1)
+        second = _random_ohlc(200, seed=2)
+        second.index = first.index
+
+        scanner = CandlestickPatternScanner()
+        scanner.update(first)
+        scanner.update(second)
+
+        reference = CandlestickPatternScanner()
+        reference.update(second)
+
+        for pattern_type in PATTERN_TYPES:
+            np.testing.assert_array_equal(
+                scanner.reliability(pattern_type), reference.reliability(pattern_type)
+            )
+
+    def test_engine_lookup_uses_scanner(self):
+        """Test ConfluenceEngine patterns match scanner arrays"""
+        df = _random_ohlc(300)
+        engine = ConfluenceEngine()
+
+        for index in range(2, len(df)):
+            patterns = engine.detect_candlestick_patterns(df, index)
+            expected = engine.pattern_scanner.patterns_at(index)
+
+            assert [(p.pattern_type, p.reliability) for p in patterns] == expected
+            for pattern in patterns:
+                assert pattern.timestamp == df.index[index]
+                assert pattern.price == df['close'].iloc[index]
+
+    def test_signal_generator_shares_engine(self):
+        """Test signal generator reuses the provided engine's pattern arrays"""
+        engine = ConfluenceEngine()
+        generator = EnhancedSignalGenerator(confluence_engine=engine)
+
+        assert generator.confluence_engine is engine
+        assert generator.confluence_engine.pattern_scanner is engine.pattern_scanner
@@ -0,0 +1,84 @@
+"""
+Unit tests for ConfluenceEngine zone clustering.
+
+Tests cover:
+- Price-proximity grouping with the confluence distance tolerance
+- Deterministic output regardless of factor order
+- Unpriced factors and minimum factor count handling
+"""
+
+import random
+
+import pytest
+import pandas as pd
+
+from src.analysis.confluence_engine import (
+    ConfluenceEngine, ConfluenceFactor, ConfluenceFactorType
+)
+
+
+def _factor(price, factor_type=ConfluenceFactorType.FIBONACCI, timestamp=None):
+    """Build a confluence factor at a price."""
+    return ConfluenceFactor(
+        factor_type=factor_type,
+        value=price,
+        weight=1.0,
+        confidence=0.5,
+        price_level=price,
+        timestamp=timestamp
+    )
+
+
+class TestConfluenceZoneClustering:
+    """Tests for sort-and-sweep confluence zone clustering."""
+
+    @pytest.fixture
+    def engine(self):
+        """Engine with a 1% grouping tolerance"""
+        return ConfluenceEngine(confluence_distance=0.01, min_factors=2)
+
+    def test_groups_nearby_factors(self, engine):
+        """Test factors within tolerance of the cluster start are grouped"""
+        factors = [_factor(1.1050), _factor(1.1000), _factor(1.2000), _factor(1.1090), _factor(1.2050)]
+
+        zones = engine.calculate_confluence_zones(factors, 'EURUSD', 'M1')
+
+        assert [len(zone.factors) for zone in zones] == [3, 2]
+        assert [f.price_level for f in zones[0].factors] == [1.1000, 1.1050, 1.1090]
+        assert zones[0].price_level == pytest.approx((1.1000 + 1.1050 + 1.1090) / 3)
+        assert zones[1].symbol == 'EURUSD' and zones[1].timeframe == 'M1'
+
+    def test_order_independent(self, engine):
+        """Test shuffled factor lists produce identical zones"""
+        rng = random.Random(5)
+        factors = [_factor(round(rng.uniform(1.0, 1.5), 4)) for _ in range(400)]
+
+        expected = engine.calculate_confluence_zones(factors, 'EURUSD', 'M1')
+        for _ in range(5):
+            shuffled = factors[:]
+            rng.shuffle(shuffled)
+            zones = engine.calculate_confluence_zones(shuffled, 'EURUSD', 'M1')
+
+            assert [(z.price_level, z.total_score) for z in zones] == \
+                [(z.price_level, z.total_score) for z in expected]
+
+        # Every priced factor lands in exactly one cluster
+        clustered = sum(len(cluster) for cluster in engine._cluster_by_price(factors))
+        assert clustered == len(factors)
+
+    def test_unpriced_factors_and_min_factors(self, engine):
+        """Test unpriced factors are ignored and small clusters dropped"""
+        timestamp = pd.Timestamp('2025-01-01 10:00')
+        factors = [
+            ConfluenceFactor(factor_type=ConfluenceFactorType.VOLUME, value=2.0),
+            _factor(1.1000, timestamp=timestamp),
+            _factor(1.1001, ConfluenceFactorType.CANDLESTICK, timestamp),
+            _factor(1.3000),
+        ]
+
+        zones = engine.calculate_confluence_zones(factors, 'EURUSD', 'M1')
+
+        assert len(zones) == 1
+        assert zones[0].total_score == 2
+        assert zones[0].timestamp == timestamp
+        assert engine.calculate_confluence_zones([], 'EURUSD', 'M1') == []
@@ -0,0 +1,200 @@
+"""
+Unit tests for bounded confluence history retention.
+
+Tests cover:
+- Ring-buffer window and batched spilling of evicted entries
+- Queries across spilled and in-memory entries
+- ConfluenceEngine and FibonacciStrategy history bounds
+- Parquet spill store round trip and range reads
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analysis.confluence_history import BoundedHistory, HistorySpillStore, ParquetSpillStore
+from src.analysis.confluence_engine import ConfluenceEngine
+from src.strategy.fibonacci_strategy import FibonacciStrategy
+
+
+class ListSpillStore(HistorySpillStore):
+    """In-memory spill store recording each written batch."""
+
+    def __init__(self):
+        self.batches = {}
+
+    def write(self, kind, records):
+        self.batches.setdefault(kind, []).append(list(records))
+        return True
+
+    def read(self, kind, start=None, end=None):
+        records = [record for batch in self.batches.get(kind, []) for record in batch]
+        return [
+            record for record in records
+            if (start is None or pd.Timestamp(record['timestamp']) >= start)
+            and (end is None or pd.Timestamp(record['timestamp']) <= end)
+        ]
+
+
+def _record(minute: int) -> dict:
+    """Serialized history record at a minute offset."""
+    timestamp = pd.Timestamp('2025-01-01 10:00') + pd.Timedelta(minutes=minute)
+    return {'timestamp': timestamp.isoformat(), 'value': minute}
+
+
+class TestBoundedHistory:
+    """Tests for ring-buffer retention with spill-to-disk."""
+
+    def test_window_and_batched_spill(self):
+        """Test only the window stays in memory and evictions spill in batches"""
+        store = ListSpillStore()
+        history = BoundedHistory('zones', max_items=10, spill_store=store, spill_batch_size=4)
+
+        history.extend(_record(minute) for minute in range(25))
+
+        assert len(history) == 10
+        assert [entry['value'] for entry in history] == list(range(15, 25))
+        assert history[-1]['value'] == 24
+        assert [entry['value'] for entry in history[-2:]] == [23, 24]
+
+        # 15 evicted: three full batches spilled, three pending
+        assert [len(batch) for batch in store.batches['zones']] == [4, 4, 4]
+        history.flush()
+        assert history.total_spilled == 15
+
+    def test_query_across_disk_and_memory(self):
+        """Test queries merge spilled and in-memory entries in order"""
+        store = ListSpillStore()
+        history = BoundedHistory('zones', max_items=5, spill_store=store, spill_batch_size=3)
+        for minute in range(20):
+            history.append(_record(minute))
+
+        assert [r['value'] for r in history.query()] == list(range(20))
+        assert [r['value'] for r in history.query(limit=3)] == [17, 18, 19]
+
+        start = pd.Timestamp('2025-01-01 10:05')
+        end = pd.Timestamp('2025-01-01 10:16')
+        assert [r['value'] for r in history.query(start, end)] == list(range(5, 17))
+
+    def test_drops_without_store(self):
+        """Test evicted entries are dropped when no store is configured"""
+        history = BoundedHistory('patterns', max_items=3)
+        history.extend(_record(minute) for minute in range(7))
+
+        assert len(history) == 3
+        assert history.total_dropped == 4
+        assert [r['value'] for r in history.query()] == [4, 5, 6]
+
+    def test_invalid_window(self):
+        """Test non-positive window sizes are rejected"""
+        with pytest.raises(ValueError):
+            BoundedHistory('zones', max_items=0)
+
+    def test_engine_history_bounded(self):
+        """Test ConfluenceEngine keeps a bounded window and spills the rest"""
+        rng = np.random.default_rng(3)
+        n_bars = 200
+        opens = 1.0 + np.cumsum(rng.normal(0, 0.001, n_bars))
+        closes = opens + rng.normal(0, 0.0005, n_bars)
+        df = pd.DataFrame({
+            'open': opens,
+            'high': np.maximum(opens, closes) + 0.0004,
+            'low': np.minimum(opens, closes) - 0.0004,
+            'close': closes,
+            'volume': rng.integers(100, 1000, n_bars).astype(float)
+        }, index=pd.date_range('2025-01-01', periods=n_bars, freq='1min'))
+
+        store = ListSpillStore()
+        engine = ConfluenceEngine(history_window=5, spill_store=store)
+        for index in range(2, n_bars):
+            engine.process_bar(df, index, [], [], symbol='EURUSD', timeframe='M1')
+        engine.flush_history()
+
+        assert len(engine.candlestick_patterns) == 5
+        patterns = engine.query_history('candlestick_patterns')
+        assert len(patterns) == engine.candlestick_patterns.total_spilled + len(engine.candlestick_patterns)
+        assert len(patterns) > 5
+
+        with pytest.raises(ValueError):
+            engine.query_history('unknown')
+
+    def test_strategy_history_bounded(self):
+        """Test FibonacciStrategy confluence copies respect the window"""
+        strategy = FibonacciStrategy(history_window=50)
+
+        assert strategy.confluence_zones.max_items == 50
+        assert strategy.confluence_engine.candlestick_patterns.max_items == 50
+        assert strategy.query_confluence_history('candlestick_patterns') == []
+
+
+class TestParquetSpillStore:
+    """Tests for the Parquet spill backend."""
+
+    def test_round_trip(self, tmp_path):
+        """Test spilled batches read back in order with timestamp filtering"""
+        pytest.importorskip('pyarrow')
+        store = ParquetSpillStore(tmp_path)
+
+        store.write('zones', [_record(minute) for minute in range(5)])
+        store.write('zones', [_record(minute) for minute in range(5, 8)])
+
+        assert [r['value'] for r in store.read('zones')] == list(range(8))
+        start = pd.Timestamp('2025-01-01 10:03')
+        assert [r['value'] for r in store.read('zones', start=start)] == list(range(3, 8))
+        assert store.read('patterns') == []
+
+    def test_range_reads_skip_files(self, tmp_path, monkeypatch):
+        """Test range reads only load spill files overlapping the range"""
+        pytest.importorskip('pyarrow')
+        store = ParquetSpillStore(tmp_path)
+        for first in range(0, 50, 10):
+            store.write('zones', [_record(minute) for minute in range(first, first + 10)])
+
+        loaded = []
+        read_parquet = pd.read_parquet
+
+        def recording_read_parquet(path, **kwargs):
+            loaded.append((path.name, kwargs.get('columns')))
+            return read_parquet(path, **kwargs)
+
+        monkeypatch.setattr(pd, 'read_parquet', recording_read_parquet)
+
+        start = pd.Timestamp('2025-01-01 10:15')
+        end = pd.Timestamp('2025-01-01 10:24')
+        assert [r['value'] for r in store.read('zones', start, end)] == list(range(15, 25))
+        assert loaded == [('zones_00000001.parquet', ['record']), ('zones_00000002.parquet', ['record'])]
+
+        # A new store indexes existing files once
+        reopened = ParquetSpillStore(tmp_path)
+        assert [r['value'] for r in reopened.read('zones', end=pd.Timestamp('2025-01-01 10:02'))] == [0, 1, 2]
+        loaded.clear()
+        assert [r['value'] for r in reopened.read('zones', start=pd.Timestamp('2025-01-01 10:48'))] == [48, 49]
+        assert loaded == [('zones_00000004.parquet', ['record'])]
+
+    def test_write_after_numbering_gap(self, tmp_path):
+        """Test a new store continues after the highest existing sequence"""
+        pytest.importorskip('pyarrow')
+        store = ParquetSpillStore(tmp_path)
+        for minute in range(4):
+            store.write('zones', [_record(minute)])
+        (tmp_path / 'zones_00000002.parquet').unlink()
+
+        reopened = ParquetSpillStore(tmp_path)
+        reopened.write('zones', [_record(4)])
+
+        assert sorted(path.name for path in tmp_path.glob('zones_*.parquet')) == [
+            'zones_00000000.parquet', 'zones_00000001.parquet',
+            'zones_00000003.parquet', 'zones_00000004.parquet'
+        ]
+        assert [r['value'] for r in reopened.read('zones')] == [0, 1, 3, 4]
+
+    def test_spill_store_is_abstract(self):
+        """Test spill backends must implement write and read"""
+        class WriteOnlyStore(HistorySpillStore):
+            def write(self, kind, records):
+                return True
+
+        with pytest.raises(TypeError):
+            HistorySpillStore()
+        with pytest.raises(TypeError):
+            WriteOnlyStore()
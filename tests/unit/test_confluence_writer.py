@@ -0,0 +1,141 @@
+"""
+Unit tests for ConfluenceWriter.
+
+Tests cover:
+- Batched persistence of engine output into the confluence tables (SQLite)
+- Zone/factor relationship rows
+- Parameter and connection validation
+- Bad bars, dead writer processes and unreachable databases not stopping the strategy
+"""
+
+import sqlite3
+
+import pytest
+import pandas as pd
+
+from src.analysis.confluence_engine import ConfluenceEngine
+from src.analysis.confluence_writer import ConfluenceWriter, _BatchSink
+from src.strategy.backtesting_engine import BacktestingEngine
+
+
+def _process_bars(engine: ConfluenceEngine, df: pd.DataFrame, start: int, end: int):
+    """Run the engine over bars [start, end) with Fibonacci levels near the close."""
+    total_factors = 0
+    total_zones = 0
+    for index in range(start, end):
+        price = df['close'].iloc[index]
+        fibonacci_levels = [
+            {'level': level, 'price': price * (1 + 0.0002 * k)}
+            for k, level in enumerate([0.382, 0.5, 0.618])
+        ]
+        results = engine.process_bar(df, index, fibonacci_levels, [], 'EURUSD', 'M1')
+        total_factors += results['total_factors']
+        total_zones += len(results['confluence_zones'])
+    return total_factors, total_zones
+
+
+class TestConfluenceWriter:
+    """Tests for write-behind confluence persistence."""
+
+    def test_engine_output_persisted(self, tmp_path, random_ohlcv):
+        """Test every factor, zone and zone/factor link reaches the database"""
+        df = random_ohlcv(200, 3, freq='1min').set_index('time')
+        db_path = tmp_path / 'confluence.db'
+
+        with ConfluenceWriter(f'sqlite:///{db_path}', batch_size=50) as writer:
+            engine = ConfluenceEngine(confluence_distance=0.001, writer=writer)
+            total_factors, total_zones = _process_bars(engine, df, 2, len(df))
+
+            assert writer.flush()
+            assert writer.stats['errors'] == 0
+            assert writer.stats['batches_sent'] > 1
+
+        connection = sqlite3.connect(db_path)
+        count = lambda table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        assert count('confluence_factors') == total_factors
+        assert count('confluence_zones') == total_zones
+        assert total_zones > 0
+
+        # Links join zones to factors from the same bar
+        linked_factors = connection.execute("""
+            SELECT SUM(total_factors) FROM confluence_zones
+        """).fetchone()[0]
+        same_bar_links = connection.execute("""
+            SELECT COUNT(*) FROM confluence_zone_factors l
+            JOIN confluence_zones z ON z.id = l.zone_id
+            JOIN confluence_factors f ON f.id = l.factor_id
+            WHERE z.timestamp = f.timestamp AND z.symbol = 'EURUSD'
+        """).fetchone()[0]
+        assert count('confluence_zone_factors') == linked_factors == same_bar_links
+
+        first = connection.execute(
+            "SELECT timestamp FROM confluence_factors ORDER BY timestamp LIMIT 1"
+        ).fetchone()[0]
+        assert pd.Timestamp(first) == df.index[2]
+
+    def test_invalid_parameters(self):
+        """Test invalid configuration is rejected"""
+        with pytest.raises(ValueError):
+            ConfluenceWriter('mysql://localhost/db')
+        with pytest.raises(ValueError):
+            ConfluenceWriter('sqlite:///confluence.db', batch_size=0)
+        with pytest.raises(ValueError):
+            ConfluenceWriter('sqlite:///confluence.db', flush_interval=0)
+
+    def test_connection_failure(self, tmp_path):
+        """Test an unreachable database raises ConnectionError on start"""
+        writer = ConfluenceWriter(f'sqlite:///{tmp_path}/missing/confluence.db')
+
+        with pytest.raises(ConnectionError):
+            writer.start()
+        assert not writer.running
+
+    def test_bad_bar_does_not_stop_writer(self, tmp_path):
+        """Test a bar that cannot be converted fails its batch only"""
+        sink = _BatchSink(f'sqlite:///{tmp_path / "confluence.db"}', 'sqlite', 100)
+        sink.connect()
+
+        bar_time = pd.Timestamp('2025-01-01').value
+        sink.write_batch([('EURUSD', 'M1', bar_time, None, [('malformed',)], [])])
+        sink.write_batch([('EURUSD', 'M1', bar_time, None, [('fibonacci', 1.1, 1.0, 0.5, '', 1.1, None)], [])])
+        sink.close()
+
+        assert sink.stats['errors'] == 1
+        assert sink.stats['factors_written'] == 1
+
+    def test_dead_writer_surfaced_not_restarted(self, tmp_path, random_ohlcv):
+        """Test bars after the writer process died are dropped and counted"""
+        df = random_ohlcv(120, 3, freq='1min').set_index('time')
+        writer = ConfluenceWriter(f'sqlite:///{tmp_path / "confluence.db"}', batch_size=1, max_queue_size=1)
+        engine = ConfluenceEngine(confluence_distance=0.001, writer=writer)
+
+        _process_bars(engine, df, 2, 40)
+        assert writer.flush()
+        process = writer._process
+        process.kill()
+        process.join()
+
+        total_factors, _ = _process_bars(engine, df, 40, len(df))
+
+        assert total_factors > 0
+        assert writer.failed and not writer.running
+        assert writer._process is process
+        assert writer.stats['writer_failures'] == 1
+        assert writer.stats['bars_dropped'] > 0
+        assert not writer.flush(timeout=1.0)
+        writer.close()
+
+    def test_unreachable_database_does_not_abort_bars(self, tmp_path, random_ohlcv):
+        """Test a backtest keeps processing bars when its writer cannot connect"""
+        df = random_ohlcv(60, 3, freq='1min').set_index('time')
+        writer = ConfluenceWriter(f'sqlite:///{tmp_path}/missing/confluence.db')
+        backtest = BacktestingEngine(confluence_writer=writer)
+        assert backtest.strategy.confluence_engine.writer is writer
+
+        total_factors, _ = _process_bars(backtest.strategy.confluence_engine, df, 2, len(df))
+
+        assert total_factors > 0
+        assert writer.failed
+        assert writer.stats['writer_failures'] == 1
+        assert writer.stats['bars_dropped'] > 0
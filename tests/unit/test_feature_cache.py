@@ -0,0 +1,160 @@
+"""
+Unit tests for FeatureCache.
+
+Tests cover:
+- ATR and true range matching the reference pandas formulas
+- Prefix-sum window means matching pandas mean()
+- Incremental extension matching a full computation
+- Change detection for modified datasets
+- Cache sharing across analysis components
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analysis.feature_cache import FeatureCache
+from src.analysis.confluence_engine import ConfluenceEngine
+from src.analysis.supply_demand.base_candle_detector import BaseCandleDetector
+from src.analysis.supply_demand.big_move_detector import BigMoveDetector
+from src.analysis.supply_demand.zone_detector import SupplyDemandZoneDetector
+
+
+def _reference_atr(df: pd.DataFrame, period: int) -> pd.Series:
+    """Reference ATR: EMA of true range with cumulative-mean warmup."""
+    high_low = df['high'] - df['low']
+    high_close_prev = np.abs(df['high'] - df['close'].shift(1))
+    low_close_prev = np.abs(df['low'] - df['close'].shift(1))
+    true_range = np.maximum(high_low, np.maximum(high_close_prev, low_close_prev))
+    true_range.iloc[0] = high_low.iloc[0]
+
+    atr = true_range.ewm(span=period, adjust=False).mean()
+    for i in range(1, min(period, len(atr))):
+        atr.iloc[i] = true_range.iloc[:i + 1].mean()
+    return np.maximum(atr, 0.00001)
+
+
+class TestFeatureCache:
+    """Tests for the shared rolling-feature cache."""
+
+    @pytest.fixture
+    def data(self, random_ohlcv):
+        """Random OHLCV dataset with occasional missing volume"""
+        df = random_ohlcv(600, 11)
+        df.loc[::37, 'volume'] = np.nan
+        return df
+
+    @pytest.mark.parametrize("period", [3, 14, 50])
+    def test_atr_matches_reference(self, data, period):
+        """Test ATR equals the reference formula exactly"""
+        cache = FeatureCache()
+        cache.update(data)
+
+        np.testing.assert_array_equal(cache.atr(period), _reference_atr(data, period).values)
+
+    def test_window_mean_matches_pandas(self, data):
+        """Test prefix-sum window means equal pandas mean() (NaN skipped)"""
+        cache = FeatureCache()
+        cache.update(data)
+
+        for start in range(0, len(data), 23):
+            for end in range(start + 1, len(data) + 1, 31):
+                expected = data['volume'].iloc[start:end].mean()
+                actual = cache.window_mean('volume', start, end)
+                assert actual == pytest.approx(expected, rel=1e-12, nan_ok=True)
+
+        # Empty window behaves like pandas mean() of nothing
+        assert np.isnan(cache.window_mean('volume', 10, 10))
+
+    def test_incremental_matches_full(self, data):
+        """Test appending bars one at a time matches a full computation"""
+        full = FeatureCache()
+        full.update(data)
+
+        incremental = FeatureCache(initial_capacity=4)
+        incremental.atr(14)
+        for end in range(1, len(data) + 1):
+            incremental.update(data.iloc[:end])
+
+        np.testing.assert_array_equal(incremental.atr(14), full.atr(14))
+        np.testing.assert_array_equal(incremental.true_range, full.true_range)
+        np.testing.assert_allclose(
+            incremental.rolling_mean('volume', 20), full.rolling_mean('volume', 20), rtol=1e-12
+        )
+
+    def test_modified_dataset_recomputed(self, data):
+        """Test a same-length dataset with different values triggers a recompute"""
+        cache = FeatureCache()
+        cache.update(data)
+        generation = cache.generation
+
+        modified = data.copy()
+        modified['volume'] = 1000.0
+        cache.update(modified)
+
+        assert cache.generation == generation + 1
+        assert cache.window_mean('volume', 0, 20) == 1000.0
+
+    def test_last_bar_revised_in_place(self, data):
+        """Test a forming bar revised in place on the cached frame is picked up"""
+        cache = FeatureCache()
+        cache.update(data)
+        cache.atr(14)
+        generation = cache.generation
+
+        data.loc[len(data) - 1, 'volume'] = 5000.0
+        data.loc[len(data) - 1, 'high'] += 0.01
+        cache.update(data)
+
+        reference = FeatureCache()
+        reference.update(data.copy())
+        assert cache.generation == generation
+        assert cache.window_mean('volume', len(data) - 5, len(data)) == \
+            reference.window_mean('volume', len(data) - 5, len(data))
+        np.testing.assert_array_equal(cache.atr(14), reference.atr(14))
+
+    def test_close_change_windows(self, data):
+        """Test gain/loss window sums and counts of close-to-close changes"""
+        cache = FeatureCache()
+        cache.update(data)
+
+        changes = data['close'].diff()
+        starts = np.array([0, 1, 50, 300])
+        ends = np.array([10, 120, 51, 600])
+        for start, end, gain_sum, gain_count, loss_count in zip(
+            starts, ends,
+            cache.window_sums('close_gain', starts, ends),
+            cache.window_counts('close_gain', starts, ends),
+            cache.window_counts('close_loss', starts, ends)
+        ):
+            window = changes.iloc[start:end]
+            assert gain_sum == pytest.approx(window[window > 0].sum())
+            assert gain_count == (window > 0).sum()
+            assert loss_count == (window < 0).sum()
+
+    def test_body_range_ratio(self):
+        """Test candle body/range features"""
+        df = pd.DataFrame({
+            'open':  [1.0, 1.0],
+            'high':  [1.2, 1.0],
+            'low':   [0.9, 1.0],
+            'close': [1.1, 1.0],
+        })
+        cache = FeatureCache()
+        cache.update(df)
+
+        assert cache.body[0] == pytest.approx(0.1)
+        assert cache.candle_range[0] == pytest.approx(0.3)
+        assert cache.body_range_ratio[0] == pytest.approx(1 / 3)
+        assert np.isnan(cache.body_range_ratio[1])  # Zero range
+
+    def test_components_share_cache(self):
+        """Test analysis components read from one cache per dataset"""
+        engine = ConfluenceEngine()
+        assert engine.pattern_scanner.features is engine.features
+
+        base_detector = BaseCandleDetector()
+        move_detector = BigMoveDetector()
+        zone_detector = SupplyDemandZoneDetector(base_detector, move_detector)
+        assert zone_detector.feature_cache is base_detector.feature_cache
+        assert move_detector.feature_cache is base_detector.feature_cache
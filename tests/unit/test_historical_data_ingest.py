@@ -0,0 +1,162 @@
+"""
+Unit tests for DatabaseManager.store_historical_data bulk ingest.
+
+Tests cover:
+- Chunked writes with progress reporting
+- Stored values round-tripping through get_historical_data
+- Missing volume and timezone-aware indexes
+- Parameter validation
+- Idempotent upserts and the duplicate bar migration
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from sqlalchemy import text
+
+from src.data.database import DatabaseManager, HistoricalData, HISTORICAL_UNIQUE_INDEX, LEGACY_HISTORICAL_INDEXES
+
+
+def _ohlcv(n_bars: int, freq: str = '1min') -> pd.DataFrame:
+    """Random M1 OHLCV bars indexed by timestamp."""
+    rng = np.random.default_rng(0)
+    opens = 1.1 + np.cumsum(rng.normal(0, 1e-4, n_bars))
+    closes = opens + rng.normal(0, 1e-4, n_bars)
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) + 1e-4,
+        'low': np.minimum(opens, closes) - 1e-4,
+        'close': closes,
+        'volume': rng.integers(1, 1000, n_bars).astype(float)
+    }, index=pd.date_range('2024-01-01', periods=n_bars, freq=freq))
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'trading_bot.db'}")
+    assert manager.connect()
+    yield manager
+    manager.disconnect()
+
+
+class TestHistoricalDataIngest:
+    """Tests for chunked columnar historical data ingest."""
+
+    def test_chunked_ingest_with_progress(self, db_manager):
+        """
+        Test rows are written in chunks and read back unchanged.
+
+        Success Criteria:
+        - The progress callback sees every committed chunk
+        - Every row is stored with its timestamp and prices
+        - Bulk-load pragmas are restored afterwards
+        """
+        data = _ohlcv(2500)
+        progress = []
+
+        assert db_manager.store_historical_data(
+            'EURUSD', 'M1', data, chunk_size=1000,
+            progress_callback=lambda stored, total: progress.append((stored, total))
+        )
+
+        assert progress == [(1000, 2500), (2000, 2500), (2500, 2500)]
+
+        stored = db_manager.get_historical_data('EURUSD', 'M1')
+        assert list(stored.index) == list(data.index)
+        np.testing.assert_array_equal(stored.to_numpy(), data.to_numpy())
+
+        with db_manager.engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 2
+            assert connection.execute(text(
+                "SELECT COUNT(*) FROM historical_data WHERE created_at IS NULL"
+            )).scalar() == 0
+
+    def test_missing_volume_and_timezone_aware_index(self, db_manager):
+        """Test volume defaults to 0 and timezone-aware timestamps keep their wall time"""
+        data = _ohlcv(10, freq='1h').drop(columns='volume')
+        data.index = data.index.tz_localize('Europe/Warsaw')
+
+        assert db_manager.store_historical_data('GBPUSD', 'H1', data)
+
+        stored = db_manager.get_historical_data('GBPUSD', 'H1')
+        assert list(stored.index) == list(data.index.tz_localize(None))
+        assert (stored['volume'] == 0).all()
+
+    def test_empty_data_and_invalid_parameters(self, db_manager):
+        """Test empty input and parameter validation"""
+        progress = []
+        assert db_manager.store_historical_data(
+            'EURUSD', 'M1', _ohlcv(0), progress_callback=lambda *args: progress.append(args)
+        )
+        assert progress == []
+
+        with pytest.raises(ValueError):
+            db_manager.store_historical_data('EURUSD', 'M1', _ohlcv(10), chunk_size=0)
+
+        assert not db_manager.store_historical_data('EURUSD', 'M1', _ohlcv(10).drop(columns='close'))
+
+    def test_reimport_is_idempotent_and_updates_changed_bars(self, db_manager):
+        """
+        Test importing the same bars again upserts instead of duplicating.
+
+        Success Criteria:
+        - Re-importing leaves one row per (symbol, timeframe, timestamp)
+        - Changed bars get the new prices, unchanged bars keep their rows
+        - A bar listed twice in one import stores its last copy
+        """
+        data = _ohlcv(1000)
+        assert db_manager.store_historical_data('EURUSD', 'M1', data, chunk_size=300)
+        assert db_manager.store_historical_data('EURUSD', 'M1', data, chunk_size=300)
+
+        revised = data.iloc[900:].copy()
+        revised['close'] += 0.01
+        revised = pd.concat([revised, revised.iloc[[-1]].assign(volume=5.0)])
+        assert db_manager.store_historical_data('EURUSD', 'M1', revised)
+
+        with db_manager.engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM historical_data")).scalar() == 1000
+
+        stored = db_manager.get_historical_data('EURUSD', 'M1')
+        assert list(stored.index) == list(data.index)
+        np.testing.assert_array_equal(stored['close'].to_numpy()[:900], data['close'].to_numpy()[:900])
+        np.testing.assert_array_equal(stored['close'].to_numpy()[900:], revised['close'].to_numpy()[:100])
+        assert stored['volume'].iloc[-1] == 5.0
+
+    def test_deduplicate_legacy_table(self, db_manager):
+        """Test the migration removes duplicate bars and adds the unique index"""
+        data = _ohlcv(100)
+        with db_manager.engine.begin() as connection:
+            connection.exec_driver_sql(f"DROP INDEX {HISTORICAL_UNIQUE_INDEX}")
+            for index_name in LEGACY_HISTORICAL_INDEXES:
+                column = index_name.rsplit('_', 1)[-1]
+                connection.exec_driver_sql(f"CREATE INDEX {index_name} ON historical_data ({column})")
+
+        # Legacy tables can't be upserted into
+        assert not db_manager.store_historical_data('EURUSD', 'M1', data)
+
+        with db_manager.engine.begin() as connection:
+            for close_offset in (0.0, 0.5):
+                connection.execute(HistoricalData.__table__.insert(), [
+                    {'symbol': 'EURUSD', 'timeframe': 'M1', 'timestamp': timestamp.to_pydatetime(),
+                     'open': 1, 'high': 2, 'low': 0, 'close': 1 + close_offset, 'volume': 0}
+                    for timestamp in data.index[:40]
+                ])
+
+        assert db_manager.deduplicate_historical_data(dry_run=True) == \
+            {'duplicate_bars': 40, 'deleted_rows': 0, 'index_created': 0}
+        assert db_manager.deduplicate_historical_data() == \
+            {'duplicate_bars': 40, 'deleted_rows': 40, 'index_created': 1}
+        assert db_manager.deduplicate_historical_data() == \
+            {'duplicate_bars': 0, 'deleted_rows': 0, 'index_created': 0}
+
+        stored = db_manager.get_historical_data('EURUSD', 'M1')
+        assert len(stored) == 40
+        assert (stored['close'] == 1.5).all()
+
+        with db_manager.engine.connect() as connection:
+            indexes = {row[1] for row in connection.exec_driver_sql("PRAGMA index_list(historical_data)")}
+        assert HISTORICAL_UNIQUE_INDEX in indexes
+        assert not indexes & set(LEGACY_HISTORICAL_INDEXES)
+
+        assert db_manager.store_historical_data('EURUSD', 'M1', data)
+        assert len(db_manager.get_historical_data('EURUSD', 'M1')) == 100
@@ -705,6 +705,152 @@ class TestSupplyDemandConfluence:
         with pytest.raises((ValueError, AssertionError)):
             SupplyDemandConfluence(min_zone_strength=1.5)  # Above 1.0
     
+    def test_nearby_zones_match_linear_scan(self, confluence_system):
+        """
+        Test indexed nearby-zone lookups against a scan of every cached zone.
+        
+        Success Criteria:
+        - Same zones as checking the proximity of every zone
+        - Zones of other symbols are never returned
+        - Results stay sorted by proximity score
+        """
+        zones = self._create_large_zone_dataset(60)
+        other_symbol = self._create_large_zone_dataset(10)
+        for zone in other_symbol:
+            zone.id += 1000
+            zone.symbol = "GBPUSD"
+        confluence_system.update_zone_cache(zones + other_symbol)
+        
+        timeframes = ["M1", "M5", "H1"]
+        for price in [1.0700, 1.0770, 1.0805, 1.0952, 1.1234, 1.1500]:
+            for max_distance in [0, 5, 20, 50]:
+                nearby = confluence_system.get_nearby_zones(
+                    price, "EURUSD", timeframes, max_distance_pips=max_distance
+                )
+                
+                expected = set()
+                for zone in zones:
+                    if confluence_system._should_cache_zone(zone):
+                        proximity = confluence_system.calculate_zone_proximity(zone, price)
+                        if proximity.is_inside_zone or proximity.distance_pips <= max_distance:
+                            expected.add(zone.id)
+                
+                assert {p.zone_id for p in nearby} == expected
+                scores = [p.proximity_score for p in nearby]
+                assert scores == sorted(scores, reverse=True)
+        
+        assert confluence_system._find_zone_by_id(1003).symbol == "GBPUSD"
+        assert confluence_system._find_zone_by_id(9999) is None
+    
+    def test_single_timeframe_string_accepted(self, confluence_system, sample_supply_zones):
+        """
+        Test that a bare timeframe string is treated as one timeframe.
+        """
+        confluence_system.update_zone_cache(sample_supply_zones)
+        
+        by_string = confluence_system.get_nearby_zones(1.0840, "EURUSD", "M1")
+        by_list = confluence_system.get_nearby_zones(1.0840, "EURUSD", ["M1"])
+        
+        assert [p.zone_id for p in by_string] == [p.zone_id for p in by_list] == [1]
+    
+    def test_zone_upsert_and_remove_match_rebuild(self, confluence_system, sample_supply_zones, sample_demand_zones):
+        """
+        Test incremental cache maintenance against a full cache rebuild.
+        
+        Success Criteria:
+        - Upserted, moved and removed zones give the same results as a rebuild
+        - Test history scores refresh when a zone is upserted again
+        - Zones that stop qualifying are dropped on upsert
+        """
+        zones = sample_supply_zones + sample_demand_zones
+        for zone in zones:
+            assert confluence_system.upsert_zone(zone)
+        
+        # Zone 1 fails its next test and moves up 5 pips
+        zones[0].test_count += 1
+        zones[0].top_price += 0.0005
+        zones[0].bottom_price += 0.0005
+        assert confluence_system.upsert_zone(zones[0])
+        
+        assert confluence_system.remove_zone(zones[3])
+        assert not confluence_system.remove_zone(zones[3])
+        
+        broken = zones[1]
+        broken.status = "broken"
+        assert not confluence_system.upsert_zone(broken)
+        assert confluence_system._find_zone_by_id(2) is None
+        
+        rebuilt = SupplyDemandConfluence()
+        rebuilt.update_zone_cache(zones[:3])
+        
+        for price in [1.0800, 1.0815, 1.0838, 1.0852]:
+            incremental = confluence_system.get_confluence_factors(price, "EURUSD", ["M1", "M5", "H1"])
+            expected = rebuilt.get_confluence_factors(price, "EURUSD", ["M1", "M5", "H1"])
+            
+            for zone_type in ("supply_zones", "demand_zones"):
+                assert [z['zone_id'] for z in incremental[zone_type]] == [z['zone_id'] for z in expected[zone_type]]
+                assert [z['test_history_score'] for z in incremental[zone_type]] == [z['test_history_score'] for z in expected[zone_type]]
+        
+        score = confluence_system.calculate_confluence_score(1.0845, "EURUSD", ["M1"])
+        assert score.zone_id == 1
+        assert score.zone_boundaries == (zones[0].top_price, zones[0].bottom_price)
+        assert score.test_history_score == pytest.approx(2 / 3)
+    
+    def test_zones_expire_individually(self, confluence_system, sample_supply_zones):
+        """
+        Test per-zone expiry at max_zone_age_hours.
+        
+        Success Criteria:
+        - Each zone expires when its own age limit passes
+        - Re-upserted zones expire by their new creation time
+        """
+        zone_a, zone_b = sample_supply_zones  # 12 and 24 hours old
+        confluence_system.update_zone_cache([zone_a, zone_b])
+        now = datetime.now()
+        
+        assert confluence_system.expire_zones(now + timedelta(hours=143)) == 0
+        assert confluence_system.expire_zones(now + timedelta(hours=145)) == 1
+        assert confluence_system._find_zone_by_id(2) is None
+        assert confluence_system._find_zone_by_id(1) is not None
+        
+        zone_a.created_at = now
+        confluence_system.upsert_zone(zone_a)
+        assert confluence_system.expire_zones(now + timedelta(hours=157)) == 0
+        assert confluence_system.expire_zones(now + timedelta(hours=169)) == 1
+        assert confluence_system._get_zones_for_timeframe("EURUSD", "M1") == []
+    
+    def test_confluence_matrix_matches_per_price_scores(self, confluence_system, monkeypatch):
+        """
+        Test batched multi-timeframe scoring against per-price scoring.
+        
+        Success Criteria:
+        - Returns a prices x timeframes matrix
+        - Every cell matches get_multi_timeframe_confluence
+        - Results do not depend on the chunk size
+        """
+        from src.analysis.supply_demand import confluence_integration
+        
+        confluence_system.update_zone_cache(self._create_large_zone_dataset(60))
+        
+        prices = np.linspace(1.0700, 1.1500, 57)
+        timeframes = ["M1", "M5", "H1", "D1"]
+        matrix = confluence_system.get_multi_timeframe_confluence_matrix(prices, "EURUSD", timeframes)
+        
+        assert matrix.shape == (len(prices), len(timeframes))
+        assert np.all(matrix[:, 3] == 0.0)  # No D1 zones cached
+        assert matrix.max() > 0.0
+        
+        for row, price in zip(matrix, prices):
+            expected = confluence_system.get_multi_timeframe_confluence(price, "EURUSD", timeframes)
+            assert row == pytest.approx([expected[tf] for tf in timeframes], abs=1e-6)
+        
+        monkeypatch.setattr(confluence_integration, "MAX_SCORING_CELLS", 3)
+        chunked = confluence_system.get_multi_timeframe_confluence_matrix(prices, "EURUSD", timeframes)
+        assert chunked == pytest.approx(matrix, abs=1e-6)
+        
+        empty = confluence_system.get_multi_timeframe_confluence_matrix([], "EURUSD", timeframes)
+        assert empty.shape == (0, len(timeframes))
+    
     # Helper methods for test data creation
     def _create_large_zone_dataset(self, count: int) -> List[SupplyDemandZone]:
         """Create large dataset of zones for performance testing"""
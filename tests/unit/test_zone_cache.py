@@ -0,0 +1,154 @@
+"""
+Unit tests for ZoneSetCache.
+
+Tests cover:
+- Zone sets matching detect_zones on the cached window
+- Serving repeated requests without recomputation
+- Incremental refresh on new and revised bars
+- Window rebuilds and parameter validation
+"""
+
+import pytest
+import pandas as pd
+
+from src.analysis.supply_demand.zone_detector import create_test_detector
+from src.analysis.supply_demand.zone_cache import ZoneSetCache
+
+
+class _BarTable:
+    """In-memory stand-in for historical_data; `visible` bars have arrived."""
+
+    def __init__(self, bars: pd.DataFrame, visible: int):
+        self.bars = bars
+        self.visible = visible
+        self.calls = []
+
+    def load_bars(self, since, limit):
+        self.calls.append((since, limit))
+        bars = self.bars.iloc[:self.visible]
+        if since is not None:
+            bars = bars[bars['time'] >= since]
+        return bars.iloc[-limit:].reset_index(drop=True)
+
+
+def _expected(table: _BarTable, lookback: int):
+    """Zones detected on the last lookback bars, strongest first like the cache."""
+    window = table.bars.iloc[:table.visible].iloc[-lookback:].reset_index(drop=True)
+    zones = create_test_detector().detect_zones(window, 'EURUSD', 'M15')
+    return sorted(zones, key=lambda zone: zone.strength_score, reverse=True)
+
+
+class TestZoneSetCache:
+    """Tests for cached, incrementally refreshed zone sets."""
+
+    def test_repeated_requests_served_from_cache(self, random_ohlcv, zone_key):
+        """
+        Test polls without new bars return the cached zone set.
+
+        Success Criteria:
+        - First request detects zones on the last lookback_bars bars
+        - Later requests only query bars since the last cached bar
+        - No detection work is done while no bars arrive
+        """
+        table = _BarTable(random_ohlcv(800, 0), visible=800)
+        cache = ZoneSetCache(create_test_detector, lookback_bars=500, max_bars=1000)
+
+        zones = cache.get_zones('EURUSD', 'M15', table.load_bars)
+
+        assert zones
+        assert [zone_key(z) for z in zones] == [zone_key(z) for z in _expected(table, 500)]
+        assert [zone.strength_score for zone in zones] == \
+            sorted((zone.strength_score for zone in zones), reverse=True)
+        assert table.calls == [(None, 500)]
+        assert cache.bar_count('EURUSD', 'M15') == 500
+
+        for _ in range(3):
+            assert cache.get_zones('EURUSD', 'M15', table.load_bars) is zones
+
+        assert table.calls[-1] == (table.bars['time'].iloc[-1].to_pydatetime(), 1000)
+        assert cache.stats['hits'] == 3
+        assert cache.stats['rebuilds'] == 1
+        assert cache.stats['refreshes'] == 0
+        assert cache.stats['bars_processed'] == 500
+
+    def test_incremental_refresh_on_new_bars(self, random_ohlcv, zone_key):
+        """Test new and revised bars update the zone set incrementally"""
+        bars = random_ohlcv(900, 1)
+        table = _BarTable(bars.copy(), visible=500)
+        cache = ZoneSetCache(create_test_detector, lookback_bars=500, max_bars=1000)
+        cache.get_zones('EURUSD', 'M15', table.load_bars)
+
+        for visible in (520, 600, 750):
+            table.visible = visible
+            zones = cache.get_zones('EURUSD', 'M15', table.load_bars)
+            assert [zone_key(z) for z in zones] == [zone_key(z) for z in _expected(table, visible)]
+
+        assert cache.stats['refreshes'] == 3
+        assert cache.stats['rebuilds'] == 1
+        assert cache.stats['bars_processed'] == 750
+        assert cache.bar_count('EURUSD', 'M15') == 750
+
+        # Forming candle revised in place
+        table.bars.loc[749, 'high'] += 0.01
+        table.bars.loc[749, 'close'] += 0.009
+        zones = cache.get_zones('EURUSD', 'M15', table.load_bars)
+
+        assert cache.stats['refreshes'] == 4
+        assert cache.bar_count('EURUSD', 'M15') == 750
+        assert [zone_key(z) for z in zones] == [zone_key(z) for z in _expected(table, 750)]
+
+    def test_window_rebuilt_past_max_bars(self, random_ohlcv, zone_key):
+        """Test the window is cut back to lookback_bars once it grows past max_bars"""
+        table = _BarTable(random_ohlcv(900, 2), visible=300)
+        cache = ZoneSetCache(create_test_detector, lookback_bars=300, max_bars=500)
+        cache.get_zones('EURUSD', 'M15', table.load_bars)
+
+        table.visible = 450
+        cache.get_zones('EURUSD', 'M15', table.load_bars)
+        assert cache.stats['rebuilds'] == 1
+
+        table.visible = 600
+        zones = cache.get_zones('EURUSD', 'M15', table.load_bars)
+        assert cache.stats['rebuilds'] == 2
+        assert cache.bar_count('EURUSD', 'M15') == 300
+        assert [zone_key(z) for z in zones] == [zone_key(z) for z in _expected(table, 300)]
+
+        # A refresh returning max_bars bars may have a gap; start a new window
+        table.visible = 900
+        zones = cache.get_zones('EURUSD', 'M15', table.load_bars)
+        assert cache.stats['rebuilds'] == 3
+        assert [zone_key(z) for z in zones] == [zone_key(z) for z in _expected(table, 300)]
+
+    def test_no_data_and_invalidate(self, random_ohlcv):
+        """Test symbols without bars and dropping cached zone sets"""
+        table = _BarTable(random_ohlcv(400, 3), visible=0)
+        cache = ZoneSetCache(create_test_detector, lookback_bars=300, max_bars=500)
+
+        assert cache.get_zones('EURUSD', 'M15', table.load_bars) == []
+        assert cache.bar_count('EURUSD', 'M15') == 0
+
+        table.visible = 400
+        assert cache.get_zones('EURUSD', 'M15', table.load_bars)
+        cache.get_zones('EURUSD', 'H1', table.load_bars)
+
+        cache.invalidate(timeframe='M15')
+        assert cache.bar_count('EURUSD', 'M15') == 0
+        assert cache.bar_count('EURUSD', 'H1') == 300
+
+        cache.invalidate()
+        assert cache.bar_count('EURUSD', 'H1') == 0
+
+    def test_invalid_parameters(self, random_ohlcv):
+        """Test parameter validation and failed detection dropping the entry"""
+        with pytest.raises(ValueError):
+            ZoneSetCache(create_test_detector, lookback_bars=0)
+        with pytest.raises(ValueError):
+            ZoneSetCache(create_test_detector, lookback_bars=500, max_bars=100)
+
+        bars = random_ohlcv(100, 4)
+        bars.loc[50, 'high'] = bars.loc[50, 'low'] - 0.01
+        cache = ZoneSetCache(create_test_detector, lookback_bars=100, max_bars=200)
+
+        with pytest.raises(ValueError):
+            cache.get_zones('EURUSD', 'M15', _BarTable(bars, visible=100).load_bars)
+        assert cache.bar_count('EURUSD', 'M15') == 0
@@ -565,6 +565,73 @@ class TestSupplyDemandZoneDetector:
                 overlap = self._calculate_zone_overlap(zone1, zone2)
                 assert overlap <= zone_detector.overlap_tolerance, \
                     f"Zones {i} and {j} overlap too much: {overlap:.3f} > {zone_detector.overlap_tolerance}"
+
+    def test_overlap_resolution_keeps_strongest(self, zone_detector):
+        """
+        Test overlap resolution prefers stronger zones.
+
+        Success Criteria:
+        - Zones overlapping a stronger kept zone are dropped
+        - Result does not depend on zone order
+        - Kept zones never overlap beyond tolerance
+        """
+        zones = [
+            self._make_zone(1.0810, 1.0800, 0.5),
+            self._make_zone(1.0815, 1.0805, 0.9),   # Overlaps first
+            self._make_zone(1.0822, 1.0812, 0.6),   # Overlaps second only
+            self._make_zone(1.0850, 1.0840, 0.4),   # Separate
+            self._make_zone(1.0841, 1.0839, 0.3),   # Mostly inside the separate zone
+        ]
+
+        resolved = zone_detector._resolve_overlapping_zones(zones)
+        assert [zone.strength_score for zone in resolved] == [0.9, 0.4]
+
+        rng = np.random.default_rng(11)
+        for _ in range(5):
+            shuffled = [zones[i] for i in rng.permutation(len(zones))]
+            resolved = zone_detector._resolve_overlapping_zones(shuffled)
+            assert sorted(zone.strength_score for zone in resolved) == [0.4, 0.9]
+
+        # Many random zones: no remaining pair overlaps beyond tolerance
+        bottoms = rng.uniform(1.0, 1.1, 2000)
+        random_zones = [
+            self._make_zone(bottom + height, bottom, strength)
+            for bottom, height, strength in zip(
+                bottoms, rng.uniform(0.0001, 0.002, 2000), rng.uniform(0, 1, 2000)
+            )
+        ]
+        resolved = zone_detector._resolve_overlapping_zones(random_zones)
+        resolved.sort(key=lambda zone: zone.bottom_price)
+        for i, zone1 in enumerate(resolved):
+            for zone2 in resolved[i + 1:]:
+                if zone2.bottom_price >= zone1.top_price:
+                    break
+                assert self._calculate_zone_overlap(zone1, zone2) <= zone_detector.overlap_tolerance
+
+    def test_overlap_chain_keeps_unrelated_ends(self, zone_detector):
+        """Test a chain A-B-C keeps A and C when only B overlaps both"""
+        zones = [
+            self._make_zone(1.0810, 1.0800, 0.9),   # A
+            self._make_zone(1.0815, 1.0805, 0.5),   # B overlaps A and C
+            self._make_zone(1.0820, 1.0810, 0.7),   # C touches A without overlap
+        ]
+        assert self._calculate_zone_overlap(zones[0], zones[2]) == 0.0
+
+        resolved = zone_detector._resolve_overlapping_zones(zones)
+
+        pairwise = self._resolve_pairwise(zones, zone_detector.overlap_tolerance)
+        assert len(resolved) == len(pairwise) == 2
+        assert [zone.strength_score for zone in resolved] == [0.9, 0.7]
+
+    def test_zone_count_limit_keeps_strongest(self, zone_detector):
+        """Test zone limit keeps the strongest zones in descending strength"""
+        zone_detector.max_zones_per_timeframe = 3
+        zones = [self._make_zone(1.08 + i * 0.01, 1.075 + i * 0.01, strength)
+                 for i, strength in enumerate([0.2, 0.9, 0.5, 0.7, 0.1])]
+
+        limited = zone_detector._limit_zone_count(zones)
+
+        assert [zone.strength_score for zone in limited] == [0.9, 0.7, 0.5]
     
     def test_multiple_zones_detection(self, zone_detector):
         """
@@ -787,6 +854,28 @@ class TestSupplyDemandZoneDetector:
         assert isinstance(zones_without_fractals, list)
     
     # Helper methods
+    def _make_zone(self, top_price: float, bottom_price: float, strength_score: float) -> SupplyDemandZone:
+        """Create a zone with the given boundaries and strength"""
+        return SupplyDemandZone(
+            id=None, symbol='EURUSD', timeframe='M1', zone_type='demand',
+            top_price=top_price, bottom_price=bottom_price,
+            left_time=datetime(2025, 1, 1, 10, 0), right_time=datetime(2025, 1, 1, 10, 4),
+            strength_score=strength_score, test_count=0, success_count=0, status='active',
+            base_range=None, big_move=None, atr_at_creation=0.0010, volume_at_creation=1500,
+            created_at=datetime(2025, 1, 1, 10, 0), updated_at=datetime(2025, 1, 1, 10, 0)
+        )
+
+    def _resolve_pairwise(self, zones: List[SupplyDemandZone], tolerance: float) -> List[SupplyDemandZone]:
+        """Per-pair overlap resolution: each zone replaces the kept zones it overlaps if stronger"""
+        resolved_zones = []
+        for zone in zones:
+            overlapping = [other for other in resolved_zones
+                           if self._calculate_zone_overlap(zone, other) > tolerance]
+            for other in overlapping:
+                resolved_zones.remove(other)
+            resolved_zones.append(max([zone] + overlapping, key=lambda z: z.strength_score))
+        return resolved_zones
+
     def _calculate_zone_overlap(self, zone1: SupplyDemandZone, zone2: SupplyDemandZone) -> float:
         """Calculate overlap percentage between two zones"""
         # Calculate price overlap
@@ -0,0 +1,260 @@
+"""
+Unit tests for ZoneHistoryWriter.
+
+Tests cover:
+- Write-behind persistence of ZoneStateManager history
+- Coalescing of zone snapshots
+- Backpressure, retries and metrics
+- Lookups while a write is stalled or in progress
+- Parameter validation
+"""
+
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pytest
+
+from src.analysis.supply_demand.zone_history_writer import ZoneHistoryWriter
+from src.analysis.supply_demand.zone_state_manager import (
+    ZoneStateManager,
+    ZoneStateUpdate,
+    ZoneTestEvent,
+    HistoryRetentionPolicy
+)
+from src.analysis.supply_demand.zone_detector import SupplyDemandZone
+from src.analysis.supply_demand.base_candle_detector import BaseCandleRange
+from src.analysis.supply_demand.big_move_detector import BigMove
+
+
+class RecordingBulkRepository:
+    """In-memory stand-in for the SupplyDemandRepository bulk methods"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+        self.stalled = threading.Event()  # A write is waiting on the gate
+        self.zone_batches: List[List[SupplyDemandZone]] = []
+        self.updates: List[ZoneStateUpdate] = []
+        self.events: List[ZoneTestEvent] = []
+        self.write_calls = 0
+
+    def bulk_upsert_zones(self, zones: List[SupplyDemandZone]) -> List[Optional[int]]:
+        self._wait_for_gate()
+        self.write_calls += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.zone_batches.append(list(zones))
+        return [zone.id for zone in zones]
+
+    def save_zone_updates(self, updates: List[ZoneStateUpdate]) -> int:
+        self._wait_for_gate()
+        self.write_calls += 1
+        if self.fail:
+            return 0
+        self.updates.extend(updates)
+        return len(updates)
+
+    def save_test_events(self, events: List[ZoneTestEvent]) -> int:
+        self._wait_for_gate()
+        self.write_calls += 1
+        if self.fail:
+            return 0
+        self.events.extend(events)
+        return len(events)
+
+    def _wait_for_gate(self) -> None:
+        if not self.gate.is_set():
+            self.stalled.set()
+        self.gate.wait()
+
+    def get_zone_history(self, zone_id: int) -> List[ZoneStateUpdate]:
+        return [update for update in self.updates if update.zone_id == zone_id]
+
+    def get_test_events(self, zone_id: int) -> List[ZoneTestEvent]:
+        return [event for event in self.events if event.zone_id == zone_id]
+
+
+def _make_zone(zone_id: int, status: str = "active") -> SupplyDemandZone:
+    start = datetime(2025, 1, 1, 10, 0)
+    return SupplyDemandZone(
+        id=zone_id, symbol="EURUSD", timeframe="M1", zone_type="supply",
+        top_price=1.0850, bottom_price=1.0830,
+        left_time=start, right_time=start + timedelta(minutes=5),
+        strength_score=0.8, test_count=0, success_count=0, status=status,
+        base_range=BaseCandleRange(0, 4, start, start + timedelta(minutes=4),
+                                   1.0850, 1.0830, 0.0010, 5, 0.8),
+        big_move=BigMove(5, 8, start + timedelta(minutes=5), start + timedelta(minutes=8),
+                         "bearish", 3.0, 0.8, 1.0830, True),
+        atr_at_creation=0.0010, volume_at_creation=2000.0,
+        created_at=start, updated_at=start
+    )
+
+
+def _make_update(zone_id: int, minute: int) -> ZoneStateUpdate:
+    return ZoneStateUpdate(
+        zone_id=zone_id, old_status="active", new_status="tested",
+        update_time=datetime(2025, 1, 2) + timedelta(minutes=minute),
+        trigger_price=1.0845, trigger_reason="zone_test", test_success=True
+    )
+
+
+class TestZoneHistoryWriter:
+    """Tests for write-behind zone history persistence."""
+
+    def test_manager_history_written_behind(self):
+        """
+        Test ZoneStateManager history reaches the repository through the writer.
+
+        Success Criteria:
+        - Manager saves return without waiting for the repository
+        - Every update and event is written once close() returns
+        - Repeated snapshots of a zone are written once, latest state wins
+        """
+        repository = RecordingBulkRepository()
+        zone = _make_zone(1)
+
+        with ZoneHistoryWriter(repository, batch_size=4, flush_interval=60.0) as writer:
+            manager = ZoneStateManager(
+                repository=writer,
+                history_retention=HistoryRetentionPolicy(max_entries_per_zone=1, flush_batch_size=1)
+            )
+
+            # Stall the repository so history is both being written and queued
+            repository.gate.clear()
+            for minute in range(10):
+                update = _make_update(zone.id, minute)
+                manager._record_history(manager._update_history, [update], manager._pending_updates)
+                manager._record_history(
+                    manager._event_history,
+                    [ZoneTestEvent(zone.id, update.update_time, 1.0845, 'touch', True, 0.7)],
+                    manager._pending_events
+                )
+
+            assert repository.stalled.wait(5.0)
+            for status in ("tested", "broken", "flipped"):
+                zone.status = status
+                assert writer.update_zone(zone)
+            zone.status = "expired"
+
+            # History visible whether queued, being written or written, without
+            # waiting for the stalled repository
+            assert len(manager.get_zone_history(zone.id)) == 10
+            assert len(writer.get_test_events(zone.id)) == 9
+            repository.gate.set()
+
+        assert len(repository.updates) == 9
+        assert len(repository.events) == 9
+        assert [u.update_time for u in repository.updates] == \
+            [_make_update(zone.id, minute).update_time for minute in range(9)]
+
+        written = [z for batch in repository.zone_batches for z in batch]
+        assert [z.status for z in written] == ["flipped"]
+        assert writer.stats['zones_coalesced'] == 2
+        assert writer.queue_depth == 0
+        assert not writer.running
+
+    def test_backpressure_and_metrics(self):
+        """
+        Test a full queue blocks submissions until the flusher catches up.
+
+        Success Criteria:
+        - Submissions time out while the repository is stalled and the queue is full
+        - Queue depth and flush latency are reported
+        """
+        repository = RecordingBulkRepository()
+        repository.gate.clear()
+
+        with ZoneHistoryWriter(repository, batch_size=2, flush_interval=0.01, max_queue_size=4) as writer:
+            for minute in range(4):
+                assert writer.save_zone_update(_make_update(1, minute), timeout=1.0)
+
+            assert writer.queue_depth == 4
+            assert not writer.save_zone_update(_make_update(1, 4), timeout=0.05)
+            assert writer.stats['rejected'] == 1
+
+            repository.gate.set()
+            assert writer.save_zone_update(_make_update(1, 5), timeout=5.0)
+            assert writer.flush()
+
+            metrics = writer.metrics()
+            assert metrics['queue_depth'] == 0
+            assert metrics['max_queue_depth'] == 4
+            assert metrics['flushes'] >= 1
+            assert metrics['max_flush_ms'] >= metrics['avg_flush_ms'] > 0
+
+        assert [u.update_time.minute for u in repository.updates] == [0, 1, 2, 3, 5]
+
+    def test_lookup_during_write_counts_records_once(self):
+        """Test records committed while their write has not returned are not listed twice"""
+        repository = RecordingBulkRepository()
+        committed = threading.Event()
+        release = threading.Event()
+
+        def stored(update):
+            # Read back rounded to the DECIMAL(12, 6) column
+            return replace(update, trigger_price=round(update.trigger_price, 6))
+
+        def save_then_stall(updates):
+            repository.updates.extend(stored(update) for update in updates)
+            committed.set()
+            release.wait()
+            return len(updates)
+
+        repository.save_zone_updates = save_then_stall
+        updates = [replace(_make_update(1, minute), trigger_price=1.08451234567) for minute in range(4)]
+
+        with ZoneHistoryWriter(repository, batch_size=3, flush_interval=60.0) as writer:
+            # Same values as the first queued update: a separate record
+            repository.updates.append(stored(updates[0]))
+            for update in updates[:3]:
+                assert writer.save_zone_update(update)
+            assert committed.wait(5.0)
+            assert writer.save_zone_update(updates[3])
+
+            history = writer.get_zone_history(1)
+            release.set()
+
+        assert [u.update_time.minute for u in history] == [0, 0, 1, 2, 3]
+
+    def test_failed_batches_retried_then_dropped(self):
+        """
+        Test failed writes are retried and dropped after max_retries.
+
+        Success Criteria:
+        - Records are written once the repository recovers
+        - Records are dropped and counted when it does not
+        """
+        repository = RecordingBulkRepository(fail=True)
+        writer = ZoneHistoryWriter(repository, batch_size=1, flush_interval=0.01, max_retries=50)
+        writer.start()
+
+        assert writer.save_test_event(ZoneTestEvent(1, datetime(2025, 1, 2), 1.0845, 'touch', True, 0.7))
+        assert not writer.flush(timeout=0.1)
+        assert writer.stats['retries'] > 0
+
+        repository.fail = False
+        assert writer.flush()
+        assert len(repository.events) == 1
+        writer.close()
+
+        repository.fail = True
+        writer.max_retries = 0
+        assert writer.update_zone(_make_zone(2))
+        assert writer.flush()
+        assert writer.stats['dropped'] == 1
+        assert not writer.update_zone(_make_zone(None))
+
+    def test_invalid_parameters(self):
+        """Test parameter validation"""
+        repository = RecordingBulkRepository()
+        with pytest.raises(ValueError):
+            ZoneHistoryWriter(repository, batch_size=0)
+        with pytest.raises(ValueError):
+            ZoneHistoryWriter(repository, flush_interval=0)
+        with pytest.raises(ValueError):
+            ZoneHistoryWriter(repository, batch_size=10, max_queue_size=5)
+        with pytest.raises(ValueError):
+            ZoneHistoryWriter(repository, max_retries=-1)
@@ -0,0 +1,98 @@
+"""
+Unit tests for IncrementalZonePipeline.
+
+Tests cover:
+- Zones matching a full re-detection after every appended bar
+- Add/update/remove events reproducing the zone set
+- Revised last bar (copied or in place) and dataset changes
+"""
+
+import pytest
+import pandas as pd
+
+from src.analysis.supply_demand.zone_detector import create_test_detector
+from src.analysis.supply_demand.zone_pipeline import IncrementalZonePipeline, ZoneEvent
+
+
+def _full_detection(df, max_zones=100):
+    """Zones from a fresh full detection."""
+    detector = create_test_detector()
+    detector.max_zones_per_timeframe = max_zones
+    return detector.detect_zones(df, 'EURUSD', 'M1')
+
+
+class TestIncrementalZonePipeline:
+    """Tests for streaming zone detection."""
+
+    @pytest.mark.parametrize("seed, max_zones", [(0, 100), (1, 5)])
+    def test_matches_full_detection(self, seed, max_zones, random_ohlcv, zone_key):
+        """Test zones and events match a full re-detection after each bar"""
+        df = random_ohlcv(400, seed, freq='1min')
+        detector = create_test_detector()
+        detector.max_zones_per_timeframe = max_zones
+        pipeline = IncrementalZonePipeline(detector, 'EURUSD', 'M1')
+
+        tracked = {}
+        event_types = set()
+        for n_bars in range(1, len(df) + 1):
+            events = pipeline.update(df.iloc[:n_bars])
+
+            for event in events:
+                assert isinstance(event, ZoneEvent) and event.bar_index == n_bars - 1
+                event_types.add(event.event_type)
+                key = event.zone.base_range.start_index
+                if event.event_type == 'removed':
+                    del tracked[key]
+                else:
+                    tracked[key] = event.zone
+
+            if n_bars % 10 == 0 or n_bars == len(df):
+                expected = _full_detection(df.iloc[:n_bars], max_zones)
+                assert [zone_key(z) for z in pipeline.zones] == [zone_key(z) for z in expected]
+                assert sorted(tracked) == sorted(z.base_range.start_index for z in expected)
+
+        assert len(pipeline.zones) > 0
+        assert {'added', 'removed'} <= event_types
+
+    def test_revised_last_bar_and_new_dataset(self, random_ohlcv, zone_key):
+        """Test a forming last bar and a switch to different data"""
+        df = random_ohlcv(250, 5, freq='1min')
+        pipeline = IncrementalZonePipeline(create_test_detector(), 'EURUSD', 'M1')
+
+        for n_bars in range(1, len(df) + 1, 3):
+            forming = df.iloc[:n_bars].copy()
+            forming.iloc[-1, forming.columns.get_loc('close')] = forming['open'].iloc[-1]
+            pipeline.update(forming)
+            pipeline.update(df.iloc[:n_bars])
+
+        expected = _full_detection(df.iloc[:pipeline.bar_count])
+        assert [zone_key(z) for z in pipeline.zones] == [zone_key(z) for z in expected]
+
+        other = random_ohlcv(200, 9, freq='1min')
+        pipeline.update(other)
+        assert [zone_key(z) for z in pipeline.zones] == \
+            [zone_key(z) for z in _full_detection(other)]
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_last_bar_revised_in_place(self, seed, random_ohlcv, zone_key):
+        """Test a forming bar revised in place on the same frame matches a full re-detection"""
+        df = random_ohlcv(300, seed, freq='1min')
+        pipeline = IncrementalZonePipeline(create_test_detector(), 'EURUSD', 'M1')
+        pipeline.update(df)
+
+        df.loc[len(df) - 1, 'high'] += 0.003
+        df.loc[len(df) - 1, 'close'] += 0.0025
+        pipeline.update(df)
+
+        expected = _full_detection(df.copy())
+        assert [zone_key(z) for z in pipeline.zones] == [zone_key(z) for z in expected]
+
+    def test_invalid_input(self):
+        """Test invalid detector and data are rejected"""
+        with pytest.raises(TypeError):
+            IncrementalZonePipeline(None, 'EURUSD', 'M1')
+
+        pipeline = IncrementalZonePipeline(create_test_detector(), 'EURUSD', 'M1')
+        assert pipeline.update(pd.DataFrame()) == []
+        with pytest.raises(ValueError):
+            pipeline.update(pd.DataFrame({'open': [1.0], 'close': [1.0]}))
@@ -155,6 +155,34 @@ except ImportError:
             return {'test_count': 0, 'success_count': 0, 'success_rate': 0.0}
 
 
+class RecordingHistoryRepository:
+    """In-memory stand-in for the SupplyDemandRepository history methods"""
+    
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.save_calls = 0
+        self.updates: List[ZoneStateUpdate] = []
+        self.events: List[ZoneTestEvent] = []
+    
+    def save_zone_update(self, update: ZoneStateUpdate) -> bool:
+        self.save_calls += 1
+        if not self.fail:
+            self.updates.append(update)
+        return not self.fail
+    
+    def save_test_event(self, event: ZoneTestEvent) -> bool:
+        self.save_calls += 1
+        if not self.fail:
+            self.events.append(event)
+        return not self.fail
+    
+    def get_zone_history(self, zone_id: int) -> List[ZoneStateUpdate]:
+        return [update for update in self.updates if update.zone_id == zone_id]
+    
+    def get_test_events(self, zone_id: int) -> List[ZoneTestEvent]:
+        return [event for event in self.events if event.zone_id == zone_id]
+
+
 class TestZoneStateManager:
     """
     Comprehensive unit tests for ZoneStateManager class.
@@ -648,6 +676,237 @@ class TestZoneStateManager:
         updates_empty = state_manager.update_zone_states(zones, empty_data, current_time)
         assert isinstance(updates_empty, list)
     
+    def test_penetration_uses_deepest_and_last_candle(self, state_manager, sample_supply_zone, sample_demand_zone):
+        """
+        Test zone penetration summary across all candles.
+        
+        Success Criteria:
+        - Deepest penetration decides a break even if price later retreats
+        - Trigger price comes from the last candle entering the zone
+        - Zones price never reached produce no update
+        """
+        price_data = pd.DataFrame({
+            'open': [1.0825, 1.0832, 1.0828, 1.0826, 1.0824],
+            'high': [1.0828, 1.0842, 1.0829, 1.0831, 1.0826],  # 60% into supply, then a touch
+            'low': [1.0822, 1.0830, 1.0824, 1.0823, 1.0821],
+            'close': [1.0826, 1.0834, 1.0826, 1.0825, 1.0822],
+            'volume': [1500, 1800, 2200, 1900, 1600],
+            'time': pd.date_range('2025-01-01 12:00', periods=5, freq='1min')
+        })
+        
+        sample_demand_zone.bottom_price = 1.0780
+        sample_demand_zone.top_price = 1.0800
+        zones = [sample_supply_zone, sample_demand_zone]
+        updates = state_manager.update_zone_states(zones, price_data, datetime(2025, 1, 1, 12, 5))
+        
+        assert len(updates) == 1
+        assert updates[0].zone_id == sample_supply_zone.id
+        assert updates[0].new_status == 'broken'
+        assert updates[0].trigger_reason == 'price_break'
+        assert updates[0].trigger_price == 1.0831
+    
+    def test_chunked_interactions_match_single_pass(self, state_manager, monkeypatch):
+        """
+        Test zone test classification is independent of the chunk size.
+        
+        Success Criteria:
+        - One event per zone/candle interaction, ordered by zone then candle
+        - Identical events when zones are processed in small chunks
+        - Test type follows the candle penetration of the zone
+        """
+        from src.analysis.supply_demand import zone_state_manager as module
+        
+        zones = self._create_large_zone_dataset(12)
+        price_data = self._create_large_price_dataset(200)
+        current_time = datetime(2025, 1, 1, 14, 0)
+        
+        events = ZoneStateManager().detect_zone_tests(zones, price_data, current_time)
+        monkeypatch.setattr(module, 'MAX_INTERACTION_CELLS', 7)
+        chunked_events = state_manager.detect_zone_tests(zones, price_data, current_time)
+        
+        assert len(events) > 0
+        assert [event.to_dict() for event in chunked_events] == [event.to_dict() for event in events]
+        
+        expected = []
+        for zone in zones:
+            for _, candle in price_data.iterrows():
+                price = candle['high'] if zone.zone_type == 'supply' else candle['low']
+                if zone.zone_type == 'supply' and price >= zone.bottom_price:
+                    penetration = 1.0 if price >= zone.top_price else (price - zone.bottom_price) / zone.height
+                elif zone.zone_type == 'demand' and price <= zone.top_price:
+                    penetration = 1.0 if price <= zone.bottom_price else (zone.top_price - price) / zone.height
+                else:
+                    continue
+                expected.append((zone.id, candle['time'], price, penetration))
+        
+        assert [(e.zone_id, e.test_time, e.test_price) for e in events] == [x[:3] for x in expected]
+        for event, (_, _, _, penetration) in zip(events, expected):
+            if penetration == 1.0:
+                assert event.test_type == 'break'
+                assert event.success is False
+            else:
+                assert event.test_type == ('penetration' if penetration > 0.1 else 'touch')
+            assert 0.0 <= event.reaction_strength <= 1.0
+    
+    def test_incremental_updates_consume_new_bars_only(self, state_manager, sample_supply_zone):
+        """
+        Test watermark-based incremental zone updates.
+        
+        Success Criteria:
+        - Each bar is analyzed once; repeating an update reports nothing new
+        - A rolling window gives the same updates as the full history
+        - Running max penetration survives bars leaving the window
+        - Resetting tracking re-analyzes the whole window
+        """
+        price_data = pd.DataFrame({
+            'open': [1.0820, 1.0825, 1.0834, 1.0828, 1.0826, 1.0831],
+            'high': [1.0824, 1.0828, 1.0837, 1.0829, 1.0827, 1.0833],  # 35%, then a 15% touch
+            'low': [1.0818, 1.0822, 1.0826, 1.0824, 1.0822, 1.0825],
+            'close': [1.0822, 1.0826, 1.0828, 1.0826, 1.0825, 1.0829],
+            'volume': [1500, 1800, 2200, 1900, 1600, 1700],
+            'time': pd.date_range('2025-01-01 12:00', periods=6, freq='1min')
+        })
+        zones = [sample_supply_zone]
+        current_time = datetime(2025, 1, 1, 12, 6)
+        
+        full_history = ZoneStateManager()
+        updates_per_bar = []
+        for end in range(1, len(price_data) + 1):
+            rolling = state_manager.update_zone_states(zones, price_data.iloc[max(0, end - 2):end], current_time)
+            full = full_history.update_zone_states(zones, price_data.iloc[:end], current_time)
+            assert [u.to_dict() for u in rolling] == [u.to_dict() for u in full]
+            updates_per_bar.append(rolling)
+        
+        assert [len(updates) for updates in updates_per_bar] == [0, 0, 1, 0, 0, 1]
+        assert updates_per_bar[2][0].new_status == 'broken'
+        assert updates_per_bar[2][0].trigger_price == 1.0837
+        # Only a 15% touch is in the window, but the earlier 35% penetration still counts
+        assert updates_per_bar[5][0].new_status == 'broken'
+        assert updates_per_bar[5][0].trigger_price == 1.0833
+        
+        # Nothing new to consume
+        assert state_manager.update_zone_states(zones, price_data, current_time) == []
+        
+        state_manager.reset_zone_tracking([sample_supply_zone.id])
+        replay = state_manager.update_zone_states(zones, price_data, current_time)
+        assert [u.to_dict() for u in replay] == [u.to_dict() for u in updates_per_bar[5]]
+    
+    def test_flip_confirmation_counts_across_updates(self, state_manager, sample_supply_zone):
+        """
+        Test flip confirmation accumulates over single-bar updates.
+        
+        Success Criteria:
+        - Flip confirmed once flip_confirmation_bars consecutive bars hold
+        - A bar falling back into the zone restarts the count
+        - Zones leaving the active lifecycle stop being tracked
+        """
+        closes = [1.0855, 1.0856, 1.0845, 1.0857, 1.0858, 1.0859]
+        price_data = pd.DataFrame({
+            'open': closes,
+            'high': [c + 0.0002 for c in closes],
+            'low': [c - 0.0001 for c in closes],
+            'close': closes,
+            'volume': [1500] * 6,
+            'time': pd.date_range('2025-01-01 12:00', periods=6, freq='1min')
+        })
+        zones = [sample_supply_zone]
+        current_time = datetime(2025, 1, 1, 12, 6)
+        
+        flips = []
+        for end in range(1, len(price_data) + 1):
+            updates = state_manager.update_zone_states(zones, price_data.iloc[end - 1:end], current_time)
+            flips.append([u for u in updates if u.trigger_reason == 'zone_flip'])
+        
+        assert [len(f) for f in flips] == [0, 0, 0, 0, 0, 1]
+        assert flips[5][0].new_status == 'flipped'
+        assert flips[5][0].trigger_price == 1.0859
+        
+        sample_supply_zone.status = 'flipped'
+        state_manager.update_zone_states(zones, price_data, current_time)
+        assert len(state_manager._trackers) == 0
+    
+    def test_history_retention_flushes_to_repository(self, sample_supply_zone, sample_price_data_zone_test):
+        """
+        Test bounded zone history with eviction to the repository.
+        
+        Success Criteria:
+        - At most max_entries_per_zone updates and events stay in memory
+        - Evicted records reach the repository in batches
+        - History lookups merge memory and persisted records in time order
+        """
+        from src.analysis.supply_demand.zone_state_manager import HistoryRetentionPolicy
+        
+        repository = RecordingHistoryRepository()
+        manager = ZoneStateManager(
+            repository=repository,
+            history_retention=HistoryRetentionPolicy(max_entries_per_zone=3, flush_batch_size=4)
+        )
+        zones = [sample_supply_zone]
+        zone_id = sample_supply_zone.id
+        
+        all_updates = []
+        all_events = []
+        for day in range(10):
+            # Zone is past expiry, so every update reports it
+            current_time = datetime(2025, 1, 9 + day)
+            all_updates.extend(manager.update_zone_states(zones, sample_price_data_zone_test, current_time))
+            all_events.extend(manager.detect_zone_tests(zones, sample_price_data_zone_test, current_time))
+        
+        assert len(all_updates) > 3 and len(all_events) > 3
+        assert len(manager._update_history.get(zone_id)) == 3
+        assert len(manager._event_history.get(zone_id)) == 3
+        assert repository.save_calls % 4 == 0
+        assert len(repository.updates) + len(manager._pending_updates) == len(all_updates) - 3
+        
+        history = manager.get_zone_history(zone_id)
+        assert [u.to_dict() for u in history] == [u.to_dict() for u in all_updates]
+        events = manager.get_test_events(zone_id)
+        expected_events = sorted(all_events, key=lambda e: e.test_time)
+        assert [e.to_dict() for e in events] == [e.to_dict() for e in expected_events]
+        
+        # Statistics still cover evicted events
+        stats = manager.get_test_statistics(zone_id)
+        expected = np.mean([e.reaction_strength for e in all_events])
+        assert stats['average_reaction_strength'] == pytest.approx(expected)
+    
+    def test_history_age_eviction_retries_failed_saves(self, sample_supply_zone, sample_price_data_zone_test):
+        """
+        Test age-based retention and retry of failed history saves.
+        
+        Success Criteria:
+        - Records older than max_age_hours leave memory
+        - Failed saves stay pending and remain visible in lookups
+        - A later flush persists the backlog
+        """
+        from src.analysis.supply_demand.zone_state_manager import HistoryRetentionPolicy
+        
+        repository = RecordingHistoryRepository(fail=True)
+        manager = ZoneStateManager(
+            repository=repository,
+            history_retention=HistoryRetentionPolicy(
+                max_entries_per_zone=None, max_age_hours=48, flush_batch_size=2
+            )
+        )
+        zones = [sample_supply_zone]
+        
+        all_updates = []
+        for day in range(6):
+            current_time = datetime(2025, 1, 9 + day)
+            all_updates.extend(manager.update_zone_states(zones, sample_price_data_zone_test, current_time))
+        
+        in_memory = manager._update_history.get(sample_supply_zone.id)
+        assert all(u.update_time >= datetime(2025, 1, 12) for u in in_memory)
+        assert repository.updates == []
+        assert len(manager._pending_updates) == len(all_updates) - len(in_memory)
+        assert [u.to_dict() for u in manager.get_zone_history(sample_supply_zone.id)] == \
+            [u.to_dict() for u in all_updates]
+        
+        repository.fail = False
+        assert manager.flush_history() == len(all_updates) - len(in_memory)
+        assert manager._pending_updates == []
+        assert [u.to_dict() for u in manager.get_zone_history(sample_supply_zone.id)] == \
+            [u.to_dict() for u in all_updates]
+    
     # Helper methods for test data creation
     def _create_large_zone_dataset(self, count: int) -> List[SupplyDemandZone]:
         """Create large dataset of zones for performance testing"""
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+One-off migration of historical_data to the unique (symbol, timeframe, timestamp) index.
+
+Removes duplicate bars left by repeated imports (keeping the most recently
+imported copy of each bar), creates the unique index used by the upserting
+importers and drops the single-column indexes it replaces.
+
+Usage:
+    python tools/utilities/dedupe_historical_data.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.data.database import initialize_database
+from src.monitoring.logging_config import setup_logging
+
+def dedupe_historical_data(dry_run: bool = False) -> bool:
+    """Deduplicate historical bars and create the unique index."""
+    
+    setup_logging()
+    print("🧹 Deduplicating historical_data...")
+    print("=" * 50)
+    
+    db_manager = initialize_database()
+    if not db_manager:
+        print("❌ Failed to initialize database")
+        return False
+    
+    try:
+        stats = db_manager.deduplicate_historical_data(dry_run=dry_run)
+    except Exception as e:
+        print(f"❌ Migration failed, nothing was changed: {e}")
+        return False
+    
+    print(f"📊 Bars stored more than once: {stats['duplicate_bars']:,}")
+    if dry_run:
+        print("   Dry run, nothing was changed")
+        return True
+    
+    print(f"🗑️  Duplicate rows deleted: {stats['deleted_rows']:,}")
+    if stats['index_created']:
+        print("✅ Created unique (symbol, timeframe, timestamp) index")
+    else:
+        print("✅ Unique (symbol, timeframe, timestamp) index already present")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate historical_data and add its unique index")
+    parser.add_argument("--dry-run", action="store_true", help="Only count duplicate bars")
+    args = parser.parse_args()
+    
+    success = dedupe_historical_data(dry_run=args.dry_run)
+    
+    if success:
+        print("\n🎉 Historical data migration completed!")
+    else:
+        print("\n❌ Historical data migration failed")
+    
+    sys.exit(0 if success else 1)
@@ -65,7 +65,10 @@ def import_csv_data():
             df = df.set_index('timestamp')  # Set timestamp as index
             
             # Use historical data store method
-            success = db_manager.store_historical_data('DJ30', 'M1', df)
+            success = db_manager.store_historical_data(
+                'DJ30', 'M1', df,
+                progress_callback=lambda stored, total: print(f"   Stored {stored:,}/{total:,} bars")
+            )
             
             if success:
                 print(f"✅ Successfully imported {len(data)} bars to PostgreSQL")